@@ -0,0 +1,237 @@
+import random
+from math import sqrt
+from typing import Optional
+
+from datatypes.primitive import Primitive, PrimitiveTypes, NULL
+from datatypes.raw import ID
+from graphs.csr import CSRAdjacency
+from graphs.graph import Graph
+from statuses.status import *
+
+
+class AnalyticsConvergenceStatus(LeafStatus):
+    def __init__(self, iterations: int, success: bool):
+        super().__init__("Iteration Converged",
+                         "Iteration did not Converge within the Maximum Number of Iterations",
+                         success,
+                         {"Iterations": iterations})
+
+
+class AnalyticsParameterStatus(LeafStatus):
+    def __init__(self, parameter: str, success: bool):
+        super().__init__("Parameter Valid",
+                         "Parameter Invalid or Refers to Vertices or Fields not in the Graph",
+                         success,
+                         {"Parameter": parameter})
+
+
+class AnalyticsStatus(DerivedStatus):
+    def __init__(self, algorithm: str, substatuses: list[Status], graph_name: str, data=None):
+        context = {"Algorithm": algorithm, "Graph Name": graph_name}
+        if data is not None:
+            context["data"] = data
+        super().__init__(f"{algorithm} Successful",
+                         f"{algorithm} Failed",
+                         substatuses,
+                         context)
+
+
+def spmv(csr: CSRAdjacency, x: list[float], coefficients: Optional[list[float]] = None) -> list[float]:
+    """
+    Sparse matrix-vector product. Returns y where y[i] is the sum of coefficients[p] * x[csr.targets[p]] over the
+    positions p of the row of vertex i, or of x[csr.targets[p]] if coefficients is None.
+    """
+    offsets = csr.offsets
+    if coefficients is None:
+        gathered = [x[j] for j in csr.targets]
+    else:
+        gathered = [c * x[j] for c, j in zip(coefficients, csr.targets)]
+    return [sum(gathered[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+
+
+class Analytics:
+    """
+    Iterative analytics over a Graph. The graph is turned into sparse matrix views once, on construction, and every
+    algorithm then runs on the views with whole-vector iterations instead of going through the entries of the graph.
+    The views are not updated by later insertions; create a new Analytics object to see them.
+    Attributes:
+        graph: the analyzed Graph.
+        out_edges: a CSRAdjacency whose rows are the edges incident from each vertex.
+        in_edges: a CSRAdjacency whose rows are the edges incident to each vertex.
+        ids: a list mapping the index of each vertex to its id. Every vector returned by an algorithm is indexed the
+            same way, which is also the order of the live vertices in graph.vertices (see CSRAdjacency.vertex_rows).
+    """
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self.out_edges = graph.csr()
+        self.in_edges = graph.csr(reverse=True)
+        self.ids = self.out_edges.ids
+
+    def _weights(self, csr: CSRAdjacency, weight: Optional[str]) -> Optional[list[float]]:
+        """
+        Return the weights of the edges in the order of csr.targets, unit weights if 'weight' is None, or None if
+        'weight' is not an INT or FLOAT edge field without NULLs and negative values.
+        """
+        if weight is None:
+            return [1.0] * csr.num_edges()
+        datatype = self.graph.edges.datatype
+        if datatype.types.get(weight) not in (PrimitiveTypes.INT, PrimitiveTypes.FLOAT):
+            return None
+        weights = csr.column(self.graph.edges.values[weight])
+        if NULL in weights or (weights and min(weights) < 0):
+            return None
+        return [float(w) for w in weights]
+
+    def pagerank(self, damping: float = 0.85, tolerance: float = 1e-6, max_iterations: int = 100,
+                 personalization: Optional[dict[Primitive, float]] = None, weight: Optional[str] = None) -> Status:
+        """
+        Computes the PageRank of every vertex by power iteration. The rank of dangling vertices is redistributed
+        according to the personalization vector.
+        :param damping: the probability of following an edge instead of teleporting.
+        :param tolerance: the iteration stops once the L1 distance between two successive vectors is below it.
+        :param personalization: a dictionary mapping vertex ids to non-negative teleport weights, which are
+            normalized to sum to 1 (personalized PageRank). If None, teleports are uniform.
+        :param weight: the name of a non-negative INT or FLOAT edge field used as transition weights. If None, every
+            edge has weight 1.
+        :return: an OK Status with a list of ranks (summing to 1) in the context "data", or an ERROR Status.
+        """
+        name = "PAGERANK" if personalization is None else "PERSONALIZED PAGERANK"
+        n = len(self.ids)
+        statuses: list[Status] = [AnalyticsParameterStatus("damping", 0 <= damping <= 1)]
+        teleport = [1.0 / n] * n if n else []
+        if personalization is not None:
+            index = self.out_edges.index
+            total = sum(personalization.values())
+            valid = (all(vid in index and p >= 0 for vid, p in personalization.items()) and total > 0)
+            statuses.append(AnalyticsParameterStatus("personalization", valid))
+            if valid:
+                teleport = [0.0] * n
+                for vid, p in personalization.items():
+                    teleport[index[vid]] = p / total
+        weights = self._weights(self.in_edges, weight)
+        out_weights = self._weights(self.out_edges, weight)
+        statuses.append(AnalyticsParameterStatus("weight", weights is not None))
+        status = AnalyticsStatus(name, statuses, self.graph.name)
+        if not status.success:
+            return status
+        out_total = spmv(self.out_edges, [1.0] * n, out_weights)
+        sources = self.in_edges.targets
+        coefficients = [w / out_total[u] if out_total[u] else 0.0 for w, u in zip(weights, sources)]
+        dangling = [i for i in range(n) if out_total[i] == 0]
+        ranks = list(teleport)
+        iterations, converged = 0, n == 0
+        while not converged and iterations < max_iterations:
+            iterations += 1
+            leaked = damping * sum(ranks[i] for i in dangling) + (1 - damping)
+            followed = spmv(self.in_edges, ranks, coefficients)
+            new_ranks = [damping * f + leaked * t for f, t in zip(followed, teleport)]
+            converged = sum(abs(a - b) for a, b in zip(new_ranks, ranks)) < tolerance
+            ranks = new_ranks
+        statuses.append(AnalyticsConvergenceStatus(iterations, converged))
+        return AnalyticsStatus(name, statuses, self.graph.name, ranks if converged else None)
+
+    def degree_centrality(self, direction: str = "out") -> Status:
+        """
+        Computes the degree of every vertex divided by the number of other vertices.
+        :param direction: "out" to count the edges incident from each vertex, "in" to count the edges incident to it,
+            or "both" to count both.
+        :return: an OK Status with a list of centralities in the context "data", or an ERROR Status.
+        """
+        status = AnalyticsStatus("DEGREE CENTRALITY",
+                                 [AnalyticsParameterStatus("direction", direction in ("out", "in", "both"))],
+                                 self.graph.name)
+        if not status.success:
+            return status
+        n = len(self.ids)
+        scale = 1.0 / (n - 1) if n > 1 else 1.0
+        out_offsets, in_offsets = self.out_edges.offsets, self.in_edges.offsets
+        degrees = [0] * n
+        if direction in ("out", "both"):
+            degrees = [d + out_offsets[i + 1] - out_offsets[i] for i, d in enumerate(degrees)]
+        if direction in ("in", "both"):
+            degrees = [d + in_offsets[i + 1] - in_offsets[i] for i, d in enumerate(degrees)]
+        return AnalyticsStatus("DEGREE CENTRALITY", status.substatuses, self.graph.name,
+                               [d * scale for d in degrees])
+
+    def eigenvector_centrality(self, tolerance: float = 1e-6, max_iterations: int = 100,
+                               weight: Optional[str] = None) -> Status:
+        """
+        Computes the eigenvector centrality of every vertex, i.e. the dominant eigenvector of the transposed adjacency
+        matrix, so that the centrality of a vertex is proportional to the sum of the centralities of the vertices
+        with edges to it. Iterates x <- (I + A^T) x, which has the same eigenvectors but doesn't oscillate on
+        bipartite graphs.
+        :param tolerance: the iteration stops once the L1 distance between two successive vectors is below
+            len(self.ids) * tolerance.
+        :param weight: see pagerank().
+        :return: an OK Status with a list of centralities of unit L2 norm in the context "data", or an ERROR Status.
+        """
+        weights = self._weights(self.in_edges, weight)
+        statuses: list[Status] = [AnalyticsParameterStatus("weight", weights is not None)]
+        status = AnalyticsStatus("EIGENVECTOR CENTRALITY", statuses, self.graph.name)
+        if not status.success:
+            return status
+        n = len(self.ids)
+        x = [1.0 / n] * n if n else []
+        iterations, converged = 0, n == 0
+        while not converged and iterations < max_iterations:
+            iterations += 1
+            y = [a + b for a, b in zip(x, spmv(self.in_edges, x, weights))]
+            norm = sqrt(sum(v * v for v in y)) or 1.0
+            y = [v / norm for v in y]
+            converged = sum(abs(a - b) for a, b in zip(y, x)) < n * tolerance
+            x = y
+        statuses.append(AnalyticsConvergenceStatus(iterations, converged))
+        return AnalyticsStatus("EIGENVECTOR CENTRALITY", statuses, self.graph.name, x if converged else None)
+
+    def label_propagation(self, max_iterations: int = 100, seed: int = 0) -> Status:
+        """
+        Detects communities by label propagation, ignoring edge directions. Every vertex starts with its own label and
+        repeatedly adopts the label most frequent among its neighbors, visiting the vertices in a random order that
+        is reproducible with 'seed'. Ties are broken in favor of the current label, then of the smallest label.
+        :return: an OK Status with a list holding, for every vertex, the id of the vertex whose label it ended up
+            with in the context "data", or an ERROR Status if the labels kept changing after max_iterations rounds.
+        """
+        n = len(self.ids)
+        rng = random.Random(seed)
+        labels = list(range(n))
+        order = list(range(n))
+        csrs = [self.out_edges, self.in_edges]
+        iterations, converged = 0, n == 0
+        while not converged and iterations < max_iterations:
+            iterations += 1
+            rng.shuffle(order)
+            converged = True
+            for i in order:
+                counts: dict[int, int] = {}
+                for csr in csrs:
+                    for j in csr.targets[csr.offsets[i]:csr.offsets[i + 1]]:
+                        if j != i:
+                            counts[labels[j]] = counts.get(labels[j], 0) + 1
+                if not counts:
+                    continue
+                best = max(counts.values())
+                if counts.get(labels[i]) == best:
+                    continue
+                labels[i] = min(label for label, count in counts.items() if count == best)
+                converged = False
+        statuses = [AnalyticsConvergenceStatus(iterations, converged)]
+        data = [self.ids[label] for label in labels] if converged else None
+        return AnalyticsStatus("LABEL PROPAGATION", statuses, self.graph.name, data)
+
+    def attach(self, field_name: str, status: Status) -> Status:
+        """
+        Attaches the result of a successful algorithm run on this object to the vertices of the graph as a computed
+        field with name 'field_name' (see Data.attach_field()). Deleted rows get NULL.
+        :param status: the Status returned by one of the algorithms of this object.
+        """
+        results = status.context.get("data") if status.success else None
+        if results is None:
+            return AnalyticsStatus("ATTACH", [status], self.graph.name)
+        datatype = (self.graph.vertices.datatype.types[ID] if status["Algorithm"] == "LABEL PROPAGATION"
+                    else PrimitiveTypes.FLOAT)
+        values = [NULL] * len(self.graph.vertices.ids)
+        for row, value in zip(self.out_edges.vertex_rows, results):
+            values[row] = value
+        attach_status = self.graph.vertices.attach_field(field_name, datatype, values)
+        return AnalyticsStatus("ATTACH", [attach_status], self.graph.name)
@@ -0,0 +1,318 @@
+from bisect import bisect_left
+from typing import Callable, Iterator, Optional, Sequence
+
+from datatypes.primitive import Primitive, NULL
+from graphs.csr import CSRAdjacency
+from graphs.data import Data
+from graphs.graph import Graph
+from statuses.status import *
+
+Predicates = dict[str, Callable[[Primitive], bool]]
+
+
+class PatternFieldStatus(LeafStatus):
+    def __init__(self, field_name: str, variable: str, success: bool):
+        super().__init__("Predicate Field Found",
+                         "Predicate Refers to a Field that does not Exist",
+                         success,
+                         {"Field Name": field_name, "Pattern Element": variable})
+
+
+class PatternMatchStatus(DerivedStatus):
+    def __init__(self, algorithm: str, substatuses: list[Status], graph_name: str, data=None):
+        context = {"Algorithm": algorithm, "Graph Name": graph_name}
+        if data is not None:
+            context["data"] = data
+        super().__init__(f"{algorithm} Successful",
+                         f"{algorithm} Failed",
+                         substatuses,
+                         context)
+
+
+class Pattern:
+    """
+    A small query graph to be matched against a Graph. Every vertex of the pattern is a named variable that binds to a
+    vertex of the graph, and every edge (a, b) of the pattern requires an edge from the vertex bound to a to the vertex
+    bound to b. Predicates map field names to functions on the value of the field, and an element satisfies them if
+    every function returns True; NULL values never satisfy a predicate.
+    Attributes:
+        variables: the names of the variables, in the order they were declared.
+        vertex_predicates: a dictionary mapping each variable to the predicates its vertex must satisfy.
+        edges: a list of (source variable, target variable, predicates) triples.
+    """
+
+    def __init__(self):
+        self.variables: list[str] = []
+        self.vertex_predicates: dict[str, Predicates] = {}
+        self.edges: list[tuple[str, str, Predicates]] = []
+
+    def vertex(self, name: str, predicates: Optional[Predicates] = None) -> 'Pattern':
+        """
+        Declares the variable 'name', or adds predicates to it if it is already declared. Returns self.
+        """
+        if name not in self.variables:
+            self.variables.append(name)
+            self.vertex_predicates[name] = {}
+        self.vertex_predicates[name].update({} if predicates is None else predicates)
+        return self
+
+    def edge(self, source: str, target: str, predicates: Optional[Predicates] = None) -> 'Pattern':
+        """
+        Adds an edge between two variables, declaring them if needed. Returns self.
+        """
+        self.vertex(source)
+        self.vertex(target)
+        self.edges.append((source, target, {} if predicates is None else predicates))
+        return self
+
+    @staticmethod
+    def path(length: int, predicates: Optional[Predicates] = None) -> 'Pattern':
+        """
+        Return the pattern of a directed path v0 -> v1 -> ... -> v'length' whose edges satisfy 'predicates'.
+        """
+        pattern = Pattern().vertex("v0")
+        for i in range(length):
+            pattern.edge(f"v{i}", f"v{i + 1}", predicates)
+        return pattern
+
+    @staticmethod
+    def triangle() -> 'Pattern':
+        """
+        Return the pattern of a directed triangle a -> b -> c -> a.
+        """
+        return Pattern().edge("a", "b").edge("b", "c").edge("c", "a")
+
+
+def intersect_sorted(lists: list[list[int]]) -> list[int]:
+    """
+    Return the sorted list of distinct values present in every list of 'lists', which must all be sorted. The shortest
+    list is scanned and its values are looked up in the other lists by binary search, moving the lower bound of each
+    search forwards so that no list is scanned more than once.
+    """
+    lists = sorted(lists, key=len)
+    result = []
+    lower = [0] * len(lists)
+    previous = None
+    for value in lists[0]:
+        if value == previous:
+            continue
+        previous = value
+        found = True
+        for k in range(1, len(lists)):
+            position = bisect_left(lists[k], value, lower[k])
+            lower[k] = position
+            if position == len(lists[k]) or lists[k][position] != value:
+                found = False
+                break
+        if found:
+            result.append(value)
+    return result
+
+
+def _mask(data: Data, predicates: Predicates, rows: Sequence[int]) -> Optional[list[bool]]:
+    """
+    Evaluates 'predicates' column at a time on the rows 'rows' of 'data', e.g. CSRAdjacency.vertex_rows or
+    CSRAdjacency.rows, and returns a list telling whether each of them satisfies all of them, in the same order, or
+    None if there are no predicates.
+    """
+    mask = None
+    for field_name, predicate in predicates.items():
+        values = data.values[field_name]
+        column = [values[row] for row in rows]
+        passed = [value is not NULL and predicate(value) for value in column]
+        mask = passed if mask is None else [a and b for a, b in zip(mask, passed)]
+    return mask
+
+
+class PatternMatcher:
+    """
+    Evaluates Patterns and subgraph counting built-ins over a Graph. Like Analytics, the graph is turned into sorted
+    CSR views once, on construction, and later insertions are not seen.
+    Patterns are evaluated by a generic (worst-case optimal) join: the variables are bound one at a time, and the
+    candidates for each variable are the intersection of the sorted neighbor lists of the already bound variables it
+    shares an edge with, instead of nested loops over the edges.
+    Attributes:
+        graph: the Graph the patterns are matched against.
+        out_edges: a CSRAdjacency whose rows are the edges incident from each vertex.
+        in_edges: a CSRAdjacency whose rows are the edges incident to each vertex.
+        ids: a list mapping the index of each vertex to its id.
+    """
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self.out_edges = graph.csr()
+        self.in_edges = graph.csr(reverse=True)
+        self.ids = self.out_edges.ids
+        self._undirected: Optional[list[list[int]]] = None
+
+    def _check_fields(self, pattern: Pattern) -> list[Status]:
+        statuses = []
+        for variable, predicates in pattern.vertex_predicates.items():
+            for field_name in predicates:
+                statuses.append(PatternFieldStatus(field_name, variable,
+                                                   field_name in self.graph.vertices.values))
+        for source, target, predicates in pattern.edges:
+            for field_name in predicates:
+                statuses.append(PatternFieldStatus(field_name, f"{source} -> {target}",
+                                                   field_name in self.graph.edges.values))
+        return statuses
+
+    def _order(self, pattern: Pattern, candidates: dict[str, Optional[list[bool]]]) -> list[str]:
+        """
+        Return the order in which the variables are bound: each next variable is the one sharing the most edges with
+        the variables already ordered, preferring variables with predicates and then with more edges overall.
+        """
+        degree = {variable: 0 for variable in pattern.variables}
+        for source, target, _ in pattern.edges:
+            degree[source] += 1
+            degree[target] += 1
+        order: list[str] = []
+        while len(order) < len(pattern.variables):
+            def rank(variable):
+                bound = sum(1 for source, target, _ in pattern.edges
+                            if (source == variable and target in order) or (target == variable and source in order))
+                return bound, candidates[variable] is not None, degree[variable]
+            order.append(max((v for v in pattern.variables if v not in order), key=rank))
+        return order
+
+    def _neighbors(self, csr: CSRAdjacency, mask: Optional[list[bool]], i: int) -> list[int]:
+        start, end = csr.offsets[i], csr.offsets[i + 1]
+        if mask is None:
+            return csr.targets[start:end].tolist()
+        return [t for t, ok in zip(csr.targets[start:end], mask[start:end]) if ok]
+
+    def iterate(self, pattern: Pattern, injective: bool = True) -> Iterator[dict[str, Primitive]]:
+        """
+        Lazily yields the matches of 'pattern' as dictionaries mapping each variable to a vertex id. The fields used by
+        the predicates of the pattern must exist (see self.match()).
+        :param injective: if True, distinct variables must bind to distinct vertices.
+        """
+        candidates = {variable: _mask(self.graph.vertices, predicates, self.out_edges.vertex_rows)
+                      for variable, predicates in pattern.vertex_predicates.items()}
+        order = self._order(pattern, candidates)
+        position = {variable: k for k, variable in enumerate(order)}
+        # For each variable, the (earlier variable, csr, mask) triples whose neighbor lists contain its candidates.
+        joins: dict[str, list[tuple[str, CSRAdjacency, Optional[list[bool]]]]] = {v: [] for v in order}
+        loops: dict[str, list[Optional[list[bool]]]] = {v: [] for v in order}
+        for source, target, predicates in pattern.edges:
+            if source == target:
+                loops[source].append(_mask(self.graph.edges, predicates, self.out_edges.rows))
+            elif position[source] < position[target]:
+                mask = _mask(self.graph.edges, predicates, self.out_edges.rows)
+                joins[target].append((source, self.out_edges, mask))
+            else:
+                mask = _mask(self.graph.edges, predicates, self.in_edges.rows)
+                joins[source].append((target, self.in_edges, mask))
+        n = len(self.ids)
+        binding: list[int] = [-1] * len(order)
+
+        def has_loop(i: int, mask: Optional[list[bool]]) -> bool:
+            position = self.out_edges.find(i, i)
+            if position == -1 or mask is None:
+                return position != -1
+            while position < self.out_edges.offsets[i + 1] and self.out_edges.targets[position] == i:
+                if mask[position]:
+                    return True
+                position += 1
+            return False
+
+        def extend(depth: int) -> Iterator[dict[str, Primitive]]:
+            if depth == len(order):
+                yield {variable: self.ids[binding[k]] for k, variable in enumerate(order)}
+                return
+            variable = order[depth]
+            if joins[variable]:
+                values = intersect_sorted([self._neighbors(csr, mask, binding[position[other]])
+                                           for other, csr, mask in joins[variable]])
+            else:
+                values = range(n)
+            mask = candidates[variable]
+            for i in values:
+                if mask is not None and not mask[i]:
+                    continue
+                if injective and i in binding[:depth]:
+                    continue
+                if not all(has_loop(i, loop) for loop in loops[variable]):
+                    continue
+                binding[depth] = i
+                yield from extend(depth + 1)
+
+        if pattern.variables:
+            yield from extend(0)
+
+    def match(self, pattern: Pattern, limit: Optional[int] = None, injective: bool = True) -> Status:
+        """
+        Matches 'pattern' against the graph.
+        :param limit: the maximum number of matches returned, or None for all matches.
+        :param injective: see self.iterate().
+        :return: an OK Status with a list of matches (dictionaries mapping each variable to a vertex id) in the context
+            "data", or an ERROR Status if a predicate refers to a field that doesn't exist.
+        """
+        statuses = self._check_fields(pattern)
+        status = PatternMatchStatus("PATTERN MATCH", statuses, self.graph.name)
+        if not status.success:
+            return status
+        matches = []
+        for binding in self.iterate(pattern, injective):
+            if limit is not None and len(matches) >= limit:
+                break
+            matches.append(binding)
+        return PatternMatchStatus("PATTERN MATCH", statuses, self.graph.name, matches)
+
+    def undirected_neighbors(self) -> list[list[int]]:
+        """
+        Return, for each vertex index, the sorted list of the distinct indices of the other vertices it shares an edge
+        with in either direction. The lists are computed once and cached.
+        """
+        if self._undirected is None:
+            out_edges, in_edges = self.out_edges, self.in_edges
+            self._undirected = [
+                sorted((set(out_edges.targets[out_edges.offsets[i]:out_edges.offsets[i + 1]]) |
+                        set(in_edges.targets[in_edges.offsets[i]:in_edges.offsets[i + 1]])) - {i})
+                for i in range(len(self.ids))
+            ]
+        return self._undirected
+
+    def _triangles(self) -> list[int]:
+        """
+        Return the number of triangles of the undirected simple graph underlying the graph that contain each vertex.
+        Every triangle is found once, from its lowest-ranked vertex, by intersecting neighbor lists restricted to
+        higher-ranked vertices, where vertices are ranked by degree.
+        """
+        neighbors = self.undirected_neighbors()
+        n = len(neighbors)
+        rank = [0] * n
+        for r, i in enumerate(sorted(range(n), key=lambda i: (len(neighbors[i]), i))):
+            rank[i] = r
+        higher = [sorted((j for j in neighbors[i] if rank[j] > rank[i]), key=rank.__getitem__) for i in range(n)]
+        higher_ranks = [[rank[j] for j in row] for row in higher]
+        by_rank = sorted(range(n), key=rank.__getitem__)
+        counts = [0] * n
+        for u in range(n):
+            for v in higher[u]:
+                for r in intersect_sorted([higher_ranks[u], higher_ranks[v]]):
+                    w = by_rank[r]
+                    counts[u] += 1
+                    counts[v] += 1
+                    counts[w] += 1
+        return counts
+
+    def triangle_count(self) -> Status:
+        """
+        Counts the triangles of the undirected simple graph underlying the graph, i.e. ignoring edge directions,
+        self-loops and parallel edges.
+        :return: an OK Status with the number of triangles in the context "data".
+        """
+        return PatternMatchStatus("TRIANGLE COUNT", [], self.graph.name, sum(self._triangles()) // 3)
+
+    def clustering(self) -> Status:
+        """
+        Computes the local clustering coefficient of every vertex of the undirected simple graph underlying the graph:
+        the number of triangles containing the vertex divided by the number of pairs of its neighbors.
+        :return: an OK Status with a list of coefficients, indexed like self.ids, in the context "data".
+        """
+        neighbors = self.undirected_neighbors()
+        triangles = self._triangles()
+        coefficients = [2.0 * t / (len(row) * (len(row) - 1)) if len(row) > 1 else 0.0
+                        for t, row in zip(triangles, neighbors)]
+        return PatternMatchStatus("CLUSTERING COEFFICIENT", [], self.graph.name, coefficients)
@@ -0,0 +1,299 @@
+import heapq
+from array import array
+from math import inf
+from typing import Callable, Optional
+
+from datatypes.edge import WEIGHT
+from datatypes.primitive import Primitive, PrimitiveTypes, NULL
+from graphs.csr import CSRAdjacency
+from graphs.graph import Graph
+from statuses.status import *
+from utilities.cache import cached_query
+
+
+class PathVertexExistsStatus(LeafStatus):
+    def __init__(self, id: Primitive, graph_name: str, success: bool):
+        super().__init__("Vertex Found",
+                         "Vertex does not Exist in the Graph",
+                         success,
+                         {"id": id, "Graph Name": graph_name})
+
+
+class PathWeightFieldStatus(LeafStatus):
+    def __init__(self, field_name: str, success: bool):
+        super().__init__("Weight Field Valid",
+                         "Weight Field is Missing, not of Type INT or FLOAT, or Contains NULL",
+                         success,
+                         {"Field Name": field_name})
+
+
+class PathNegativeWeightStatus(LeafStatus):
+    def __init__(self, field_name: str, success: bool):
+        super().__init__("No Negative Weights Found",
+                         "Negative Weight Found -- Use bellman_ford() Instead",
+                         success,
+                         {"Field Name": field_name})
+
+
+class PathNegativeCycleStatus(LeafStatus):
+    def __init__(self, source: Primitive, success: bool):
+        super().__init__("No Negative Cycles Found",
+                         "Negative Cycle Reachable from the Source Vertex",
+                         success,
+                         {"Source": source})
+
+
+class ShortestPathStatus(DerivedStatus):
+    def __init__(self, algorithm: str, substatuses: list[Status], graph_name: str, data=None):
+        context = {"Algorithm": algorithm, "Graph Name": graph_name}
+        if data is not None:
+            context["data"] = data
+        super().__init__(f"{algorithm} Successful",
+                         f"{algorithm} Failed",
+                         substatuses,
+                         context)
+
+
+class ShortestPaths:
+    """
+    The result of a shortest path search, stored as arrays indexed by the vertex indices of a CSRAdjacency.
+    Attributes:
+        source: the id of the source vertex.
+        ids: a list mapping the index of each vertex to its id.
+        index: a dictionary mapping the id of each vertex to its index.
+        distances: an array holding the distance from the source to each vertex, or inf if the vertex is unreachable.
+            For point-to-point searches, only the distances of the vertices on the returned path are guaranteed to be
+            exact.
+        predecessors: an array holding the index of the vertex preceding each vertex on its shortest path, or -1 for
+            the source and for unreached vertices.
+    """
+
+    def __init__(self, source: Primitive, csr: CSRAdjacency, distances: array, predecessors: array):
+        self.source = source
+        self.ids = csr.ids
+        self.index = csr.index
+        self.distances = distances
+        self.predecessors = predecessors
+
+    def distance(self, id: Primitive) -> float:
+        """
+        Return the distance from the source to the vertex with id 'id', or inf if it is unreachable.
+        """
+        return self.distances[self.index[id]]
+
+    def path(self, id: Primitive) -> Optional[list[Primitive]]:
+        """
+        Return the list of vertex ids on the shortest path from the source to the vertex with id 'id', or None if it
+        is unreachable.
+        """
+        i = self.index[id]
+        if self.distances[i] == inf:
+            return None
+        path = []
+        while i != -1:
+            path.append(self.ids[i])
+            i = self.predecessors[i]
+        path.reverse()
+        return path
+
+
+def _weights(graph: Graph, csr: CSRAdjacency, weight: Optional[str]) -> Optional[array]:
+    """
+    Return the weight column of the graph permuted into the order of csr.targets, unit weights if 'weight' is None,
+    or None if the weight field is not a valid weight column.
+    """
+    if weight is None:
+        return array('d', [1.0]) * csr.num_edges()
+    if (weight not in graph.edges.datatype.names or
+            graph.edges.datatype.types.get(weight) not in (PrimitiveTypes.INT, PrimitiveTypes.FLOAT)):
+        return None
+    values = graph.edges.values[weight]
+    if NULL in values:
+        return None
+    return csr.column(values, 'd')
+
+
+def _prepare(graph: Graph, csr: CSRAdjacency, weight: Optional[str], vertices: list[Primitive],
+             allow_negative: bool) -> tuple[list[Status], Optional[array]]:
+    """
+    Validates the vertices and weight field passed to a shortest path search and loads the weights.
+    """
+    statuses: list[Status] = [PathVertexExistsStatus(vid, graph.name, vid in csr.index) for vid in vertices]
+    weights = _weights(graph, csr, weight)
+    statuses.append(PathWeightFieldStatus(str(weight), weights is not None))
+    if weights is not None and not allow_negative:
+        statuses.append(PathNegativeWeightStatus(str(weight), len(weights) == 0 or min(weights) >= 0))
+    return statuses, weights
+
+
+def _empty_result(n: int) -> tuple[array, array]:
+    return array('d', [inf]) * n, array('q', [-1]) * n
+
+
+@cached_query
+def dijkstra(graph: Graph, source: Primitive, weight: Optional[str] = WEIGHT) -> Status:
+    """
+    Computes the shortest paths from the vertex with id 'source' to every vertex of the graph.
+    :param weight: the name of the INT or FLOAT edge field holding the weights, which must be non-negative.
+        If None, every edge has weight 1.
+    :return: an OK Status containing a ShortestPaths object in the context "data", or an ERROR Status if the source
+        does not exist or the weights are invalid.
+    """
+    csr = graph.csr()
+    statuses, weights = _prepare(graph, csr, weight, [source], False)
+    status = ShortestPathStatus("DIJKSTRA", statuses, graph.name)
+    if not status.success:
+        return status
+    distances, predecessors = _empty_result(csr.size())
+    s = csr.index[source]
+    distances[s] = 0.0
+    offsets, targets = csr.offsets, csr.targets
+    heap = [(0.0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > distances[u]:
+            continue
+        for p in range(offsets[u], offsets[u + 1]):
+            v = targets[p]
+            nd = d + weights[p]
+            if nd < distances[v]:
+                distances[v] = nd
+                predecessors[v] = u
+                heapq.heappush(heap, (nd, v))
+    return ShortestPathStatus("DIJKSTRA", statuses, graph.name,
+                              ShortestPaths(source, csr, distances, predecessors))
+
+
+@cached_query
+def bidirectional_dijkstra(graph: Graph, source: Primitive, target: Primitive,
+                           weight: Optional[str] = WEIGHT) -> Status:
+    """
+    Computes a shortest path from the vertex with id 'source' to the vertex with id 'target' by searching forwards
+    from the source and backwards from the target at the same time.
+    :param weight: see dijkstra().
+    :return: an OK Status containing a ShortestPaths object in the context "data", on which path(target) returns the
+        shortest path, or an ERROR Status if either vertex does not exist or the weights are invalid.
+    """
+    forward = graph.csr()
+    statuses, forward_weights = _prepare(graph, forward, weight, [source, target], False)
+    status = ShortestPathStatus("BIDIRECTIONAL DIJKSTRA", statuses, graph.name)
+    if not status.success:
+        return status
+    backward = graph.csr(reverse=True)
+    backward_weights = _weights(graph, backward, weight)
+    n = forward.size()
+    distances, predecessors = _empty_result(n)
+    backward_distances, successors = _empty_result(n)
+    s, t = forward.index[source], forward.index[target]
+    distances[s] = 0.0
+    backward_distances[t] = 0.0
+    searches = [(forward, forward_weights, distances, predecessors, backward_distances, [(0.0, s)]),
+                (backward, backward_weights, backward_distances, successors, distances, [(0.0, t)])]
+    best, meet = (0.0, s) if s == t else (inf, -1)
+    while searches[0][5] and searches[1][5] and searches[0][5][0][0] + searches[1][5][0][0] < best:
+        csr, weights, own, parents, other, heap = (searches[0] if searches[0][5][0][0] <= searches[1][5][0][0]
+                                                   else searches[1])
+        d, u = heapq.heappop(heap)
+        if d > own[u]:
+            continue
+        offsets, targets = csr.offsets, csr.targets
+        for p in range(offsets[u], offsets[u + 1]):
+            v = targets[p]
+            nd = d + weights[p]
+            if nd < own[v]:
+                own[v] = nd
+                parents[v] = u
+                heapq.heappush(heap, (nd, v))
+            if own[v] + other[v] < best:
+                best, meet = own[v] + other[v], v
+    if meet != -1:
+        v = meet
+        while successors[v] != -1:
+            predecessors[successors[v]] = v
+            v = successors[v]
+        v = meet
+        while v != -1:
+            distances[v] = best - backward_distances[v]
+            v = successors[v]
+    return ShortestPathStatus("BIDIRECTIONAL DIJKSTRA", statuses, graph.name,
+                              ShortestPaths(source, forward, distances, predecessors))
+
+
+@cached_query
+def astar(graph: Graph, source: Primitive, target: Primitive,
+          heuristic: Callable[[Primitive, Primitive], float] = lambda vid, target: 0.0,
+          weight: Optional[str] = WEIGHT) -> Status:
+    """
+    Computes a shortest path from the vertex with id 'source' to the vertex with id 'target' using A* search.
+    :param heuristic: a function taking the id of a vertex and the id of the target and returning a lower bound of
+        the distance between them. The returned path is shortest if the heuristic never overestimates.
+    :param weight: see dijkstra().
+    :return: an OK Status containing a ShortestPaths object in the context "data", on which path(target) returns the
+        shortest path, or an ERROR Status if either vertex does not exist or the weights are invalid.
+    """
+    csr = graph.csr()
+    statuses, weights = _prepare(graph, csr, weight, [source, target], False)
+    status = ShortestPathStatus("A*", statuses, graph.name)
+    if not status.success:
+        return status
+    distances, predecessors = _empty_result(csr.size())
+    s, t = csr.index[source], csr.index[target]
+    ids, offsets, targets = csr.ids, csr.offsets, csr.targets
+    distances[s] = 0.0
+    heap = [(heuristic(source, target), 0.0, s)]
+    while heap:
+        _, d, u = heapq.heappop(heap)
+        if u == t:
+            break
+        if d > distances[u]:
+            continue
+        for p in range(offsets[u], offsets[u + 1]):
+            v = targets[p]
+            nd = d + weights[p]
+            if nd < distances[v]:
+                distances[v] = nd
+                predecessors[v] = u
+                heapq.heappush(heap, (nd + heuristic(ids[v], target), nd, v))
+    return ShortestPathStatus("A*", statuses, graph.name,
+                              ShortestPaths(source, csr, distances, predecessors))
+
+
+@cached_query
+def bellman_ford(graph: Graph, source: Primitive, weight: Optional[str] = WEIGHT) -> Status:
+    """
+    Computes the shortest paths from the vertex with id 'source' to every vertex of the graph, allowing negative
+    weights. Each round only relaxes the edges out of the vertices whose distances changed in the previous round.
+    :param weight: the name of the INT or FLOAT edge field holding the weights. If None, every edge has weight 1.
+    :return: an OK Status containing a ShortestPaths object in the context "data", or an ERROR Status if the source
+        does not exist, the weights are invalid, or a negative cycle is reachable from the source.
+    """
+    csr = graph.csr()
+    statuses, weights = _prepare(graph, csr, weight, [source], True)
+    status = ShortestPathStatus("BELLMAN-FORD", statuses, graph.name)
+    if not status.success:
+        return status
+    n = csr.size()
+    distances, predecessors = _empty_result(n)
+    s = csr.index[source]
+    distances[s] = 0.0
+    offsets, targets = csr.offsets, csr.targets
+    frontier = [s]
+    for _ in range(n):
+        changed = set()
+        for u in frontier:
+            d = distances[u]
+            for p in range(offsets[u], offsets[u + 1]):
+                v = targets[p]
+                if d + weights[p] < distances[v]:
+                    distances[v] = d + weights[p]
+                    predecessors[v] = u
+                    changed.add(v)
+        frontier = list(changed)
+        if not frontier:
+            break
+    statuses.append(PathNegativeCycleStatus(source, not frontier))
+    status = ShortestPathStatus("BELLMAN-FORD", statuses, graph.name)
+    if not status.success:
+        return status
+    return ShortestPathStatus("BELLMAN-FORD", statuses, graph.name,
+                              ShortestPaths(source, csr, distances, predecessors))
@@ -0,0 +1,145 @@
+import random
+from typing import Callable
+
+from constraints.typewide import BoundTypewideConstraint, TYPEWIDE_CONSTRAINTS
+from datatypes.edge import EdgeType
+from datatypes.primitive import PrimitiveTypes, Primitive
+from datatypes.vertex import VertexType
+from graphs.graph import Graph
+
+LABELS = ["a", "b", "c", "d"]
+
+
+def _order(edges: int, directed: bool = True) -> int:
+    """
+    Return the number of vertices of a random graph with 'edges' distinct edges: edges / 4, but at least 3 and enough
+    for twice as many distinct (from, to) pairs without self-loops, ordered if 'directed', so that sampling them ends
+    quickly.
+    """
+    n = max(3, edges // 4)
+    while n * (n - 1) // (1 if directed else 2) < 2 * edges:
+        n += 1
+    return n
+
+
+def erdos_renyi(edges: int, seed: int) -> tuple[int, list[tuple[int, int]]]:
+    """
+    Return a directed Erdős–Rényi G(n, m) graph with 'edges' distinct edges and no self-loops over n = edges / 4
+    vertices (more for small graphs, see _order()), as (n, list of (from, to) pairs). Vertex ids are 0 to n - 1.
+    """
+    rng = random.Random(seed)
+    n = _order(edges)
+    pairs: set[tuple[int, int]] = set()
+    while len(pairs) < edges:
+        source, target = rng.randrange(n), rng.randrange(n)
+        if source != target:
+            pairs.add((source, target))
+    return n, sorted(pairs)
+
+
+def barabasi_albert(edges: int, seed: int, degree: int = 4) -> tuple[int, list[tuple[int, int]]]:
+    """
+    Return a Barabási–Albert preferential attachment graph, whose degrees follow a power law: each new vertex adds
+    'degree' edges to distinct existing vertices picked with probability proportional to their degree.
+    """
+    rng = random.Random(seed)
+    n = edges // degree + degree + 1
+    pairs: list[tuple[int, int]] = [(i, j) for i in range(degree + 1) for j in range(i)]
+    endpoints = [vid for pair in pairs for vid in pair]
+    for vid in range(degree + 1, n):
+        targets: set[int] = set()
+        while len(targets) < degree:
+            targets.add(rng.choice(endpoints))
+        for target in sorted(targets):
+            pairs.append((vid, target))
+            endpoints += [vid, target]
+    return n, pairs[:edges]
+
+
+def grid(edges: int, seed: int) -> tuple[int, list[tuple[int, int]]]:
+    """
+    Return a square grid whose vertices point to their right and lower neighbors. 'seed' is unused.
+    """
+    side = max(2, round((edges / 2) ** 0.5))
+    pairs = [(r * side + c, r * side + c + 1) for r in range(side) for c in range(side - 1)]
+    pairs += [(r * side + c, (r + 1) * side + c) for r in range(side - 1) for c in range(side)]
+    return side * side, pairs
+
+
+def tree(edges: int, seed: int) -> tuple[int, list[tuple[int, int]]]:
+    """
+    Return a random recursive tree with 'edges' edges, each vertex pointing to a uniformly chosen earlier vertex.
+    """
+    rng = random.Random(seed)
+    return edges + 1, [(vid, rng.randrange(vid)) for vid in range(1, edges + 1)]
+
+
+def dag(edges: int, seed: int) -> tuple[int, list[tuple[int, int]]]:
+    """
+    Return a random directed acyclic graph with 'edges' distinct edges, all pointing from a smaller to a larger id.
+    """
+    rng = random.Random(seed)
+    n = _order(edges, directed=False)
+    pairs: set[tuple[int, int]] = set()
+    while len(pairs) < edges:
+        source, target = sorted(rng.sample(range(n), 2))
+        pairs.add((source, target))
+    return n, sorted(pairs)
+
+
+GENERATORS: dict[str, Callable[[int, int], tuple[int, list[tuple[int, int]]]]] = {
+    "erdos_renyi": erdos_renyi,
+    "barabasi_albert": barabasi_albert,
+    "grid": grid,
+    "tree": tree,
+    "dag": dag
+}
+
+
+def types() -> tuple[VertexType, EdgeType]:
+    """
+    Return the VertexType (INT id, STR label, BOOL flag) and EdgeType (INT id, from and to, FLOAT weight) of the
+    generated graphs.
+    """
+    bound = lambda name, fields: BoundTypewideConstraint(TYPEWIDE_CONSTRAINTS[name], fields)
+    vertextype = VertexType("BenchV", ["id", "label", "flag"],
+                            {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR, "flag": PrimitiveTypes.BOOL},
+                            [bound("UNIQUE", ["id"]), bound("NOTNULL", ["id"])])
+    edgetype = EdgeType("BenchE", ["id", "from", "to", "weight"],
+                        {"id": PrimitiveTypes.INT, "from": PrimitiveTypes.INT, "to": PrimitiveTypes.INT,
+                         "weight": PrimitiveTypes.FLOAT},
+                        [bound("UNIQUE", ["id"]), bound("NOTNULL", ["id"]), bound("NOTNULL", ["from"]),
+                         bound("NOTNULL", ["to"])])
+    return vertextype, edgetype
+
+
+def entries(n: int, pairs: list[tuple[int, int]], seed: int) -> tuple[list[dict[str, Primitive]],
+                                                                      list[dict[str, Primitive]]]:
+    """
+    Return the vertex and edge entries of a generated graph, with seeded labels, flags and weights.
+    """
+    rng = random.Random(seed)
+    vertices = [{"id": vid, "label": rng.choice(LABELS), "flag": rng.random() < 0.5} for vid in range(n)]
+    edges = [{"id": eid, "from": source, "to": target, "weight": round(rng.uniform(1.0, 10.0), 3)}
+             for eid, (source, target) in enumerate(pairs)]
+    return vertices, edges
+
+
+def generate(kind: str, edges: int, seed: int = 0) -> tuple[list[dict[str, Primitive]], list[dict[str, Primitive]]]:
+    """
+    Return the vertex and edge entries of a graph of the kind 'kind' (a key of GENERATORS) with about 'edges' edges.
+    The same arguments always produce the same graph.
+    """
+    n, pairs = GENERATORS[kind](edges, seed)
+    return entries(n, pairs, seed)
+
+
+def build(kind: str, edges: int, seed: int = 0) -> Graph:
+    """
+    Return a Graph named after 'kind' holding the graph generate(kind, edges, seed).
+    """
+    vertextype, edgetype = types()
+    graph = Graph(kind, vertextype, edgetype, [])
+    vertices, edge_entries = generate(kind, edges, seed)
+    graph.insert(vertices, edge_entries)
+    return graph
@@ -0,0 +1,129 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Optional
+
+from databases.database import Database
+from databases.workload import decode, read_trace
+
+PERCENTILES = [50, 90, 99]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Return the q-th percentile of the sorted list 'values' by the nearest-rank method.
+    """
+    return values[max(0, min(len(values), -(-len(values) * q // 100)) - 1)]
+
+
+def _summary(operation: str, latencies: list[float], recorded: list[float], mismatches: int,
+             errors: int) -> dict[str, Any]:
+    latencies, recorded = sorted(latencies), sorted(recorded)
+    record: dict[str, Any] = {"name": operation, "calls": len(latencies), "mismatches": mismatches, "errors": errors,
+                              "seconds": sum(latencies)}
+    for q in PERCENTILES:
+        record[f"p{q}"] = percentile(latencies, q)
+        record[f"recorded p{q}"] = percentile(recorded, q)
+    record["max"] = latencies[-1]
+    return record
+
+
+def replay(path: str, db: Optional[Database] = None, speed: Optional[float] = None) -> list[dict[str, Any]]:
+    """
+    Re-execute the calls of the trace at 'path' (see databases.workload) in order against 'db' (a new Database if
+    None), and return one result record per operation: the number of calls, the total and the PERCENTILES of the
+    replayed and recorded latencies in seconds ("p50", "recorded p50", ...), the maximum replayed latency, the number of
+    calls whose success differs from the recorded one ("mismatches"), which is 0 if the replay is deterministic, and the
+    number of calls that raised ("errors").
+    :param speed: None to issue each call as soon as the previous one returns, or a factor of the original pace, e.g.
+        1.0 to issue each call at its recorded start time, if the previous ones are done by then.
+    """
+    db = Database() if db is None else db
+    latencies: dict[str, list[float]] = {}
+    recorded: dict[str, list[float]] = {}
+    mismatches: dict[str, int] = {}
+    errors: dict[str, int] = {}
+    origin = time.perf_counter()
+    for record in read_trace(path):
+        if speed is not None:
+            delay = record.start / speed - (time.perf_counter() - origin)
+            if delay > 0:
+                time.sleep(delay)
+        method = getattr(db, record.operation)
+        start = time.perf_counter()
+        try:
+            success = method(**decode(record.operation, record.arguments)).success
+        except Exception:
+            success = None
+            errors[record.operation] = errors.get(record.operation, 0) + 1
+        latencies.setdefault(record.operation, []).append(time.perf_counter() - start)
+        recorded.setdefault(record.operation, []).append(record.seconds)
+        mismatches[record.operation] = mismatches.get(record.operation, 0) + (success is not record.success)
+    return [_summary(operation, latencies[operation], recorded[operation], mismatches[operation],
+                     errors.get(operation, 0)) for operation in latencies]
+
+
+def write(records: list[dict[str, Any]], path: str, trace: str):
+    """
+    Write the result records to the JSON file 'path', along with the path of the trace and the Python version and
+    platform.
+    """
+    with open(path, "w") as file:
+        json.dump({"trace": trace, "python": platform.python_version(), "platform": platform.platform(),
+                   "results": records}, file, indent=1)
+
+
+def compare(records: list[dict[str, Any]], baseline: list[dict[str, Any]],
+            tolerance: float = 0.25) -> list[dict[str, Any]]:
+    """
+    Return the regressions of 'records' against 'baseline', the records of a replay of the same trace by another
+    build: a record for every operation whose median or 99th percentile latency is more than 'tolerance' (a fraction)
+    slower, or which has more mismatches or errors, with the baseline and current values.
+    """
+    expected = {record["name"]: record for record in baseline}
+    regressions = []
+    for record in records:
+        previous = expected.get(record["name"])
+        if previous is None:
+            continue
+        slower = [key for key in ("p50", "p99") if record[key] > previous[key] * (1 + tolerance)]
+        worse = [key for key in ("mismatches", "errors") if record[key] > previous[key]]
+        if slower or worse:
+            regressions.append({"name": record["name"], "keys": slower + worse,
+                                "baseline": {key: previous[key] for key in slower + worse},
+                                "current": {key: record[key] for key in slower + worse}})
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command line entry point: python -m benchmarks.replay TRACE [--speed F] [--output PATH] [--baseline PATH]
+    [--tolerance F]. Replays the trace against a new Database at maximum speed unless --speed is given, prints one
+    line per operation and returns 1 if a regression against the baseline is found, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Replay a SQLonGraphs workload trace.")
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float)
+    parser.add_argument("--output", default="replay_output.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    records = replay(args.trace, speed=args.speed)
+    for record in records:
+        print(f"{record['name']:<20} {record['calls']:>8} calls "
+              + " ".join(f"p{q} {record[f'p{q}'] * 1e3:9.3f} ms" for q in PERCENTILES)
+              + f" {record['mismatches']:>6} mismatches {record['errors']:>6} errors")
+    write(records, args.output, args.trace)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(records, json.load(file)["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
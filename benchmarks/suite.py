@@ -0,0 +1,241 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from algorithms.analytics import Analytics
+from algorithms.shortest_paths import dijkstra
+from benchmarks.generators import GENERATORS, build, generate, types
+from constraints.graphwide import GRAPHWIDE_CONSTRAINTS
+from constraints.typewide import BoundTypewideConstraint, TYPEWIDE_CONSTRAINTS
+from graphs.csr import CSRAdjacency
+from graphs.data import Data
+from graphs.graph import Graph
+from queries.planner import plan_reachability
+
+SIZES = [10 ** 3, 10 ** 4]
+LOOKUPS = 1000
+REPEAT = 5
+# the minimum duration of a timed sample, in seconds: faster benchmarks are called several times per sample
+MIN_SAMPLE = 1e-3
+
+# the fields each typewide constraint is bound to, on the vertices ("v") or the edges ("e")
+TYPEWIDE_FIELDS = {
+    "NOTNULL": ("e", ["id", "from", "to"]),
+    "UNIQUE": ("e", ["id"]),
+    "CHECKTYPE_INT": ("e", ["from", "to"]),
+    "CHECKTYPE_FLOAT": ("e", ["weight"]),
+    "CHECKTYPE_BOOL": ("v", ["flag"]),
+    "CHECKTYPE_STR": ("v", ["label"])
+}
+
+
+def measure(name: str, kind: str, size: int, items: int, f: Callable[..., Any],
+            setup: Optional[Callable[[], Any]] = None, repeat: int = REPEAT) -> dict[str, Any]:
+    """
+    Time f() and return its result record: the benchmark name, graph kind and size, the best ("seconds") and median
+    wall time in seconds of 'repeat' samples taken after a warm-up call, the throughput in items per second at the best
+    time and the peak memory allocated by Python during a separate, untimed call, in bytes, traced with tracemalloc.
+    A sample calls f() as many times as it takes to last MIN_SAMPLE seconds, with the garbage collector disabled, and
+    reports the time per call. If f() raises, the record holds the error instead of the measurements.
+    :param setup: if given, it is called before every call of f(), outside of the timed region, and f() is called
+        with its result, e.g. a new Graph to insert into, and every sample is a single call.
+    """
+    call = f if setup is None else lambda: f(setup())
+    record: dict[str, Any] = {"name": name, "kind": kind, "size": size}
+    try:
+        start = time.perf_counter()
+        call()
+        number = 1 if setup is not None else max(1, int(MIN_SAMPLE / max(time.perf_counter() - start, 1e-9)))
+        samples = []
+        # like timeit, the samples aren't interrupted by the garbage collector
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                argument = None if setup is None else setup()
+                start = time.perf_counter()
+                if setup is None:
+                    for _ in range(number):
+                        f()
+                else:
+                    f(argument)
+                samples.append((time.perf_counter() - start) / number)
+        finally:
+            gc.enable()
+        argument = None if setup is None else setup()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        try:
+            f() if setup is None else f(argument)
+            peak = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+    except Exception as exception:
+        record["error"] = f"{type(exception).__name__}: {exception}"
+        return record
+    seconds = min(samples)
+    record |= {"seconds": seconds, "median": statistics.median(samples),
+               "throughput": items / seconds if seconds else float("inf"), "peak": peak}
+    return record
+
+
+def _ingest(kind: str, size: int, seed: int, repeat: int) -> list[dict[str, Any]]:
+    vertices, edges = generate(kind, size, seed)
+    vertextype, edgetype = types()
+    return [measure("Graph.insert", kind, size, len(vertices) + len(edges),
+                    lambda graph: graph.insert(vertices, edges), lambda: Graph(kind, vertextype, edgetype, []),
+                    repeat=repeat),
+            measure("Data.add_entries", kind, size, len(edges), lambda data: data.add_entries(edges),
+                    lambda: Data(edgetype), repeat=repeat)]
+
+
+def _constraints(graph: Graph, kind: str, size: int, repeat: int) -> list[dict[str, Any]]:
+    records = []
+    rows = graph.vertices.size() + graph.edges.size()
+    for name, constraint in GRAPHWIDE_CONSTRAINTS.items():
+        records.append(measure(f"graphwide.{name}", kind, size, rows,
+                               lambda: constraint.check(graph.vertices, graph.edges), repeat=repeat))
+    for name, (side, fields) in TYPEWIDE_FIELDS.items():
+        data = graph.vertices if side == "v" else graph.edges
+        bound = BoundTypewideConstraint(TYPEWIDE_CONSTRAINTS[name], fields)
+        records.append(measure(f"typewide.{name}", kind, size, data.size() * len(fields),
+                               lambda: bound.check(data.values), repeat=repeat))
+    return records
+
+
+def _reads(graph: Graph, kind: str, size: int, seed: int, repeat: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    ids = graph.vertices.ids
+    sample = [rng.choice(ids) for _ in range(LOOKUPS)]
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(LOOKUPS)]
+    return [
+        measure("Graph.edges_from", kind, size, LOOKUPS, lambda: [graph.edges_from(vid) for vid in sample],
+                repeat=repeat),
+        measure("Graph.has_edge", kind, size, LOOKUPS, lambda: [graph.has_edge(a, b) for a, b in pairs], repeat=repeat),
+        measure("Data.get_entry", kind, size, LOOKUPS, lambda: [graph.vertices.get_entry(vid) for vid in sample],
+                repeat=repeat),
+        measure("Graph.csr", kind, size, graph.edges.size(), lambda: CSRAdjacency(graph.vertices, graph.edges),
+                repeat=repeat),
+        measure("dijkstra", kind, size, graph.edges.size(), lambda: dijkstra(graph, ids[0]), repeat=repeat),
+        measure("reachability", kind, size, graph.edges.size(),
+                lambda: plan_reachability(graph, [ids[0]], [ids[-1]]).execute(), repeat=repeat),
+        measure("pagerank", kind, size, 10 * graph.edges.size(),
+                lambda: Analytics(graph).pagerank(max_iterations=10), repeat=repeat)
+    ]
+
+
+def _reorder(graph: Graph, kind: str, size: int, seed: int, repeat: int) -> list[dict[str, Any]]:
+    """
+    Reorder the graph (see Graph.reorder()) and measure the traversals again, to compare with the records of
+    _reads(), which run in insertion order.
+    """
+    rng = random.Random(seed)
+    ids = graph.vertices.ids
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(LOOKUPS)]
+    source = ids[0]
+    records = [measure("Graph.reorder", kind, size, graph.vertices.size() + graph.edges.size(),
+                       lambda: graph.reorder(), repeat=repeat)]
+    graph.csr()
+    return records + [
+        measure("Graph.has_edge (reordered)", kind, size, LOOKUPS, lambda: [graph.has_edge(a, b) for a, b in pairs],
+                repeat=repeat),
+        measure("dijkstra (reordered)", kind, size, graph.edges.size(), lambda: dijkstra(graph, source), repeat=repeat),
+        measure("pagerank (reordered)", kind, size, 10 * graph.edges.size(),
+                lambda: Analytics(graph).pagerank(max_iterations=10), repeat=repeat)
+    ]
+
+
+def run(kinds: Optional[list[str]] = None, sizes: Optional[list[int]] = None, seed: int = 0,
+        repeat: int = REPEAT) -> list[dict[str, Any]]:
+    """
+    Run every benchmark on the generated graphs of each kind in 'kinds' (all of GENERATORS if None) with about each
+    number of edges in 'sizes' (SIZES if None), and return the result records, timed over 'repeat' samples each
+    (see measure()).
+    """
+    records = []
+    for kind in GENERATORS if kinds is None else kinds:
+        for size in SIZES if sizes is None else sizes:
+            records += _ingest(kind, size, seed, repeat)
+            graph = build(kind, size, seed)
+            records += _constraints(graph, kind, size, repeat)
+            records += _reads(graph, kind, size, seed, repeat)
+            records += _reorder(graph, kind, size, seed, repeat)
+    return records
+
+
+def write(records: list[dict[str, Any]], path: str, seed: int = 0):
+    """
+    Write the result records to the JSON file 'path', along with the seed and the Python version and platform.
+    """
+    with open(path, "w") as file:
+        json.dump({"seed": seed, "python": platform.python_version(), "platform": platform.platform(),
+                   "results": records}, file, indent=1)
+
+
+def compare(records: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float = 0.25,
+            floor: float = 1e-3) -> list[dict[str, Any]]:
+    """
+    Return the regressions of 'records' against 'baseline': a record for every benchmark present in both that is
+    more than 'tolerance' (a fraction) and more than 'floor' seconds slower, or that fails in 'records' only, with the
+    baseline and current times. The floor keeps the timing noise of the fastest benchmarks from being reported.
+    """
+    expected = {(record["name"], record["kind"], record["size"]): record for record in baseline}
+    regressions = []
+    for record in records:
+        previous = expected.get((record["name"], record["kind"], record["size"]))
+        if previous is None or "error" in previous:
+            continue
+        if "error" in record or (record["seconds"] > previous["seconds"] * (1 + tolerance) and
+                                 record["seconds"] - previous["seconds"] > floor):
+            regressions.append({"name": record["name"], "kind": record["kind"], "size": record["size"],
+                                "baseline": previous["seconds"], "seconds": record.get("seconds"),
+                                "error": record.get("error")})
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command line entry point: python -m benchmarks.suite [--kinds ...] [--sizes ...] [--seed N] [--repeat N]
+    [--output PATH] [--baseline PATH] [--tolerance F] [--floor SECONDS]. Prints one line per benchmark and returns 1
+    if a regression against the baseline is found, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Run the SQLonGraphs benchmark suite.")
+    parser.add_argument("--kinds", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--floor", type=float, default=1e-3)
+    args = parser.parse_args(argv)
+    records = run(args.kinds, args.sizes, args.seed, args.repeat)
+    for record in records:
+        if "error" in record:
+            print(f"{record['kind']:>16} {record['size']:>9} {record['name']:<34} {record['error']}")
+        else:
+            print(f"{record['kind']:>16} {record['size']:>9} {record['name']:<34} {record['seconds']:10.4f} s "
+                  f"{record['throughput']:14.0f} /s {record['peak'] / 2 ** 20:10.2f} MiB")
+    write(records, args.output, args.seed)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(records, json.load(file)["results"], args.tolerance, args.floor)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,13 @@
 from typing import Callable
 from datatypes.edge import EdgeType, FROM, TO, WEIGHT
-from datatypes.primitive import INT, FLOAT
+from datatypes.primitive import PrimitiveTypes
 from datatypes.raw import ID
 from datatypes.vertex import VertexType
 from graphs.adjacency_matrix import Matrix
 from graphs.data import Data
 from statuses.status import *
 from queue import Queue
+from utilities.instrumentation import INSTRUMENTATION
 
 
 class GraphwideConstraintCheckStatus(LeafStatus):
@@ -39,8 +40,12 @@ class GraphwideConstraint:
             returns true regardless of values of f.
         :return: A Status object showing the result of this operation.
         """
+        probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
         result = True if vertices.size() == 0 and edges.size() == 0 else self.f(vertices, edges)
-        return GraphwideConstraintCheckStatus(self.name, result)
+        status = GraphwideConstraintCheckStatus(self.name, result)
+        if probe is not None:
+            INSTRUMENTATION.stop("graphwide." + self.name, probe, len(vertices.ids) + len(edges.ids), status)
+        return status
 
 
 def DIRECTED_f(vertices: Data, edges: Data):
@@ -52,13 +57,14 @@ def DIRECTED_f(vertices: Data, edges: Data):
 
 def REFERENTIAL_INTEGRITY_f(vertices: Data, edges: Data):
     """
-    Checks whether every edge in edges refers to two valid vertices in vertices.
+    Checks whether every edge in edges refers to two valid vertices in vertices. Deleted rows are ignored.
     """
-    for value in edges.values[FROM]:
-        if value not in vertices.values[ID]:
+    ids = set(vertices.live(ID))
+    for value in edges.live(FROM):
+        if value not in ids:
             return False
-    for value in edges.values[TO]:
-        if value not in vertices.values[ID]:
+    for value in edges.live(TO):
+        if value not in ids:
             return False
     return True
 
@@ -96,7 +102,7 @@ def WEIGHTED_f(vertices: Data, edges: Data):
     Checks if the graph has an attribute named weight with type INT or FLOAT
     """
     return (WEIGHT in edges.datatype.names and
-            (edges.datatype.types[WEIGHT] == INT or edges.datatype.types[WEIGHT] == FLOAT))
+            edges.datatype.types[WEIGHT] in (PrimitiveTypes.INT, PrimitiveTypes.FLOAT))
 
 
 def UNWEIGHTED_f(vertices: Data, edges: Data):
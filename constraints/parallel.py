@@ -0,0 +1,260 @@
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+import time
+from itertools import islice
+from typing import Collection, Optional
+
+from constraints.typewide import *
+from datatypes.primitive import Primitive
+from graphs.data import Data
+from statuses.status import *
+from utilities.instrumentation import INSTRUMENTATION, Metric
+from utilities.memory import SpilledColumn
+
+FORK = "fork" in multiprocessing.get_all_start_methods()
+
+_TASK: Optional[tuple] = None
+_TASK_LOCK = threading.Lock()
+
+
+def _fork_pool(task: tuple, processes: int) -> multiprocessing.pool.Pool:
+    """
+    Start a pool of 'processes' forked workers which see 'task' as _TASK, sharing its memory with the calling process
+    copy-on-write.
+    """
+    global _TASK
+    with _TASK_LOCK:
+        _TASK = task
+        try:
+            return multiprocessing.get_context("fork").Pool(processes)
+        finally:
+            _TASK = None
+
+
+def _check(i: int) -> tuple[int, Optional[Status], Optional[Exception], dict[str, Metric]]:
+    """
+    Check the i-th constraint of _TASK in a worker process, which inherited _TASK from the scheduler when it was
+    forked, and return the metrics instrumented meanwhile along with the result.
+    """
+    constraints, vertices, edges = _TASK
+    try:
+        return i, constraints[i].check(vertices, edges), None, INSTRUMENTATION.drain()
+    except Exception as exception:
+        return i, None, exception, INSTRUMENTATION.drain()
+
+
+def _ready(i: int) -> int:
+    return i
+
+
+class GraphwideScheduler:
+    """
+    Checks the GraphwideConstraints of a Graph concurrently, one constraint per task, in a pool of worker processes.
+    The workers are forked for each check, after the graph is in place, so they share the memory of its columns and
+    adjacency with the calling process copy-on-write and nothing is pickled but the resulting Statuses and the metrics
+    instrumented in the workers, which are merged into INSTRUMENTATION. If fail_fast is set, the workers are
+    terminated as soon as a constraint fails, and the constraints not checked yet are reported as cancelled.
+    Forking a pool costs more than checking a small graph, so unless min_rows is set, the constraints are checked
+    in parallel only once the time saved by spreading them over the workers and CPUs, estimated from the measured
+    cost of the sequential checks, exceeds the measured cost of starting and stopping a pool. Single constraints, platforms
+    without fork and graphs with spilled columns are checked sequentially, in order: forking copies the locks held by
+    other threads as they are, and while the workers reset those of INSTRUMENTATION and RESULT_CACHE, the lock of a
+    utilities.memory.SpilledColumn could stay held forever in a worker.
+    Attributes:
+        processes: the maximum number of worker processes.
+        fail_fast: whether to stop checking once a constraint fails.
+        min_rows: the number of vertices plus edges from which the constraints are checked in parallel, or None to
+            decide from the measured costs.
+        row_seconds: the measured seconds per vertex or edge of checking the constraints sequentially, or None until
+            measured.
+        startup: the measured seconds to start and stop a pool, or None until measured.
+    """
+
+    def __init__(self, processes: Optional[int] = None, fail_fast: bool = True, min_rows: Optional[int] = None):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.fail_fast = fail_fast
+        self.min_rows = min_rows
+        self.row_seconds: Optional[float] = None
+        self.startup: Optional[float] = None
+
+    def _parallel(self, constraints: list, vertices: Data, edges: Data) -> bool:
+        """
+        Return whether to check 'constraints' in a pool.
+        """
+        processes = min(self.processes, len(constraints))
+        if processes < 2 or not FORK or any(isinstance(column, SpilledColumn) for data in (vertices, edges)
+                                            for column in data.values.values()):
+            return False
+        rows = len(vertices.ids) + len(edges.ids)
+        if self.min_rows is not None:
+            return rows >= self.min_rows
+        if self.row_seconds is None:
+            return False
+        saved = self.row_seconds * rows * (1 - 1 / min(processes, os.cpu_count() or 1))
+        if self.startup is None and saved > 0:
+            start = time.perf_counter()
+            pool = multiprocessing.get_context("fork").Pool(processes)
+            try:
+                pool.map(_ready, range(processes))
+            finally:
+                pool.terminate()
+                pool.join()
+            self.startup = time.perf_counter() - start
+        return self.startup is not None and saved > self.startup
+
+    @staticmethod
+    def _measure(previous: Optional[float], seconds: float) -> float:
+        return seconds if previous is None else (previous + seconds) / 2
+
+    def check(self, constraints: list, vertices: Data, edges: Data) -> tuple[list[Status], list[str]]:
+        """
+        Check 'constraints' against 'vertices' and 'edges'.
+        :return: the Statuses of the constraints checked, in the order of 'constraints', and the names of the
+            constraints cancelled because another one failed.
+        """
+        results: dict[int, Status] = {}
+        if not self._parallel(constraints, vertices, edges):
+            start = time.perf_counter()
+            for i, constraint in enumerate(constraints):
+                results[i] = constraint.check(vertices, edges)
+                if self.fail_fast and not results[i].success:
+                    break
+            rows = len(vertices.ids) + len(edges.ids)
+            if rows and len(results) == len(constraints):
+                self.row_seconds = self._measure(self.row_seconds, (time.perf_counter() - start) / rows)
+        else:
+            start = time.perf_counter()
+            pool = _fork_pool((constraints, vertices, edges), min(self.processes, len(constraints)))
+            startup = time.perf_counter() - start
+            try:
+                for i, status, exception, metrics in pool.imap_unordered(_check, range(len(constraints))):
+                    INSTRUMENTATION.merge(metrics)
+                    if exception is not None:
+                        raise exception
+                    results[i] = status
+                    if self.fail_fast and not status.success:
+                        break
+            finally:
+                start = time.perf_counter()
+                pool.terminate()
+                pool.join()
+                self.startup = self._measure(self.startup, startup + time.perf_counter() - start)
+        cancelled = [getattr(constraints[i], "name", type(constraints[i]).__name__)
+                     for i in range(len(constraints)) if i not in results]
+        return [results[i] for i in sorted(results)], cancelled
+
+
+def _first_rows(column: list[Primitive], start: int, existing: Collection[Primitive]) -> tuple[dict, list[int]]:
+    """
+    Return a dictionary mapping each value of 'column', a chunk of a column beginning at row 'start', that isn't in
+    'existing' to its first row, and the other rows.
+    """
+    first: dict[Primitive, int] = {}
+    repeated: list[int] = []
+    for row, value in enumerate(column, start):
+        if value in existing or first.setdefault(value, row) != row:
+            repeated.append(row)
+    return first, repeated
+
+
+def _validate(chunk: tuple[int, int], task: Optional[tuple] = None) -> list:
+    """
+    Check the rows start <= row < stop of the deltas of 'task' against each of its constraints. For a UNIQUE
+    constraint, the result is the _first_rows() of each of its columns; for another local constraint, the rows
+    violating it; for a constraint that isn't local, None, since it must see every value.
+    :param task: the (constraints, deltas, existing) to check, or None in a worker process, which inherited it as
+        _TASK from the scheduler when it was forked.
+    """
+    constraints, deltas, existing = _TASK if task is None else task
+    start, stop = chunk
+    results = []
+    for bound_constraint in constraints:
+        constraint = bound_constraint.constraint
+        columns = [deltas[name][start:stop] for name in bound_constraint.names]
+        if constraint is TYPEWIDE_CONSTRAINTS["UNIQUE"]:
+            results.append([_first_rows(column, start, existing[name])
+                            for name, column in zip(bound_constraint.names, columns)])
+        elif not constraint.is_local:
+            results.append(None)
+        elif constraint.f(columns):
+            results.append([])
+        else:
+            results.append([row for row, values in enumerate(zip(*columns), start)
+                            if not constraint.f([[value] for value in values])])
+    return results
+
+
+class TypewideScheduler:
+    """
+    Checks the BoundTypewideConstraints of a Vertex- or EdgeType against a batch of inserted entries in chunks of
+    rows, in a pool of worker processes forked after the batch is in place so that they share its columns with the
+    calling process copy-on-write (see GraphwideScheduler). The local constraints are checked row by row within each
+    chunk. For UNIQUE, each chunk collects its keys that aren't already in the Data object, from an index of the
+    existing keys if one is given, and the keys of the chunks are then merged in order. The other constraints are
+    checked against every value in the calling process. A failing constraint reports the offsets of the violating
+    entries in the batch in its context "Rows". Batches smaller than min_rows are checked the same way in the calling
+    process, in a single chunk.
+    Attributes:
+        processes: the maximum number of worker processes.
+        chunk_rows: the number of rows in each chunk.
+        min_rows: the number of inserted rows from which the chunks are checked in parallel.
+    """
+
+    def __init__(self, processes: Optional[int] = None, chunk_rows: int = 100000, min_rows: int = 200000):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.chunk_rows = chunk_rows
+        self.min_rows = min_rows
+
+    def check(self, constraints: list[BoundTypewideConstraint], values: dict[str, list[Primitive]],
+              deltas: dict[str, list[Primitive]],
+              keys: Optional[dict[str, Collection[Primitive]]] = None) -> list[Status]:
+        """
+        Check 'constraints' against 'values', the columns of a Data object ending with the inserted rows 'deltas'.
+        :param keys: a dictionary mapping field names to the collection of their values in the rows before 'deltas',
+            e.g. {ID: Data.positions}. The values of the other fields are collected from 'values'.
+        :return: the Status of each constraint, in order.
+        """
+        keys = {} if keys is None else keys
+        size = len(next(iter(deltas.values()), []))
+        existing: dict[str, Collection[Primitive]] = {}
+        for bound_constraint in constraints:
+            if bound_constraint.constraint is TYPEWIDE_CONSTRAINTS["UNIQUE"]:
+                for name in bound_constraint.names:
+                    if name not in existing:
+                        existing[name] = (keys[name] if name in keys else
+                                          set(islice(values[name], len(values[name]) - size)))
+        chunks = [(start, min(start + self.chunk_rows, size)) for start in range(0, size, self.chunk_rows)] or [(0, 0)]
+        task = (constraints, deltas, existing)
+        if size < self.min_rows or self.processes < 2 or len(chunks) < 2 or not FORK:
+            results = [_validate((0, size), task)]
+        else:
+            pool = _fork_pool(task, min(self.processes, len(chunks)))
+            try:
+                results = pool.map(_validate, chunks)
+            finally:
+                pool.terminate()
+                pool.join()
+        statuses = []
+        for i, bound_constraint in enumerate(constraints):
+            if results[0][i] is None:
+                statuses.append(bound_constraint.check(values))
+                continue
+            if bound_constraint.constraint is TYPEWIDE_CONSTRAINTS["UNIQUE"]:
+                rows = []
+                for column in range(len(bound_constraint.names)):
+                    merged: set[Primitive] = set()
+                    for result in results:
+                        first, repeated = result[i][column]
+                        rows += repeated
+                        rows += [row for value, row in first.items() if value in merged]
+                        merged.update(first)
+            else:
+                rows = [row for result in results for row in result[i]]
+            status = BoundTypewideConstraintStatusWrapper(
+                TypewideConstraintCheckStatus(bound_constraint.constraint.name, not rows), list(bound_constraint.names))
+            if rows:
+                status["Rows"] = sorted(set(rows))
+            statuses.append(status)
+        return statuses
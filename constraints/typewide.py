@@ -1,6 +1,7 @@
-from typing import Callable
+from typing import Callable, Collection
 from datatypes.primitive import *
 from statuses.status import *
+from utilities.instrumentation import INSTRUMENTATION
 
 
 class TypewideConstraintCheckStatus(LeafStatus):
@@ -118,5 +119,24 @@ class BoundTypewideConstraint:
         self.names = names
 
     def check(self, values: dict[str, list[Primitive]]) -> Status:
+        probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
         param = list(map(lambda x: values[x], self.names))
-        return BoundTypewideConstraintStatusWrapper(self.constraint.check(param), list(self.names))
+        status = BoundTypewideConstraintStatusWrapper(self.constraint.check(param), list(self.names))
+        if probe is not None:
+            INSTRUMENTATION.stop("typewide." + self.constraint.name, probe, sum(map(len, param)), status)
+        return status
+
+    def check_unique(self, deltas: dict[str, list[Primitive]], existing: dict[str, Collection[Primitive]]) -> Status:
+        """
+        Check a UNIQUE constraint against the changed rows only: the values of each field in 'deltas' must differ from
+        each other and from existing[field], the collection of the values of the field in the other rows.
+        """
+        probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
+        param = list(map(lambda x: deltas[x], self.names))
+        success = self.constraint.f(param) and not any(value in existing[name] for name, values in
+                                                       zip(self.names, param) for value in values)
+        status = BoundTypewideConstraintStatusWrapper(TypewideConstraintCheckStatus(self.constraint.name, success),
+                                                      list(self.names))
+        if probe is not None:
+            INSTRUMENTATION.stop("typewide." + self.constraint.name, probe, sum(map(len, param)), status)
+        return status
@@ -0,0 +1,140 @@
+import asyncio
+from typing import Callable, Optional
+
+from databases.database import Database, DatabaseOperationStatus, DB, GRAPH
+from datatypes.primitive import Primitive
+from datatypes.raw import ID
+from graphs.graph import Graph
+from graphs.snapshot import Snapshot
+from statuses.status import *
+
+
+class AsyncBatchStatus(LeafStatus):
+    def __init__(self, size: int, vertex_ids: list[Primitive], edge_ids: list[Primitive]):
+        super().__init__("Statement Committed in a Batch",
+                         "",
+                         True,
+                         {"Batch Size": size, "Vertex ids": vertex_ids, "Edge ids": edge_ids})
+
+
+class _Statement:
+    """
+    An insertion waiting in a batch.
+    """
+    __slots__ = ["lineno", "vertices", "edges", "future"]
+
+    def __init__(self, lineno: int, vertices: list[dict[str, Primitive]], edges: list[dict[str, Primitive]],
+                 future: asyncio.Future):
+        self.lineno = lineno
+        self.vertices = vertices
+        self.edges = edges
+        self.future = future
+
+
+class AsyncDatabase:
+    """
+    An asyncio interface to a Database. Insertions into the same Graph awaited concurrently within a short window are
+    coalesced into a single Database.insert_graph() call, so the constraints of the Graph are checked once per batch
+    instead of once per statement. If the batch fails, it is split in halves which are inserted in order, recursively,
+    until the failing statements are isolated: every other statement is still committed, and every caller receives the
+    Status of its own statement. Since the statements of a batch are concurrent, no order between them is guaranteed.
+    Database calls run in a worker thread, so the event loop isn't blocked by constraint checks.
+    Attributes:
+        db: the Database.
+        window: the number of seconds an insertion waits for others to join its batch.
+        max_batch: the number of statements at which a batch is flushed without waiting for the window to end.
+        batches: the number of batches flushed.
+    """
+
+    def __init__(self, db: Database = DB, window: float = 0.002, max_batch: int = 1000):
+        self.db = db
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self._pending: dict[str, list[_Statement]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._flushing: set[asyncio.Task] = set()
+
+    async def insert_graph(self, name: str, lineno: int, vertices: Optional[list[dict[str, Primitive]]] = None,
+                           edges: Optional[list[dict[str, Primitive]]] = None) -> Status:
+        """
+        Insert vertices and edges into the Graph named 'name' as part of a batch (see Database.insert_graph()).
+        """
+        loop = asyncio.get_running_loop()
+        statement = _Statement(lineno, [] if vertices is None else vertices, [] if edges is None else edges,
+                               loop.create_future())
+        pending = self._pending.setdefault(name, [])
+        pending.append(statement)
+        if len(pending) >= self.max_batch:
+            self._flush(name)
+        elif name not in self._timers:
+            self._timers[name] = loop.call_later(self.window, self._flush, name)
+        return await statement.future
+
+    async def read_graph(self, name: str, reader: Callable[[Graph], Status], lineno: int) -> Status:
+        """
+        See Database.read_graph().
+        """
+        return await asyncio.to_thread(self.db.read_graph, name, reader, lineno)
+
+    async def read_snapshot(self, name: str, reader: Callable[[Snapshot], Status], lineno: int) -> Status:
+        """
+        See Database.read_snapshot().
+        """
+        return await asyncio.to_thread(self.db.read_snapshot, name, reader, lineno)
+
+    async def flush(self):
+        """
+        Flush every pending batch without waiting for its window to end, and wait until all batches are inserted.
+        """
+        for name in list(self._pending):
+            self._flush(name)
+        while self._flushing:
+            await asyncio.gather(*self._flushing)
+
+    def _flush(self, name: str):
+        timer = self._timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(name, [])
+        if batch:
+            self.batches += 1
+            task = asyncio.get_running_loop().create_task(self._run(name, batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _run(self, name: str, batch: list[_Statement]):
+        try:
+            statuses = await asyncio.to_thread(self._insert, name, batch)
+        except Exception as exception:
+            for statement in batch:
+                if not statement.future.done():
+                    statement.future.set_exception(exception)
+            return
+        for statement, status in zip(batch, statuses):
+            if not statement.future.done():
+                statement.future.set_result(status)
+
+    @staticmethod
+    def _batch_status(size: int, statement: _Statement) -> Status:
+        return AsyncBatchStatus(size, [vertex.get(ID) for vertex in statement.vertices],
+                                [edge.get(ID) for edge in statement.edges])
+
+    def _insert(self, name: str, batch: list[_Statement]) -> list[Status]:
+        """
+        Insert the statements of 'batch' in a single call, bisecting the batch if it fails. Return the Status of each
+        statement.
+        """
+        vertices = [vertex for statement in batch for vertex in statement.vertices]
+        edges = [edge for statement in batch for edge in statement.edges]
+        status = self.db.insert_graph(name, batch[0].lineno, vertices, edges)
+        if len(batch) == 1:
+            return [status]
+        if status.success:
+            # The Status of the batch covers the rows of every statement, so each one gets a Status of its own rows.
+            return [DatabaseOperationStatus("INSERT INTO", [self._batch_status(len(batch), statement)], name,
+                                            statement.lineno) for statement in batch]
+        if self.db.catalog.kind(name) != GRAPH:
+            return [self.db.insert_graph(name, statement.lineno) for statement in batch]
+        middle = len(batch) // 2
+        return self._insert(name, batch[:middle]) + self._insert(name, batch[middle:])
@@ -1,12 +1,20 @@
-from typing import Optional
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
 
 from constraints.graphwide import GraphwideConstraint
 from constraints.typewide import TypewideConstraint, BoundTypewideConstraint
-from datatypes.edge import EdgeType
+from databases.workload import WorkloadRecorder, recorded
+from datatypes.edge import EdgeType, FROM, TO
 from datatypes.primitive import PrimitiveTypes, Primitive
+from datatypes.raw import ID
 from datatypes.vertex import VertexType
-from graphs.graph import Graph
+from graphs.graph import Graph, GraphOrderingStatus
+from graphs.snapshot import Snapshot
+from graphs.store import VertexStore
 from statuses.status import *
+from utilities.locks import ReadWriteLock, READ, WRITE
 
 
 class DatabaseNameNoDuplicatesStatus(LeafStatus):
@@ -20,7 +28,7 @@ class DatabaseNameNoDuplicatesStatus(LeafStatus):
 class DatabaseNameExistsStatus(LeafStatus):
     def __init__(self, success: bool, name: str, lineno: int):
         super().__init__("Name for the Database Object Found",
-                         "Duplicated Name Found for Another Database Object",
+                         "No Database Object of the Required Kind has this Name",
                          success,
                          {"name": name, "lineno": lineno})
 
@@ -36,18 +44,94 @@ class DatabaseOperationStatus(DerivedStatus):
 class DatabaseDatatypeDependencyStatus(LeafStatus):
     def __init__(self, type_name: str, subject_name: str):
         super().__init__("",
-                         "Cannot Modify a Vertex- or EdgeType that is referenced by Another Database Object",
+                         "Cannot Modify a Vertex- or EdgeType or a Forked Graph that is referenced by Another Database Object",
                          False,
                          {"Type Name": type_name, "Name of Object Referenced": subject_name})
 
 
+EDGETYPE = "EDGETYPE"
+VERTEXTYPE = "VERTEXTYPE"
+GRAPH = "GRAPH"
+
+
+class Catalog:
+    """
+    The namespace of a Database: every object name is hashed to its kind, and the references between objects form an
+    explicit dependency graph, so checking whether a name is used or whether an object is referenced takes constant
+    time regardless of the number of objects.
+    Attributes:
+        kinds: a dictionary mapping the name of each database object to its kind (EDGETYPE, VERTEXTYPE or GRAPH).
+        dependencies: a dictionary mapping the name of each object to the names of the objects it references, e.g. a
+            Graph references its VertexType and EdgeType.
+        dependents: a dictionary mapping the name of each object to the set of names of the objects referencing it.
+    """
+
+    def __init__(self):
+        self.kinds: dict[str, str] = {}
+        self.dependencies: dict[str, list[str]] = {}
+        self.dependents: dict[str, set[str]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.kinds
+
+    def add(self, name: str, kind: str, dependencies: Optional[list[str]] = None):
+        """
+        Register a new object named 'name' referencing the objects named in 'dependencies', which must exist.
+        """
+        dependencies = [] if dependencies is None else dependencies
+        self.kinds[name] = kind
+        self.dependencies[name] = dependencies
+        self.dependents[name] = set()
+        for dependency in dependencies:
+            self.dependents[dependency].add(name)
+
+    def remove(self, name: str):
+        """
+        Unregister the object named 'name', which must exist and have no dependents.
+        """
+        del self.kinds[name]
+        del self.dependents[name]
+        for dependency in self.dependencies.pop(name):
+            self.dependents[dependency].discard(name)
+
+    def kind(self, name: str) -> Optional[str]:
+        """
+        Return the kind of the object named 'name', or None if there is no such object.
+        """
+        return self.kinds.get(name)
+
+    def has_dependents(self, name: str) -> bool:
+        """
+        Return whether another object references the object named 'name'.
+        """
+        return bool(self.dependents.get(name))
+
+
 class Database:
     """
     A singleton collection of all objects in a SQLonGraphs program. Handles all interaction between the frontend and backend.
+    The Database is safe to use from several threads: DDL operations (CREATE and DROP) hold the catalog lock for
+    writing, and operations on a Graph hold the catalog lock for reading while they acquire the lock of the Graph, which
+    is held for reading by reads (see self.read_graph()) and for writing by insertions. Reads of a Graph thus proceed in
+    parallel with each other and with writes to other Graphs, while writes to the same Graph are serialized.
     Attributes:
         edgetypes: a dictionary mapping the names of EdgeTypes to the object with this name.
         vertextypes: a dictionary mapping the names of VertexTypes to the object with this name.
         graphs: a dictionary mapping the names of Graphs to the object with this name.
+        catalog: the Catalog of the names of all the above objects and of the dependencies between them.
+        catalog_lock: the ReadWriteLock protecting the catalog.
+        locks: a dictionary mapping the name of each Graph to the ReadWriteLock protecting it.
+        compaction_threshold: the fraction of deleted rows of a Graph above which self.delete_graph() starts compacting
+            it in the background (see self.compact_graph()).
+        compactions: a dictionary mapping the name of each Graph being compacted in the background to the thread
+            compacting it.
+        stores: a dictionary mapping the name of each VertexType to the VertexStore shared by the Graphs created over
+            it with shared=True, until the last of them is dropped.
+        memory_budget: the number of bytes of memory the Graphs and VertexStores may hold (see self.memory()), above
+            which insertions and updates spill the least recently read attribute columns to disk (see
+            self.enforce_budget()), or None for no limit.
+        spill_directory: the directory of the files of the spilled columns, or None for a temporary directory.
+        recorder: the WorkloadRecorder tracing the calls that create, insert into and drop objects, or None.
     """
 
     def __init__(self):
@@ -57,10 +141,110 @@ class Database:
         self.edgetypes: dict[str, EdgeType] = {}
         self.vertextypes: dict[str, VertexType] = {}
         self.graphs: dict[str, Graph] = {}
+        self.catalog = Catalog()
+        self.catalog_lock = ReadWriteLock()
+        self.locks: dict[str, ReadWriteLock] = {}
+        self.compaction_threshold = 0.25
+        self.compactions: dict[str, threading.Thread] = {}
+        self._compactions_lock = threading.Lock()
+        self.stores: dict[str, VertexStore] = {}
+        self.memory_budget: Optional[int] = None
+        self.recorder: Optional[WorkloadRecorder] = None
+        self.spill_directory: Optional[str] = None
 
     def names(self) -> list[str]:
-        return list(self.edgetypes.keys()) + list(self.vertextypes.keys()) + list(self.edgetypes.keys())
+        """
+        Return the names of all database objects. Use 'name in self.catalog' to check whether a name is used.
+        """
+        with self.catalog_lock.read():
+            return list(self.catalog.kinds)
+
+    @contextmanager
+    def graph_lock(self, name: str, mode: str = READ) -> Iterator[Optional[Graph]]:
+        """
+        Hold the lock of the Graph named 'name' in 'mode' (READ or WRITE) for the duration of a with block, which
+        receives the Graph, or None (without locking anything) if there is no such Graph. The catalog lock is only
+        held to look the lock up, so waiting for the Graph doesn't hold up the operations on the other Graphs.
+        """
+        while True:
+            with self.catalog_lock.read():
+                lock = self.locks.get(name)
+            if lock is None:
+                yield None
+                return
+            lock.acquire_read() if mode == READ else lock.acquire_write()
+            # The Graph may have been dropped, and its name reused, while waiting for its lock. Dropping a Graph
+            # removes its lock from self.locks before waiting for it, so the catalog lock mustn't be taken here.
+            graph = self.graphs.get(name)
+            if self.locks.get(name) is lock and graph is not None:
+                break
+            lock.release_read() if mode == READ else lock.release_write()
+        try:
+            yield graph
+        finally:
+            lock.release_read() if mode == READ else lock.release_write()
+
+    def lock_metrics(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Return the waiting times of the catalog lock (under the name "catalog") and of the lock of each Graph, as a
+        dictionary mapping each name to LockMetrics.stats().
+        """
+        with self.catalog_lock.read():
+            metrics = {name: lock.metrics.stats() for name, lock in self.locks.items()}
+        return {"catalog": self.catalog_lock.metrics.stats()} | metrics
+
+    def memory(self) -> dict[str, Any]:
+        """
+        Estimate the memory held by the Database, in bytes: "Graphs" maps the name of each Graph to Graph.memory(),
+        "Vertex Stores" the name of the VertexType of each VertexStore to VertexStore.memory(), "Total" sums them and
+        "Budget" is self.memory_budget.
+        """
+        with self.catalog_lock.read():
+            graphs = {name: graph.memory() for name, graph in self.graphs.items()}
+            stores = {name: store.memory() for name, store in self.stores.items()}
+        total = sum(usage["Total"] for usage in graphs.values()) + sum(usage["Total"] for usage in stores.values())
+        return {"Graphs": graphs, "Vertex Stores": stores, "Total": total, "Budget": self.memory_budget}
+
+    def enforce_budget(self) -> int:
+        """
+        Spill attribute columns of the Graphs to disk (see Data.spill()), least recently read first, until the memory
+        held fits self.memory_budget. Id, from and to columns are never spilled, and neither are the vertices of a
+        shared VertexStore. Each Graph is locked for writing while one of its columns is spilled, without holding the
+        catalog lock (see self.graph_lock()).
+        :return: the number of columns spilled.
+        """
+        if self.memory_budget is None:
+            return 0
+        usage = self.memory()
+        excess = usage["Total"] - self.memory_budget
+        if excess <= 0:
+            return 0
+        candidates = []
+        for name, graph_usage in usage["Graphs"].items():
+            for side in ("Vertices", "Edges"):
+                for field_name, size in graph_usage[side]["Columns"].items():
+                    if field_name not in (ID, FROM, TO):
+                        candidates.append((name, side, field_name, size))
+        spilled = 0
+        if self.spill_directory is None:
+            self.spill_directory = tempfile.mkdtemp(prefix="sqlongraphs-")
+        with self.catalog_lock.read():
+            graphs = {name: self.graphs.get(name) for name in usage["Graphs"]}
+        data = lambda graph, side: graph.vertices if side == "Vertices" else graph.edges
+        candidates = [candidate for candidate in candidates if graphs[candidate[0]] is not None]
+        candidates.sort(key=lambda candidate: (data(graphs[candidate[0]], candidate[1]).accessed.get(candidate[2], 0.0),
+                                               -candidate[3]))
+        for name, side, field_name, size in candidates:
+            if excess <= 0:
+                break
+            with self.graph_lock(name, WRITE) as graph:
+                # skip the Graph if it was dropped, or replaced by another one with the same name, meanwhile
+                if graph is graphs[name] and data(graph, side).spill(field_name, self.spill_directory):
+                    excess -= size
+                    spilled += 1
+        return spilled
 
+    @recorded
     def create_edgetype(self, name: str, names: list[str], types: dict[str, PrimitiveTypes],
                         constraints: tuple[TypewideConstraint, list[str]], lineno: int) -> Status:
         """
@@ -71,13 +255,16 @@ class Database:
         """
         bounded = [BoundTypewideConstraint(constraint, fields) for constraint, fields in constraints]
         edgetype = EdgeType(name, names, types, bounded)
-        name_status = DatabaseNameNoDuplicatesStatus(name in self.names(), name, lineno)
-        check_status = edgetype.check_constraints({})
-        status = DatabaseOperationStatus("CREATE EDGETYPE", [name_status, check_status], name, lineno)
-        if status.success:
-            self.edgetypes[name] = edgetype
+        check_status = edgetype.check_constraints({field_name: [] for field_name in names})
+        with self.catalog_lock.write():
+            name_status = DatabaseNameNoDuplicatesStatus(name not in self.catalog, name, lineno)
+            status = DatabaseOperationStatus("CREATE EDGETYPE", [name_status, check_status], name, lineno)
+            if status.success:
+                self.edgetypes[name] = edgetype
+                self.catalog.add(name, EDGETYPE)
         return status
 
+    @recorded
     def create_vertextype(self, name: str, names: list[str], types: dict[str, PrimitiveTypes],
                           constraints: dict[TypewideConstraint, list[str]], lineno: int) -> Status:
         """
@@ -88,56 +275,232 @@ class Database:
         """
         bounded = [BoundTypewideConstraint(constraint, fields) for constraint, fields in constraints]
         vertextype = VertexType(name, names, types, bounded)
-        name_status = DatabaseNameNoDuplicatesStatus(name in self.names(), name, lineno)
-        check_status = vertextype.check_constraints({})
-        status = DatabaseOperationStatus("CREATE VERTEXTYPE", [name_status, check_status], name, lineno)
-        if status.success:
-            self.vertextypes[name] = vertextype
+        check_status = vertextype.check_constraints({field_name: [] for field_name in names})
+        with self.catalog_lock.write():
+            name_status = DatabaseNameNoDuplicatesStatus(name not in self.catalog, name, lineno)
+            status = DatabaseOperationStatus("CREATE VERTEXTYPE", [name_status, check_status], name, lineno)
+            if status.success:
+                self.vertextypes[name] = vertextype
+                self.catalog.add(name, VERTEXTYPE)
         return status
 
+    @recorded
     def create_graph(self, name: str, edgetype_name: str, vertextype_name: str,
-                     constraints: list[GraphwideConstraint], lineno: int) -> Status:
-        graph_name_status = DatabaseNameNoDuplicatesStatus(name in self.names(), name, lineno)
-        edgetype_name_status = DatabaseNameExistsStatus(name in self.names(), name, lineno)
-        vertextype_name_status = DatabaseNameExistsStatus(name in self.names(), name, lineno)
-        status = DatabaseOperationStatus("CREATE GRAPH",
-                                         [graph_name_status, edgetype_name_status, vertextype_name_status], name,
-                                         lineno)
-        if status.success:
-            self.graphs[name] = Graph(name, self.vertextypes[vertextype_name], self.edgetypes[edgetype_name],
-                                      constraints)
+                     constraints: list[GraphwideConstraint], lineno: int, shared: bool = False) -> Status:
+        """
+        Create a Graph named 'name' over the given Edge- and VertexType.
+        :param shared: if True, the vertices of the graph are stored in the VertexStore of its VertexType, shared with
+            the other graphs created with shared=True over the same VertexType, each of which keeps only a membership
+            bitmap of the store (see graphs.store.VertexStore).
+        """
+        with self.catalog_lock.write():
+            graph_name_status = DatabaseNameNoDuplicatesStatus(name not in self.catalog, name, lineno)
+            edgetype_name_status = DatabaseNameExistsStatus(self.catalog.kind(edgetype_name) == EDGETYPE,
+                                                            edgetype_name, lineno)
+            vertextype_name_status = DatabaseNameExistsStatus(self.catalog.kind(vertextype_name) == VERTEXTYPE,
+                                                              vertextype_name, lineno)
+            status = DatabaseOperationStatus("CREATE GRAPH",
+                                             [graph_name_status, edgetype_name_status, vertextype_name_status], name,
+                                             lineno)
+            if status.success:
+                vertextype = self.vertextypes[vertextype_name]
+                store = self.stores.setdefault(vertextype_name, VertexStore(vertextype)) if shared else None
+                self.graphs[name] = Graph(name, vertextype, self.edgetypes[edgetype_name], constraints, store)
+                self.locks[name] = ReadWriteLock()
+                self.catalog.add(name, GRAPH, [vertextype_name, edgetype_name])
+        return status
+
+    @recorded
+    def fork_graph(self, name: str, fork_name: str, lineno: int) -> Status:
+        """
+        Create a Graph named 'fork_name' as a copy-on-write fork of the Graph named 'name' (see Graph.fork()), which
+        can't be dropped while the fork exists. The fork is applied to its parent by self.merge_graph(), or discarded by
+        self.drop().
+        """
+        with self.catalog_lock.write():
+            fork_name_status = DatabaseNameNoDuplicatesStatus(fork_name not in self.catalog, fork_name, lineno)
+            graph_name_status = DatabaseNameExistsStatus(self.catalog.kind(name) == GRAPH, name, lineno)
+            status = DatabaseOperationStatus("FORK GRAPH", [fork_name_status, graph_name_status], fork_name, lineno)
+            if status.success:
+                with self.locks[name].read():
+                    self.graphs[fork_name] = self.graphs[name].fork(fork_name)
+                self.locks[fork_name] = ReadWriteLock()
+                self.catalog.add(fork_name, GRAPH, self.catalog.dependencies[name] + [name])
+        return status
+
+    @recorded
+    def merge_graph(self, fork_name: str, lineno: int) -> Status:
+        """
+        Insert the vertices and edges inserted into the fork named 'fork_name' into the Graph it was forked from (see
+        Graph.merge()), and drop the fork if the insertion succeeds.
+        """
+        with self.catalog_lock.write():
+            fork = self.graphs.get(fork_name)
+            parent = fork.parent if fork is not None else None
+            fork_name_status = DatabaseNameExistsStatus(parent is not None, fork_name, lineno)
+            if not fork_name_status.success:
+                return DatabaseOperationStatus("MERGE GRAPH", [fork_name_status], fork_name, lineno)
+            with self.locks[parent.name].write(), self.locks[fork_name].write():
+                status = DatabaseOperationStatus("MERGE GRAPH", [parent.merge(fork)], fork_name, lineno)
+            if status.success:
+                self._drop_graph(fork_name)
         return status
 
+    @recorded
     def insert_graph(self, name: str, lineno: int, vertices: Optional[list[dict[str, Primitive]]] = None,
                      edges: Optional[list[dict[str, Primitive]]] = None) -> Status:
-        graph_name_status = DatabaseNameNoDuplicatesStatus(name in self.names(), name, lineno)
-        if graph_name_status.success:
-            insert_status = self.graphs[name].insert(vertices, edges)
-            return DatabaseOperationStatus("INSERT INTO", [insert_status], name, lineno)
-        else:
-            return DatabaseOperationStatus("INSERT INTO", [graph_name_status], name, lineno)
+        with self.graph_lock(name, WRITE) as graph:
+            graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+            if graph_name_status.success:
+                insert_status = graph.insert(vertices, edges)
+                status = DatabaseOperationStatus("INSERT INTO", [insert_status], name, lineno)
+            else:
+                return DatabaseOperationStatus("INSERT INTO", [graph_name_status], name, lineno)
+        self.enforce_budget()
+        return status
+
+    @recorded
+    def delete_graph(self, name: str, lineno: int, vertex_ids: Optional[list[Primitive]] = None,
+                     edge_ids: Optional[list[Primitive]] = None, cascade: bool = False) -> Status:
+        """
+        Delete vertices and edges from the Graph named 'name' (see Graph.delete()). If the deleted rows then exceed
+        self.compaction_threshold of the rows of the Graph, it is compacted in the background.
+        """
+        with self.graph_lock(name, WRITE) as graph:
+            graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+            if not graph_name_status.success:
+                return DatabaseOperationStatus("DELETE FROM", [graph_name_status], name, lineno)
+            status = DatabaseOperationStatus("DELETE FROM", [graph.delete(vertex_ids, edge_ids, cascade)], name,
+                                             lineno)
+            compact = graph.tombstone_ratio() > self.compaction_threshold
+        if compact:
+            with self._compactions_lock:
+                thread = self.compactions.get(name)
+                if thread is None or not thread.is_alive():
+                    # not recorded, since replaying the deletion starts it again
+                    thread = self.compactions[name] = threading.Thread(target=Database.compact_graph.__wrapped__,
+                                                                       args=(self, name, lineno), daemon=True)
+                    thread.start()
+        return status
+
+    @recorded
+    def update_graph(self, name: str, lineno: int, vertices: Optional[list[dict[str, Primitive]]] = None,
+                     edges: Optional[list[dict[str, Primitive]]] = None) -> Status:
+        """
+        Update vertices and edges of the Graph named 'name' in place (see Graph.update()).
+        """
+        with self.graph_lock(name, WRITE) as graph:
+            graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+            if not graph_name_status.success:
+                return DatabaseOperationStatus("UPDATE", [graph_name_status], name, lineno)
+            status = DatabaseOperationStatus("UPDATE", [graph.update(vertices, edges)], name, lineno)
+        self.enforce_budget()
+        return status
+
+    @recorded
+    def compact_graph(self, name: str, lineno: int, attempts: int = 3) -> Status:
+        """
+        Reclaim the rows deleted from the Graph named 'name'. The compacted columns are built while holding the lock
+        of the Graph for reading, so reads proceed meanwhile, and installed while holding it for writing, which takes
+        constant time. If the Graph is written in between, the compaction is retried up to 'attempts' times.
+        """
+        statuses: list[Status] = []
+        for _ in range(attempts):
+            with self.graph_lock(name, READ) as graph:
+                graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+                if not graph_name_status.success:
+                    return DatabaseOperationStatus("COMPACT", [graph_name_status], name, lineno)
+                compaction = graph.compaction()
+            with self.graph_lock(name, WRITE) as current:
+                if current is not graph:
+                    return DatabaseOperationStatus("COMPACT", [DatabaseNameExistsStatus(False, name, lineno)], name,
+                                                   lineno)
+                statuses = [graph.compact(compaction)]
+            if statuses[0].success:
+                break
+        return DatabaseOperationStatus("COMPACT", statuses, name, lineno)
+
+    @recorded
+    def reorder_graph(self, name: str, lineno: int, method: str = "rcm", attempts: int = 3) -> Status:
+        """
+        Store the Graph named 'name' in a cache-friendly vertex order (see Graph.reorder()), reclaiming its deleted
+        rows. Like self.compact_graph(), the reordered columns are built while holding the lock of the Graph for
+        reading and installed while holding it for writing, and the reordering is retried up to 'attempts' times if
+        the Graph is written in between.
+        """
+        statuses: list[Status] = []
+        for _ in range(attempts):
+            with self.graph_lock(name, READ) as graph:
+                graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+                if not graph_name_status.success:
+                    return DatabaseOperationStatus("REORDER", [graph_name_status], name, lineno)
+                ordering_status = GraphOrderingStatus(method, name)
+                if not ordering_status.success:
+                    return DatabaseOperationStatus("REORDER", [ordering_status], name, lineno)
+                reordering = graph.reordering(method)
+            with self.graph_lock(name, WRITE) as current:
+                if current is not graph:
+                    return DatabaseOperationStatus("REORDER", [DatabaseNameExistsStatus(False, name, lineno)], name,
+                                                   lineno)
+                statuses = [graph.compact(reordering)]
+            if statuses[0].success:
+                break
+        return DatabaseOperationStatus("REORDER", statuses, name, lineno)
 
+    def read_graph(self, name: str, reader: Callable[[Graph], Status], lineno: int) -> Status:
+        """
+        Call reader(graph) on the Graph named 'name' while holding its lock for reading, e.g. to run a Query or an
+        algorithm. 'reader' must not mutate the Graph.
+        :return: a Status wrapping the Status returned by 'reader', or an ERROR Status if there is no such Graph.
+        """
+        with self.graph_lock(name, READ) as graph:
+            graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+            if graph_name_status.success:
+                return DatabaseOperationStatus("READ", [reader(graph)], name, lineno)
+            return DatabaseOperationStatus("READ", [graph_name_status], name, lineno)
+
+    def read_snapshot(self, name: str, reader: Callable[[Snapshot], Status], lineno: int) -> Status:
+        """
+        Call reader(snapshot) on a Snapshot of the Graph named 'name'. Unlike self.read_graph(), the lock of the Graph
+        isn't taken, so the read never waits for insertions into the Graph and sees none of them.
+        :return: a Status wrapping the Status returned by 'reader', or an ERROR Status if there is no such Graph.
+        """
+        with self.catalog_lock.read():
+            graph = self.graphs.get(name)
+            snapshot = graph.snapshot() if graph is not None else None
+        graph_name_status = DatabaseNameExistsStatus(graph is not None, name, lineno)
+        if not graph_name_status.success:
+            return DatabaseOperationStatus("READ", [graph_name_status], name, lineno)
+        with snapshot:
+            return DatabaseOperationStatus("READ", [reader(snapshot)], name, lineno)
+
+    @recorded
     def drop(self, name: str, lineno: int) -> Status:
-        statuses = [DatabaseNameNoDuplicatesStatus(name in self.names(), name, lineno)]
-        if self.graphs.get(name) is not None:
-            self.graphs.pop(name)
-        elif (edgetype := self.edgetypes.get(name)) is not None:
-            flag = True
-            for graph in self.graphs.values():
-                if graph.edges.datatype == edgetype:
-                    statuses.append(DatabaseDatatypeDependencyStatus(name, graph.name))
-                    flag = False
-            if flag:
-                self.edgetypes.pop(name)
-        elif (vertextype := self.vertextypes.get(name)) is not None:
-            flag = True
-            for graph in self.graphs.values():
-                if graph.vertices.datatype == vertextype:
-                    statuses.append(DatabaseDatatypeDependencyStatus(name, graph.name))
-                    flag = False
-            if flag:
-                self.vertextypes.pop(name)
+        """
+        Drop the database object named 'name'. A Vertex- or EdgeType can't be dropped while a Graph references it, nor a
+        Graph while it has forks, and a Graph is dropped once the operations holding its lock are finished. Dropping a
+        Graph over a shared VertexStore removes its vertices from the store, which is dropped with its last Graph.
+        """
+        with self.catalog_lock.write():
+            kind = self.catalog.kind(name)
+            statuses = [DatabaseNameExistsStatus(kind is not None, name, lineno)]
+            if self.catalog.has_dependents(name):
+                statuses += [DatabaseDatatypeDependencyStatus(name, dependent)
+                             for dependent in sorted(self.catalog.dependents[name])]
+            elif kind == GRAPH:
+                self._drop_graph(name)
+            elif kind is not None:
+                {EDGETYPE: self.edgetypes, VERTEXTYPE: self.vertextypes}[kind].pop(name)
+                self.catalog.remove(name)
         return DatabaseOperationStatus("DROP", statuses, name, lineno)
 
+    def _drop_graph(self, name: str):
+        with self.locks.pop(name).write():
+            graph = self.graphs.pop(name)
+            graph.release()
+        if graph.vertices.shared and not graph.vertices.store.views:
+            self.stores.pop(graph.vertices.datatype.name, None)
+        self.catalog.remove(name)
+
 
 DB = Database()
@@ -0,0 +1,148 @@
+from contextlib import ExitStack
+from typing import Optional
+
+from databases.database import Database, DatabaseNameExistsStatus, DatabaseOperationStatus, DB
+from datatypes.primitive import Primitive, NULL
+from datatypes.raw import RawType
+from graphs.graph import Graph
+from statuses.status import *
+from utilities.locks import WRITE
+
+SCRIPT = "SCRIPT"
+
+
+def _columns(datatype: RawType, entries: list[dict[str, Primitive]]) -> dict[str, list[Primitive]]:
+    return {field_name: [entry.get(field_name, NULL) for entry in entries] for field_name in datatype.names}
+
+
+class _Statement:
+    """
+    An insertion buffered by a Script.
+    """
+    __slots__ = ["name", "lineno", "vertices", "edges"]
+
+    def __init__(self, name: str, lineno: int, vertices: list[dict[str, Primitive]],
+                 edges: list[dict[str, Primitive]]):
+        self.name = name
+        self.lineno = lineno
+        self.vertices = vertices
+        self.edges = edges
+
+
+class Script:
+    """
+    A multi-statement script run against a Database with deferred constraint checking. Each insertion is checked
+    against the local typewide constraints of its types when it is issued (see TypewideConstraint.is_local), which
+    only looks at the inserted entries, and is buffered. The other typewide constraints and the graphwide constraints
+    are checked once per Graph by self.commit(), which inserts everything or nothing.
+    If the deferred checks fail, the failing statement is located by binary search (see self._locate()), and the error
+    is reported with its lineno.
+    Attributes:
+        db: the Database.
+        statements: the buffered insertions, in order.
+        failed: the Statuses of the insertions that failed their local checks, which make self.commit() fail.
+    """
+
+    def __init__(self, db: Database = DB):
+        self.db = db
+        self.statements: list[_Statement] = []
+        self.failed: list[Status] = []
+
+    def insert_graph(self, name: str, lineno: int, vertices: Optional[list[dict[str, Primitive]]] = None,
+                     edges: Optional[list[dict[str, Primitive]]] = None) -> Status:
+        """
+        Buffer an insertion into the Graph named 'name' after checking the local constraints of the inserted entries.
+        :return: an OK Status if the local checks pass, or an ERROR Status if there is no such Graph or an inserted
+            entry violates a local constraint.
+        """
+        vertices = [] if vertices is None else vertices
+        edges = [] if edges is None else edges
+        with self.db.catalog_lock.read():
+            graph = self.db.graphs.get(name)
+        statuses: list[Status] = [DatabaseNameExistsStatus(graph is not None, name, lineno)]
+        if graph is not None:
+            for data, entries in ((graph.vertices, vertices), (graph.edges, edges)):
+                deltas = _columns(data.datatype, entries)
+                statuses.append(data.datatype.check_constraints(deltas, deltas, local_only=True))
+        status = DatabaseOperationStatus("INSERT INTO", statuses, name, lineno)
+        if status.success:
+            self.statements.append(_Statement(name, lineno, vertices, edges))
+        else:
+            self.failed.append(status)
+        return status
+
+    def discard(self):
+        """
+        Drop every buffered insertion.
+        """
+        self.statements = []
+        self.failed = []
+
+    def commit(self, lineno: int) -> Status:
+        """
+        Check the deferred constraints and insert every buffered statement, or none of them. The Graphs written are
+        locked for the duration of the commit. The script is empty afterwards.
+        :return: an OK Status, or an ERROR Status with the Statuses of the statements that failed their local checks,
+            or else with the Status of the first statement violating a deferred constraint.
+        """
+        statuses = self.failed
+        groups: dict[str, list[_Statement]] = {}
+        for statement in self.statements:
+            groups.setdefault(statement.name, []).append(statement)
+        self.discard()
+        if statuses:
+            return DatabaseOperationStatus("COMMIT", statuses, SCRIPT, lineno)
+        with ExitStack() as stack:
+            graphs = {name: stack.enter_context(self.db.graph_lock(name, WRITE)) for name in sorted(groups)}
+            missing = [DatabaseNameExistsStatus(False, name, groups[name][0].lineno)
+                       for name, graph in graphs.items() if graph is None]
+            if missing:
+                return DatabaseOperationStatus("COMMIT", missing, SCRIPT, lineno)
+            names = list(groups)
+            # Every Graph but the last is checked without committing, so that nothing is committed unless every Graph
+            # passes; the last one is then inserted for real, and the others can no longer fail.
+            for name in names[:-1]:
+                status = self._insert(graphs[name], groups[name], dry_run=True)
+                if not status.success:
+                    return DatabaseOperationStatus("COMMIT", [self._locate(graphs[name], groups[name])], SCRIPT,
+                                                   lineno)
+            last = names[-1] if names else None
+            if last is not None:
+                status = self._insert(graphs[last], groups[last])
+                if not status.success:
+                    return DatabaseOperationStatus("COMMIT", [self._locate(graphs[last], groups[last])], SCRIPT,
+                                                   lineno)
+                statuses.append(DatabaseOperationStatus("INSERT INTO", [status], last, groups[last][0].lineno))
+            for name in names[:-1]:
+                status = self._insert(graphs[name], groups[name])
+                statuses.append(DatabaseOperationStatus("INSERT INTO", [status], name, groups[name][0].lineno))
+        return DatabaseOperationStatus("COMMIT", statuses, SCRIPT, lineno)
+
+    @staticmethod
+    def _insert(graph: Graph, statements: list[_Statement], dry_run: bool = False) -> Status:
+        vertices = [vertex for statement in statements for vertex in statement.vertices]
+        edges = [edge for statement in statements for edge in statement.edges]
+        return graph.insert(vertices, edges, dry_run)
+
+    def _locate(self, graph: Graph, statements: list[_Statement]) -> Status:
+        """
+        Return the Status of the statement in 'statements' at which 'graph' starts violating a constraint, which the
+        statements as a whole must do. Like Graph.insert(), the search applies the vertices of every statement before
+        any edge, so that edges may refer to vertices inserted by later statements; it then finds by binary search a
+        prefix of these insertions that passes while the next one fails.
+        """
+        units = [(statement, True) for statement in statements] + [(statement, False) for statement in statements]
+
+        def check(k: int) -> Status:
+            vertices = [vertex for statement, is_vertex in units[:k] if is_vertex for vertex in statement.vertices]
+            edges = [edge for statement, is_vertex in units[:k] if not is_vertex for edge in statement.edges]
+            return graph.insert(vertices, edges, dry_run=True)
+
+        low, high = 0, len(units)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if check(middle).success:
+                low = middle
+            else:
+                high = middle
+        return DatabaseOperationStatus("INSERT INTO", [check(high)], graph.name, units[high - 1][0].lineno)
@@ -0,0 +1,177 @@
+import functools
+import inspect
+import marshal
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Iterator, Optional, TYPE_CHECKING
+
+from constraints.graphwide import GRAPHWIDE_CONSTRAINTS
+from constraints.typewide import TYPEWIDE_CONSTRAINTS
+from datatypes.primitive import PrimitiveTypes
+from statuses.status import Status
+
+if TYPE_CHECKING:
+    from databases.database import Database
+
+MAGIC = b"SQLGTRC1"
+# marshal format version of the records, fixed so that traces are readable by every Python version supporting it
+MARSHAL_VERSION = 4
+_LENGTH = struct.Struct("<I")
+
+# the recorded operations, in the order of their codes in a trace, so new ones are appended
+OPERATIONS = ["create_vertextype", "create_edgetype", "create_graph", "insert_graph", "drop", "fork_graph",
+              "merge_graph", "delete_graph", "update_graph", "compact_graph", "reorder_graph"]
+_CODES = {operation: code for code, operation in enumerate(OPERATIONS)}
+
+
+class TraceRecord:
+    """
+    A Database call read from a trace.
+    Attributes:
+        operation: the name of the Database method called, one of OPERATIONS.
+        arguments: a dictionary mapping the name of each parameter passed to the method to its argument, with
+            PrimitiveTypes and constraints replaced by their names (see encode()).
+        start: the time the call started at, in seconds since the recording started.
+        seconds: the wall time of the call in seconds.
+        success: whether the Status returned by the call was OK.
+    """
+    __slots__ = ["operation", "arguments", "start", "seconds", "success"]
+
+    def __init__(self, operation: str, arguments: dict[str, Any], start: float, seconds: float, success: bool):
+        self.operation = operation
+        self.arguments = arguments
+        self.start = start
+        self.seconds = seconds
+        self.success = success
+
+    @property
+    def lineno(self) -> Optional[int]:
+        return self.arguments.get("lineno")
+
+
+def encode(operation: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return the arguments of a call to the Database method 'operation' with the PrimitiveTypes replaced by their names,
+    the typewide constraints by (name, fields) lists and the graphwide constraints by their names, so that the result
+    only holds values marshal can write. Constraints are looked up by name on replay, so calls with constraints that
+    aren't in TYPEWIDE_CONSTRAINTS or GRAPHWIDE_CONSTRAINTS can't be replayed faithfully.
+    """
+    encoded = dict(arguments)
+    if "types" in encoded:
+        encoded["types"] = {field_name: datatype.name for field_name, datatype in encoded["types"].items()}
+    if "constraints" in encoded:
+        if operation == "create_graph":
+            encoded["constraints"] = [constraint.name for constraint in encoded["constraints"]]
+        else:
+            encoded["constraints"] = [[constraint.name, list(fields)] for constraint, fields in encoded["constraints"]]
+    return encoded
+
+
+def decode(operation: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    """
+    Invert encode().
+    """
+    decoded = dict(arguments)
+    if "types" in decoded:
+        decoded["types"] = {field_name: PrimitiveTypes[name] for field_name, name in decoded["types"].items()}
+    if "constraints" in decoded:
+        if operation == "create_graph":
+            decoded["constraints"] = [GRAPHWIDE_CONSTRAINTS[name] for name in decoded["constraints"]]
+        else:
+            decoded["constraints"] = [(TYPEWIDE_CONSTRAINTS[name], fields) for name, fields in decoded["constraints"]]
+    return decoded
+
+
+class WorkloadRecorder:
+    """
+    An opt-in recorder of the calls to the Database methods in OPERATIONS, enabled by assigning it to
+    Database.recorder. Each call is appended to a binary trace as it returns: the file starts with MAGIC, followed by
+    one record per call, which is a little-endian 32-bit length and the marshalled (operation code, arguments, start,
+    seconds, success) tuple. Calls made from several threads are written in the order they return. The trace is read
+    back by read_trace() and replayed by benchmarks.replay.
+    Attributes:
+        path: the path of the trace.
+        calls: the number of calls recorded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.calls = 0
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._file.write(MAGIC)
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def call(self, operation: str, method: Callable[..., Status], db: 'Database', args: tuple,
+             kwargs: dict[str, Any]) -> Status:
+        """
+        Call method(db, *args, **kwargs) and record it under 'operation'.
+        """
+        arguments = inspect.signature(method).bind(db, *args, **kwargs).arguments
+        del arguments["self"]
+        # Encoded before the call, which may mutate the arguments (e.g. Graph() appends to its constraints).
+        arguments = encode(operation, arguments)
+        start = time.perf_counter()
+        status = method(db, *args, **kwargs)
+        seconds = time.perf_counter() - start
+        data = marshal.dumps((_CODES[operation], arguments, start - self._origin, seconds, status.success),
+                             MARSHAL_VERSION)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(_LENGTH.pack(len(data)))
+                self._file.write(data)
+                self.calls += 1
+        return status
+
+    def close(self):
+        """
+        Stop recording and close the trace. Later calls run unrecorded.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> 'WorkloadRecorder':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def recorded(method: Callable[..., Status]) -> Callable[..., Status]:
+    """
+    Decorate a Database method to be recorded by Database.recorder when it is set. The overhead is a single attribute
+    lookup while it isn't.
+    """
+    operation = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: 'Database', *args, **kwargs) -> Status:
+        recorder = self.recorder
+        if recorder is None:
+            return method(self, *args, **kwargs)
+        return recorder.call(operation, method, self, args, kwargs)
+    return wrapper
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """
+    Yield the records of the trace at 'path' in the order they were written. A record cut short, e.g. because the
+    recording process was killed, ends the trace.
+    :raise ValueError: if the file isn't a trace.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a workload trace")
+        while True:
+            header = file.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            code, arguments, start, seconds, success = marshal.loads(data)
+            yield TraceRecord(OPERATIONS[code], arguments, start, seconds, success)
@@ -18,7 +18,8 @@ class EdgeType(RawType):
     """
 
     def check_constraints(self, values: dict[str, list[Primitive]],
-                          deltas: dict[str, list[Primitive]] = None) -> Status:
+                          deltas: dict[str, list[Primitive]] = None, local_only: bool = False,
+                          check: Optional[Callable[[list[BoundTypewideConstraint]], list[Status]]] = None) -> Status:
         flag_from = flag_to = False
         statuses = []
         for bound_constraint in self.constraints:
@@ -30,5 +31,5 @@ class EdgeType(RawType):
             statuses.append(VertexOrEdgeTypeMissingFieldStatus(FROM, self.name))
         if not flag_to:
             statuses.append(VertexOrEdgeTypeMissingFieldStatus(TO, self.name))
-        statuses += super()._check_constraints(values, deltas)
+        statuses += super()._check_constraints(values, deltas, local_only, check)
         return VertexOrEdgeTypeCheckStatus(statuses, self.name)
@@ -1,7 +1,7 @@
 from constraints.typewide import *
 from datatypes.primitive import *
 from statuses.status import *
-from typing import Optional
+from typing import Callable, Optional
 
 ID: str = "id"
 
@@ -53,36 +53,48 @@ class RawType(metaclass=ABCMeta):
             self.constraints.append(BoundTypewideConstraint(type_constraint, [field_name]))
 
     def _check_constraints(self, values: dict[str, list[Primitive]],
-                          deltas: dict[str, list[Primitive]] = None) -> list[Status]:
+                          deltas: dict[str, list[Primitive]] = None, local_only: bool = False,
+                          check: Optional[Callable[[list[BoundTypewideConstraint]], list[Status]]] = None
+                          ) -> list[Status]:
         """
         the internal helper for self.check_constraints(). Returns a list of Status objects instead of a Status.
         """
         statuses = []
         flagA = False
         flagB = False
+        checked = []
         for bound_constraint in self.constraints:
             if ID in bound_constraint.names and bound_constraint.constraint is TYPEWIDE_CONSTRAINTS["UNIQUE"]:
                 flagA = True
             if ID in bound_constraint.names and bound_constraint.constraint is TYPEWIDE_CONSTRAINTS["NOTNULL"]:
                 flagB = True
+            if local_only and not bound_constraint.constraint.is_local:
+                continue
+            if check is not None:
+                checked.append(bound_constraint)
+                continue
             targets = deltas if deltas is not None and bound_constraint.constraint.is_local else values
             statuses.append(bound_constraint.check(targets))
+        if check is not None:
+            statuses += check(checked)
         if not flagA or not flagB:
             statuses.append(VertexOrEdgeTypeMissingFieldStatus(ID, self.name))
-        for bound_constraint in self.constraints:
-            targets = deltas if deltas is not None and bound_constraint.constraint.is_local else values
-            statuses.append(bound_constraint.check(targets))
         return statuses
 
     @abstractmethod
     def check_constraints(self, values: dict[str, list[Primitive]],
-                          deltas: dict[str, list[Primitive]] = None) -> Status:
+                          deltas: dict[str, list[Primitive]] = None, local_only: bool = False,
+                          check: Optional[Callable[[list[BoundTypewideConstraint]], list[Status]]] = None) -> Status:
         """
         Checks whether the constraints are satisfied in the list of entries. When a Database is trying to
         create a new Vertex- or EdgeType, self.check_constraints() should be called after instantiation to detect
         any ill-created objects.
         :param values: the entire list of entries.
         :param deltas: the portion of the entries that are changed from an operation such as insertion or deletion.
+        :param local_only: if True, only the local constraints are checked (see TypewideConstraint.is_local), e.g.
+            because the others are deferred until the end of a script.
+        :param check: a function checking a list of the constraints at once and returning their Statuses in order,
+            e.g. TypewideScheduler.check(), used instead of checking them one by one.
         :return: a Status object showing result of this check.
         """
         pass
@@ -8,7 +8,8 @@ class VertexType(RawType):
     A type for vertices of a Graph.
     """
     def check_constraints(self, values: dict[str, list[Primitive]],
-                          deltas: dict[str, list[Primitive]] = None) -> Status:
-        return VertexOrEdgeTypeCheckStatus(super()._check_constraints(values, deltas), self.name)
+                          deltas: dict[str, list[Primitive]] = None, local_only: bool = False,
+                          check: Optional[Callable[[list[BoundTypewideConstraint]], list[Status]]] = None) -> Status:
+        return VertexOrEdgeTypeCheckStatus(super()._check_constraints(values, deltas, local_only, check), self.name)
 
 
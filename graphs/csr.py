@@ -0,0 +1,243 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Optional, Sequence
+
+from datatypes.edge import FROM, TO
+from datatypes.primitive import Primitive
+from datatypes.raw import ID
+from graphs.data import Data
+
+
+class CSRAdjacency:
+    """
+    A read-only compressed sparse row (CSR) view of the edges of a graph. The view is built directly from the columns
+    of the vertices and edges Data objects, so no entry dictionaries are materialized.
+    Attributes:
+        ids: a list mapping the index of each vertex to its id.
+        index: a dictionary mapping the id of each vertex to its index.
+        vertex_rows: an array mapping the index of each vertex to its position in the columns of the vertices Data
+            object.
+        offsets: an array of len(ids) + 1 positions. The edges incident from the vertex with index i are stored from
+            position offsets[i] (inclusive) to offsets[i + 1] (exclusive) of targets and rows.
+        targets: an array holding the index of the vertex each edge points to. The targets of each row are sorted in
+            ascending order, and parallel edges are ordered by their position in the edges Data object.
+        rows: an array holding the position of each edge in the columns of the edges Data object.
+        reverse: whether the view follows the edges backwards, i.e. lists the edges incident to each vertex.
+    Deleted vertices and edges are left out of the view, and so are the rows of a shared VertexStore that belong to
+    other graphs, so the vertices are indexed in the order of their live rows (see Data.live_rows()).
+    """
+
+    def __init__(self, vertices: Data, edges: Data, reverse: bool = False):
+        """
+        Creates a CSRAdjacency over the given vertices and edges. Every edge must refer to two valid vertices, as
+        guaranteed by the REFERENTIAL_INTEGRITY constraint of a Graph.
+        :param reverse: if True, the view is built over the reversed edges.
+        """
+        self.reverse = reverse
+        self.vertex_rows = array('q', vertices.live_rows())
+        column = vertices.values[ID]
+        self.ids: list[Primitive] = (list(column) if not vertices.tombstones else
+                                     [column[row] for row in self.vertex_rows])
+        self.index: dict[Primitive, int] = {vid: i for i, vid in enumerate(self.ids)}
+        edge_rows = edges.live_rows() if edges.tombstones else None
+        sources = edges.live(TO) if reverse else edges.live(FROM)
+        destinations = edges.live(FROM) if reverse else edges.live(TO)
+        n = len(self.ids)
+        counts = [0] * (n + 1)
+        source_indices = [self.index[vid] for vid in sources]
+        for i in source_indices:
+            counts[i + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self.offsets = array('q', counts)
+        cursor = counts[:-1]
+        destination_indices = [self.index[vid] for vid in destinations]
+        self.targets = array('q', bytes(8 * len(source_indices)))
+        self.rows = array('q', bytes(8 * len(source_indices)))
+        for row in sorted(range(len(source_indices)), key=destination_indices.__getitem__):
+            i = source_indices[row]
+            position = cursor[i]
+            self.targets[position] = destination_indices[row]
+            self.rows[position] = row if edge_rows is None else edge_rows[row]
+            cursor[i] = position + 1
+
+    def size(self) -> int:
+        """
+        Return the number of vertices in the view.
+        """
+        return len(self.ids)
+
+    def num_edges(self) -> int:
+        """
+        Return the number of edges in the view.
+        """
+        return len(self.targets)
+
+    def degree(self, i: int) -> int:
+        """
+        Return the number of edges incident from (or to, if self.reverse) the vertex with index i.
+        """
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def neighbors(self, i: int) -> array:
+        """
+        Return the indices of the vertices adjacent to the vertex with index i.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def find(self, i: int, j: int) -> int:
+        """
+        Return the position in self.targets of the first edge from the vertex with index i to the vertex with index j,
+        found by binary search, or -1 if there is no such edge.
+        """
+        start, end = self.offsets[i], self.offsets[i + 1]
+        position = bisect_left(self.targets, j, start, end)
+        return position if position < end and self.targets[position] == j else -1
+
+    def column(self, values: list[Primitive], typecode: Optional[str] = None) -> list[Primitive]:
+        """
+        Return a column of the edges Data object permuted into the order of self.targets, so that the value for the
+        edge at position p of self.targets is at position p of the result.
+        :param typecode: if given, the result is an array of this typecode instead of a list.
+        """
+        permuted = [values[row] for row in self.rows]
+        return permuted if typecode is None else array(typecode, permuted)
+
+
+class PackedArray:
+    """
+    A read-only sequence of integers compressed in blocks of block_size values. Each block stores its first value in
+    self.firsts and the following ones as the variable-length (LEB128) zigzag encoding of their difference to the
+    previous value, so that sorted runs of close values take one byte each. self.starts holds the position of each
+    block in self.data, which serves as a skip pointer: reading the value at a position only decodes its block. The
+    last block decoded is cached, so that sequential reads decode each block once.
+    Attributes:
+        data: the encoded differences.
+        starts: an array holding the position in self.data of the differences of each block.
+        firsts: an array holding the first value of each block.
+        block_size: the number of values of each block but the last.
+        length: the number of values.
+    """
+
+    def __init__(self, values: Sequence[int], block_size: int = 64):
+        self.block_size = block_size
+        self.length = len(values)
+        self.starts = array('q')
+        self.firsts = array('q')
+        data = bytearray()
+        for start in range(0, self.length, block_size):
+            self.starts.append(len(data))
+            previous = values[start]
+            self.firsts.append(previous)
+            for value in values[start + 1:start + block_size]:
+                delta = value - previous
+                previous = value
+                delta = delta << 1 if delta >= 0 else (-delta << 1) - 1
+                while delta > 0x7F:
+                    data.append(delta & 0x7F | 0x80)
+                    delta >>= 7
+                data.append(delta)
+        self.data = bytes(data)
+        self._cache: tuple[int, list[int]] = (-1, [])
+
+    def block(self, k: int) -> list[int]:
+        """
+        Return the values of the block with index k.
+        """
+        cache = self._cache
+        if cache[0] == k:
+            return cache[1]
+        data = self.data
+        position = self.starts[k]
+        value = self.firsts[k]
+        values = [value]
+        for _ in range(min(self.block_size, self.length - k * self.block_size) - 1):
+            delta, shift = 0, 0
+            while True:
+                byte = data[position]
+                position += 1
+                delta |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            value += delta >> 1 if not delta & 1 else -((delta + 1) >> 1)
+            values.append(value)
+        self._cache = (k, values)
+        return values
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if start >= stop:
+                return array('q')
+            first = start // self.block_size
+            values = [value for k in range(first, (stop - 1) // self.block_size + 1) for value in self.block(k)]
+            offset = first * self.block_size
+            return array('q', values[start - offset:stop - offset:step])
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError("PackedArray index out of range")
+        return self.block(key // self.block_size)[key % self.block_size]
+
+    def __iter__(self) -> Iterator[int]:
+        for k in range(len(self.starts)):
+            yield from self.block(k)
+
+    def find(self, value: int, start: int, end: int) -> int:
+        """
+        Return the first position in [start, end) holding 'value', where the values must be sorted in ascending
+        order, or -1 if there is none. The blocks are located by binary search over self.firsts, so at most two
+        blocks are decoded.
+        """
+        if start >= end:
+            return -1
+        size = self.block_size
+        # The blocks beginning inside [start, end) have their first value in the sorted range.
+        low, high = start // size + 1, (end - 1) // size + 1
+        k = bisect_left(self.firsts, value, low, high) - 1
+        position = max(start, k * size)
+        for candidate in self.block(k)[position - k * size:min(end, (k + 1) * size) - k * size]:
+            if candidate == value:
+                return position
+            if candidate > value:
+                return -1
+            position += 1
+        if k + 1 < high and self.firsts[k + 1] == value:
+            return (k + 1) * size
+        return -1
+
+    def nbytes(self) -> int:
+        """
+        Return the number of bytes of the encoded values and skip pointers.
+        """
+        return len(self.data) + self.starts.itemsize * (len(self.starts) + len(self.firsts))
+
+
+class PackedCSRAdjacency(CSRAdjacency):
+    """
+    A CSRAdjacency whose targets and rows are PackedArrays, which takes a fraction of the memory of the arrays of
+    large sparse graphs: the targets of each vertex are sorted, so their differences are small. Reading them decodes
+    one block at a time, and self.find() only decodes the blocks its binary search over the skip pointers lands on.
+    Like any CSRAdjacency, it is a read-only copy of the adjacency of a Graph, which doesn't replace Graph.M.
+    Attributes:
+        block_size: the number of values of the blocks of self.targets and self.rows.
+    """
+
+    def __init__(self, vertices: Data, edges: Data, reverse: bool = False, block_size: int = 64):
+        super().__init__(vertices, edges, reverse)
+        self.block_size = block_size
+        self.targets = PackedArray(self.targets, block_size)
+        self.rows = PackedArray(self.rows, block_size)
+
+    def find(self, i: int, j: int) -> int:
+        return self.targets.find(j, self.offsets[i], self.offsets[i + 1])
+
+    def nbytes(self) -> int:
+        """
+        Return the number of bytes of the offsets, targets and rows.
+        """
+        return self.offsets.itemsize * len(self.offsets) + self.targets.nbytes() + self.rows.nbytes()
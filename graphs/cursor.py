@@ -0,0 +1,88 @@
+from typing import Iterator, Optional
+
+from datatypes.primitive import Primitive
+
+
+class DataCursor:
+    """
+    A lazy, resumable read over the entries of a Data object, yielding rows or column chunks in batches instead of
+    copying whole lists. A cursor reads the rows that existed when it was opened (or, for a resumed cursor, when the
+    original cursor was opened): since entries are only appended, later insertions don't change what it returns. Rows
+    deleted before they are read are skipped, so a batch may hold fewer rows than requested.
+    Attributes:
+        columns: a dictionary mapping each projected field name to its list of values.
+        version: the version of the Data object when the cursor was opened.
+        rows: the number of rows visible to the cursor.
+        position: the index of the next row to be read.
+        batch_size: the default number of rows read at a time.
+        deleted: the tombstone bitmap of the Data object (see Data.deleted), or None.
+    """
+
+    def __init__(self, columns: dict[str, list[Primitive]], version: int, rows: int, position: int = 0,
+                 batch_size: int = 1000, deleted: Optional[bytearray] = None):
+        self.columns = columns
+        self.version = version
+        self.rows = rows
+        self.position = position
+        self.batch_size = batch_size
+        self.deleted = deleted
+
+    def exhausted(self) -> bool:
+        """
+        Return whether every visible row has been read.
+        """
+        return self.position >= self.rows
+
+    def token(self) -> str:
+        """
+        Return a position token from which the read can be resumed with Data.resume(), e.g. by a later request.
+        """
+        return f"{self.version}:{self.rows}:{self.position}"
+
+    @staticmethod
+    def parse_token(token: str) -> Optional[tuple[int, int, int]]:
+        """
+        Return the (version, rows, position) triple encoded in 'token', or None if it isn't a valid token.
+        """
+        try:
+            version, rows, position = (int(part) for part in token.split(":"))
+        except (ValueError, AttributeError):
+            return None
+        return (version, rows, position) if 0 <= position <= rows else None
+
+    def fetch_columns(self, size: Optional[int] = None) -> dict[str, list[Primitive]]:
+        """
+        Read the next 'size' rows (self.batch_size if None) and return them as a dictionary mapping each projected
+        field name to a list of values. Returns empty lists once the cursor is exhausted.
+        """
+        start = self.position
+        end = min(self.rows, start + (self.batch_size if size is None else size))
+        self.position = max(start, end)
+        deleted = self.deleted
+        if deleted is not None and any(deleted[start >> 3:(end + 7) >> 3]):
+            rows = [row for row in range(start, end) if not deleted[row >> 3] & (1 << (row & 7))]
+            return {name: [values[row] for row in rows] for name, values in self.columns.items()}
+        return {name: values[start:end] for name, values in self.columns.items()}
+
+    def fetch(self, size: Optional[int] = None) -> list[dict[str, Primitive]]:
+        """
+        Read the next 'size' rows (self.batch_size if None) and return them as a list of dictionaries mapping each
+        projected field name to its value. Returns an empty list once the cursor is exhausted.
+        """
+        chunk = self.fetch_columns(size)
+        names = list(chunk)
+        return [dict(zip(names, row)) for row in zip(*chunk.values())]
+
+    def chunks(self) -> Iterator[dict[str, list[Primitive]]]:
+        """
+        Yield the remaining rows as column chunks of at most self.batch_size rows (see self.fetch_columns()).
+        """
+        while not self.exhausted():
+            yield self.fetch_columns()
+
+    def __iter__(self) -> Iterator[dict[str, Primitive]]:
+        """
+        Yield the remaining rows one at a time, reading them self.batch_size rows at a time.
+        """
+        while not self.exhausted():
+            yield from self.fetch()
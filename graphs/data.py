@@ -1,11 +1,28 @@
-from typing import Optional, Union
+import copy
+import sys
+import time
+from collections.abc import Mapping
+from typing import Any, Collection, Iterable, Iterator, Optional, Union, TYPE_CHECKING
 
-from constraints.typewide import TypewideConstraint
+from constraints.typewide import TypewideConstraint, TYPEWIDE_CONSTRAINTS
 from datatypes.primitive import PrimitiveTypes, Primitive, NULL
 from datatypes.vertex import VertexType
 from statuses.status import *
 from datatypes.raw import RawType, ID
 from utilities.Transaction import Transaction
+from utilities.cache import RESULT_CACHE, next_version
+from utilities.instrumentation import INSTRUMENTATION
+from utilities.memory import SpilledColumn, column_size, sample_size
+from graphs.cursor import DataCursor
+from graphs.index import SortedIndex
+from graphs.statistics import DataStatistics
+from graphs.snapshot import collect
+
+if TYPE_CHECKING:
+    from constraints.parallel import TypewideScheduler
+
+# the buffers of a Data object besides its columns that are shared with its forks until mutated (see Data.fork())
+_BUFFERS = ("ids", "entries", "positions", "deleted", "unique")
 
 
 class DataAddEntriesStatus(DerivedStatus):
@@ -15,6 +32,30 @@ class DataAddEntriesStatus(DerivedStatus):
                          f"Adding {item} Failed -- Changed Rolled Back",
                          substatuses)
 
+class DataDeleteEntriesStatus(DerivedStatus):
+    def __init__(self, datatype: RawType, substatuses):
+        item = 'Vertices' if isinstance(datatype, VertexType) else 'Edges'
+        super().__init__(f"Deleting {item} Successful -- All Changes Saved",
+                         f"Deleting {item} Failed -- Changed Rolled Back",
+                         substatuses)
+
+
+class DataUpdateEntriesStatus(DerivedStatus):
+    def __init__(self, datatype: RawType, substatuses):
+        item = 'Vertices' if isinstance(datatype, VertexType) else 'Edges'
+        super().__init__(f"Updating {item} Successful -- All Changes Saved",
+                         f"Updating {item} Failed -- Changed Rolled Back",
+                         substatuses)
+
+
+class DataEntryFoundStatus(LeafStatus):
+    def __init__(self, id: Primitive, fields: list[str], success: bool):
+        super().__init__("Entry Found",
+                         "No Entry has this id, or a Field doesn't Exist or can't be Updated",
+                         success,
+                         {"id": id, "Fields": fields})
+
+
 class DataGetFieldStatus(LeafStatus):
     def __init__(self, field_name : str, data: Optional[list[Primitive]] = None):
         context = {"Field Name":field_name}
@@ -26,6 +67,33 @@ class DataGetFieldStatus(LeafStatus):
                          context)
 
 
+class DataCursorStatus(LeafStatus):
+    def __init__(self, fields: list[str], token: Optional[str] = None, cursor: Optional[DataCursor] = None):
+        context = {"Fields": fields, "token": token}
+        if cursor is not None:
+            context["data"] = cursor
+        super().__init__("Cursor successfully opened",
+                         "Field does not exist, or position token invalid or expired",
+                         cursor is not None,
+                         context)
+
+
+class DataCreateIndexStatus(LeafStatus):
+    def __init__(self, field_name: str, success: bool):
+        super().__init__("Index successfully created",
+                         "Field does not exist",
+                         success,
+                         {"Field Name": field_name})
+
+
+class DataAttachFieldStatus(LeafStatus):
+    def __init__(self, field_name: str, success: bool):
+        super().__init__("Field successfully attached",
+                         "Field name taken by the type, or values of wrong length or type",
+                         success,
+                         {"Field Name": field_name})
+
+
 class Data:
     """
     A container for a list of entries. Each entry containing a value each from a list of fields which have a name,
@@ -37,15 +105,58 @@ class Data:
                 Each list of values must have the same length.
         ids: a list of values of the id field.
         entries: a dictionary mapping each id to the entry with this id.
+        computed: a dictionary mapping the names of fields attached by self.attach_field() to their primitive
+            datatypes. Computed fields are stored in values but are not part of datatype or of the entries, and are NULL
+            for entries added after the field was attached.
+        version: a number identifying the current state of the entries. It is replaced by a new, larger number from
+            utilities.cache.next_version() by every mutation, and restored by self.rollback().
+        last_rewrite: the version set by the last mutation that changed existing rows instead of appending new ones,
+            before which position tokens of cursors expire.
+        indexes: a dictionary mapping field names to the SortedIndex over the field, if one was created.
+        statistics: the DataStatistics over the fields and computed fields, updated by every mutation.
+        stamps: the commit versions of the rows committed by self.commit(), as a (number of rows visible to every
+            snapshot, commit version of each following row) pair (see graphs.snapshot). Rows past the committed ones
+            belong to an insertion in progress.
+        positions: a dictionary mapping each id in self.entries to the row of its entry.
+        deleted: the tombstone bitmap of the rows: bit (row & 7) of deleted[row >> 3] is set if the row was deleted by
+            self.delete_entries(). Deleted rows stay in values and ids, and are skipped by readers, until
+            self.compact() removes them.
+        tombstones: the number of deleted rows.
+        unique: a dictionary mapping each field other than ID bound by a UNIQUE constraint to a dictionary counting the
+            live rows holding each of its values, maintained by every mutation so that UNIQUE is checked against the
+            changed rows only. The live ids are the keys of self.positions.
         last: a Transaction object showing last operation done onto this object. None if newly created.
+        scheduler: the TypewideScheduler checking the typewide constraints of the entries added by self.add_entries()
+            in parallel chunks, or None to check them one after the other.
+        shared: whether the rows are stored in a VertexStore shared with other graphs (see graphs.store.SharedData).
+        accessed: a dictionary mapping field names to the time.monotonic() of the last read of the field through
+            self.live(), self.get_field(), a cursor or an index, which tells the coldest columns to spill to disk (see
+            self.spill()).
     """
 
+    shared = False
+
     class INSERTDataTransaction(Transaction):
         """
         Represents an INSERT transaction done to a matrix.
         """
         pass
 
+    class DELETEDataTransaction(Transaction):
+        """
+        Represents a DELETE of entries by Data.delete_entries(), which set the tombstone bits of their rows and left
+        the rows in the columns. The data is the list of removed entries, and the context holds the "row" of each.
+        """
+        pass
+
+    class UPDATEDataTransaction(Transaction):
+        """
+        Represents an UPDATE of entries by Data.update_entries(), which overwrote the values of their rows in the
+        columns in place. The data is the list of updated entries, and the context holds the "row" of each and the
+        entry it replaced under "previous".
+        """
+        pass
+
     def __init__(self, datatype: RawType):
         """
         Initialize an empty Data container with the given type, which must be valid as indicated by
@@ -57,6 +168,25 @@ class Data:
                                                            ))
         self.ids: list[Primitive] = []
         self.entries: dict[Primitive, dict[str, Primitive]] = {}
+        self.computed: dict[str, PrimitiveTypes] = {}
+        self.version: int = next_version()
+        self.last_rewrite: int = self.version
+        self.indexes: dict[str, SortedIndex] = {}
+        self.statistics = DataStatistics(list(datatype.names))
+        self.stamps: tuple[int, list[int]] = (0, [])
+        self.positions: dict[Primitive, int] = {}
+        self.deleted = bytearray()
+        self.tombstones = 0
+        self.unique: dict[str, dict[Primitive, int]] = {
+            field_name: {} for bound_constraint in datatype.constraints
+            if bound_constraint.constraint is TYPEWIDE_CONSTRAINTS["UNIQUE"]
+            for field_name in bound_constraint.names if field_name != ID}
+        self._pending: dict[str, tuple[list[Primitive], list[int]]] = {}
+        self._published_deleted: Optional[bytearray] = None
+        self.last: Optional[Transaction] = None
+        self._share: dict[tuple[str, ...], list[int]] = {}
+        self.scheduler: Optional['TypewideScheduler'] = None
+        self.accessed: dict[str, float] = {}
 
     def add_entry(self, entry: dict[str, Primitive]) -> Status:
         """
@@ -75,27 +205,457 @@ class Data:
         :return: a Statuses object showing result of this operation. This operation is NOT ROLLED BACK even if it's
             unsuccessful.
         """
+        probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
+        self._own(_BUFFERS, self.values)
+        start = len(self.ids)
         deltas: dict[str, list[Primitive]] = {key: [] for key in self.datatype.names}
         for entry in entries:
             for key in self.datatype.names:
                 value = entry.get(key, NULL)
                 deltas[key].append(value)
                 self.values[key].append(value)
-        status = self.datatype.check_constraints(self.values, deltas)
+            for key in self.computed:
+                self.values[key].append(NULL)
+        self.statistics.add(self.values, start)
+        status = self._check_constraints(deltas, deltas, scheduler=self.scheduler)
         new_status = DataAddEntriesStatus(self.datatype, [status])
+        context = []
         for entry in entries:
-            self.ids.append(entry[ID])
-            self.entries[entry[ID]] = entry
+            id = entry.get(ID)
+            context.append({"replaced": self.entries.get(id), "row": self.positions.get(id)})
+            self.positions[id] = len(self.ids)
+            self.ids.append(id)
+            self.entries[id] = entry
+        self._count(deltas, 1)
+        self.deleted.extend(bytes(max(0, ((len(self.ids) + 7) >> 3) - len(self.deleted))))
+        self.last = Data.INSERTDataTransaction(Transaction.TransactionType.INSERT, entries, context, self.version)
+        self.version = next_version()
+        if probe is not None:
+            INSTRUMENTATION.stop("Data.add_entries", probe, len(entries), new_status)
         return new_status
 
-    def rollback(self, entries: list[dict[str, Primitive]]):
-        #TODO: implement completely the Rollback class to handle all insertions, deletions, and updates
+    def rollback(self, entries: Optional[list[dict[str, Primitive]]] = None):
+        """
+        Undoes the last call to self.add_entries(), which must have added 'entries', or to self.delete_entries() or
+        self.update_entries() if 'entries' is None. Entries replaced in self.entries by entries with the same id are
+        restored, and so is the version.
+        """
+        if entries is None:
+            last, self.last = self.last, None
+            if last is not None:
+                self._undo(last)
+            return
+        start = len(self.ids) - len(entries)
+        self._count({field_name: self.values[field_name][start:] for field_name in self.unique}, -1)
         for _ in range(len(entries)):
-            for key in self.datatype.names:
+            for key in self.values:
                 self.values[key].pop()
-        for _ in range(len(entries)):
+        last = self.last if self.last is not None and self.last.data is entries else None
+        context = last.context if last is not None else [{} for _ in entries]
+        for entry_context in reversed(context):
             id = self.ids.pop()
-            self.entries.pop(id)
+            if entry_context.get("replaced") is None:
+                self.entries.pop(id)
+                self.positions.pop(id, None)
+            else:
+                self.entries[id] = entry_context["replaced"]
+                self.positions[id] = entry_context["row"]
+        for index in self.indexes.values():
+            index.truncate(len(self.ids))
+        self.statistics.rollback()
+        if last is not None:
+            self.version = last.version
+            self.last = None
+
+    def delete_entries(self, ids: list[Primitive]) -> Status:
+        """
+        Deletes the entries with the given ids by setting the tombstone bits of their rows, in a copy of the bitmap
+        until self.commit(). The indexes and statistics are updated, but the rows stay in the columns until
+        self.compact() is called.
+        :return: a Statuses object showing result of this operation, which is an ERROR if an id doesn't exist. This
+            operation is NOT ROLLED BACK even if it's unsuccessful (see self.rollback()).
+        """
+        self._own(("entries", "positions", "deleted", "unique"))
+        deleted = self._tombstones()
+        statuses = []
+        removed, context = [], []
+        for id in ids:
+            row = self.positions.pop(id, None)
+            statuses.append(DataEntryFoundStatus(id, [], row is not None))
+            if row is not None:
+                deleted[row >> 3] |= 1 << (row & 7)
+                removed.append(self.entries.pop(id))
+                context.append({"row": row})
+                for index in self.indexes.values():
+                    index.remove(self.values[index.field_name][row], row)
+        self.tombstones += len(removed)
+        # the values of the fields are read from the entries, so that spilled columns aren't paged in
+        values = {key: [entry.get(key, NULL) for entry in removed] for key in self.datatype.names}
+        values.update({key: [self.values[key][entry_context["row"]] for entry_context in context]
+                       for key in self.computed})
+        self.statistics.update(values, {})
+        self._count(values, -1)
+        deltas = {key: [] for key in self.datatype.names}
+        statuses.append(self._check_constraints(deltas, deltas))
+        self.last = Data.DELETEDataTransaction(Transaction.TransactionType.DELETE, removed, context, self.version)
+        self.version = next_version()
+        return DataDeleteEntriesStatus(self.datatype, statuses)
+
+    def update_entries(self, changes: list[dict[str, Primitive]], fixed: tuple[str, ...] = (ID,)) -> Status:
+        """
+        Updates entries in place. Each change maps ID to the id of an existing entry and some other fields to their new
+        values, which overwrite the values in the columns, in copies of the columns until self.commit(), and the
+        indexes. Typewide constraints are only checked against the updated entries (see self._check_constraints()).
+        :param fixed: the fields that can't be updated.
+        :return: a Statuses object showing result of this operation, which is an ERROR if an id doesn't exist or a
+            field doesn't exist or is fixed. This operation is NOT ROLLED BACK even if it's unsuccessful (see
+            self.rollback()).
+        """
+        self._own(("entries", "unique"))
+        statuses = []
+        previous, updated, context = [], [], []
+        replaced: dict[str, list[Primitive]] = {key: [] for key in self.datatype.names}
+        changed: dict[str, list[Primitive]] = {key: [] for key in self.datatype.names}
+        for change in changes:
+            id = change.get(ID)
+            row = self.positions.get(id)
+            fields = [key for key in change if key != ID]
+            success = row is not None and all(key in self.datatype.names and key not in fixed for key in fields)
+            statuses.append(DataEntryFoundStatus(id, fields, success))
+            if not success:
+                continue
+            old = self.entries[id]
+            new = dict(old)
+            new.update(change)
+            self._own((), fields)
+            for key in fields:
+                self._overwrite(key, row, old.get(key, NULL), new[key])
+                replaced[key].append(old.get(key, NULL))
+                changed[key].append(new[key])
+            self.entries[id] = new
+            previous.append(old)
+            updated.append(new)
+            context.append({"row": row, "previous": old})
+        removed = {key: [entry.get(key, NULL) for entry in previous] for key in self.datatype.names}
+        deltas = {key: [entry.get(key, NULL) for entry in updated] for key in self.datatype.names}
+        self.statistics.update(removed, deltas)
+        self._count(replaced, -1)
+        statuses.append(self._check_constraints(deltas, changed))
+        self._count(changed, 1)
+        self.last = Data.UPDATEDataTransaction(Transaction.TransactionType.UPDATE, updated, context, self.version)
+        self.version = next_version()
+        return DataUpdateEntriesStatus(self.datatype, statuses)
+
+    def _overwrite(self, field_name: str, row: int, old: Primitive, new: Primitive):
+        self._write(field_name, row, new)
+        index = self.indexes.get(field_name)
+        if index is not None:
+            index.remove(old, row)
+            index.reindex(row)
+
+    def _undo(self, last: Transaction):
+        """
+        Undoes the DELETE or UPDATE transaction 'last'.
+        """
+        if last.type == Transaction.TransactionType.DELETE:
+            deleted = self._tombstones()
+            for entry, entry_context in zip(last.data, last.context):
+                row = entry_context["row"]
+                deleted[row >> 3] &= ~(1 << (row & 7))
+                self.positions[entry[ID]] = row
+                self.entries[entry[ID]] = entry
+                for index in self.indexes.values():
+                    index.reindex(row)
+            self.tombstones -= len(last.data)
+            self._count({field_name: [entry.get(field_name, NULL) for entry in last.data] for field_name in self.unique},
+                        1)
+            # restore the order of self.entries, which follows the rows
+            self.entries = {id: self.entries[id] for id in sorted(self.entries, key=self.positions.__getitem__)}
+        elif last.type == Transaction.TransactionType.UPDATE:
+            for entry, entry_context in zip(reversed(last.data), reversed(last.context)):
+                old = entry_context["previous"]
+                for key in self.datatype.names:
+                    if entry.get(key, NULL) != old.get(key, NULL):
+                        self._overwrite(key, entry_context["row"], entry.get(key, NULL), old.get(key, NULL))
+                        if key in self.unique:
+                            self._count({key: [entry.get(key, NULL)]}, -1)
+                            self._count({key: [old.get(key, NULL)]}, 1)
+                self.entries[old[ID]] = old
+        self.statistics.rollback()
+        self.version = last.version
+
+    def _write(self, field_name: str, row: int, value: Primitive):
+        """
+        Write 'value' to the row 'row' of the column of the field with name 'field_name', in a copy of the column until
+        self.commit() publishes it.
+        """
+        if field_name not in self._pending:
+            column = self._read(field_name)
+            self._pending[field_name] = (column, [])
+            self.values[field_name] = list(column)
+        self.values[field_name][row] = value
+        self._pending[field_name][1].append(row)
+
+    def _tombstones(self) -> bytearray:
+        """
+        Return the tombstone bitmap to set or clear bits of, which is a copy of self.deleted until self.commit()
+        publishes it.
+        """
+        if self._published_deleted is None:
+            self._published_deleted = self.deleted
+            self.deleted = bytearray(self.deleted)
+        return self.deleted
+
+    def _count(self, values: dict[str, list[Primitive]], step: int):
+        """
+        Add 'step' to the counts in self.unique of the values of its fields in 'values'.
+        """
+        for field_name, column in values.items():
+            counts = self.unique.get(field_name)
+            if counts is None:
+                continue
+            for value in column:
+                count = counts.get(value, 0) + step
+                if count:
+                    counts[value] = count
+                else:
+                    del counts[value]
+
+    def _check_constraints(self, deltas: dict[str, list[Primitive]], changed: dict[str, list[Primitive]],
+                           existing: Optional[dict[str, Collection[Primitive]]] = None,
+                           scheduler: Optional['TypewideScheduler'] = None) -> Status:
+        """
+        Check the typewide constraints after a mutation without reading the rows it left unchanged: the local
+        constraints are checked against 'deltas', the changed entries, and UNIQUE against 'changed', the values written
+        to each field, which must not be in 'existing', the values of the other live rows ({ID: self.positions} and
+        self.unique by default). Only the other constraints, which must see every value, read the live rows of their
+        fields. With a scheduler, the rows 'deltas' appended by self.add_entries() are checked in parallel chunks the
+        same way (see TypewideScheduler.check()).
+        """
+        values = _LiveValues(self)
+        existing = {ID: self.positions, **self.unique} if existing is None else existing
+        if scheduler is not None:
+            return self.datatype.check_constraints(
+                values, deltas, check=lambda constraints: scheduler.check(constraints, values, deltas, existing))
+
+        def check(constraints: list) -> list[Status]:
+            statuses = []
+            for bound_constraint in constraints:
+                if bound_constraint.constraint is TYPEWIDE_CONSTRAINTS["UNIQUE"]:
+                    statuses.append(bound_constraint.check_unique(changed, existing))
+                else:
+                    statuses.append(bound_constraint.check(deltas if bound_constraint.constraint.is_local else values))
+            return statuses
+        return self.datatype.check_constraints(values, deltas, check=check)
+
+    def is_deleted(self, row: int) -> bool:
+        """
+        Return whether the row at position 'row' was deleted.
+        """
+        return bool(self.deleted[row >> 3] & (1 << (row & 7)))
+
+    def live_rows(self, rows: Optional[Iterable[int]] = None) -> list[int]:
+        """
+        Return the rows of 'rows' (all rows if None), in the same order, without the deleted ones.
+        """
+        rows = range(len(self.ids)) if rows is None else rows
+        if not self.tombstones:
+            return list(rows)
+        deleted = self.deleted
+        return [row for row in rows if not deleted[row >> 3] & (1 << (row & 7))]
+
+    def live(self, field_name: str) -> list[Primitive]:
+        """
+        Return the values of the field with name 'field_name' in the rows that weren't deleted. The list is the column
+        itself if no row is deleted, and must not be modified.
+        """
+        column = self._read(field_name)
+        return column if not self.tombstones else [column[row] for row in self.live_rows()]
+
+    def _read(self, field_name: str) -> list[Primitive]:
+        """
+        Return the column of the field with name 'field_name', paged in if it was spilled, and record the access.
+        """
+        self.accessed[field_name] = time.monotonic()
+        column = self.values[field_name]
+        return column.load() if isinstance(column, SpilledColumn) else column
+
+    def spill(self, field_name: str, directory: str) -> bool:
+        """
+        Write the column of the field with name 'field_name' to a memory-mapped file in 'directory', which frees its
+        memory unless something else holds it, e.g. an open snapshot. Rows can still be appended and rolled back
+        without reading the file, and the column is paged back in when it is next read (see
+        utilities.memory.SpilledColumn).
+        :return: whether the column was spilled, which it isn't if it doesn't exist, is already spilled, is shared
+            with forks or other graphs, or has updates waiting for self.commit().
+        """
+        column = self.values.get(field_name)
+        if (column is None or isinstance(column, SpilledColumn) or self.shared or
+                ("values", field_name) in self._share or field_name in self._pending):
+            return False
+        self.values[field_name] = SpilledColumn(column, directory, self.values, field_name)
+        return True
+
+    def memory(self) -> dict[str, Any]:
+        """
+        Estimate the memory held by this object, in bytes: "Columns" maps each field name to the size of its column
+        (see utilities.memory.column_size()), "Spilled" maps the name of each spilled field to the size of its file,
+        and "Ids", "Entries", "Positions", "Deleted", "Stamps" and "Indexes" are the sizes of the other structures,
+        without the values they share with the columns. "Total" sums everything but "Spilled". The columns, ids,
+        entries and positions of a shared view belong to its VertexStore and aren't counted.
+        """
+        columns, spilled = {}, {}
+        if not self.shared:
+            for field_name, column in self.values.items():
+                if isinstance(column, SpilledColumn) and column.spilled_size():
+                    spilled[field_name] = column.spilled_size()
+                else:
+                    columns[field_name] = column_size(column)
+        owned = not self.shared
+        usage = {"Columns": columns, "Spilled": spilled,
+                 "Ids": sys.getsizeof(self.ids) if owned else 0,
+                 "Entries": (sys.getsizeof(self.entries) + sample_size(self.entries.values(), len(self.entries))
+                             if owned else 0),
+                 "Positions": (sys.getsizeof(self.positions) + sample_size(self.positions.values(), len(self.positions))
+                               if owned else 0),
+                 "Deleted": sys.getsizeof(self.deleted),
+                 "Stamps": sys.getsizeof(self.stamps[1]),
+                 "Indexes": sum(sys.getsizeof(index.keys) + sys.getsizeof(index.rows) +
+                                sample_size(index.rows, len(index.rows)) for index in self.indexes.values())}
+        usage["Total"] = sum(columns.values()) + sum(value for key, value in usage.items()
+                                                     if key not in ("Columns", "Spilled"))
+        return usage
+
+    def compaction(self) -> 'DataCompaction':
+        """
+        Build copies of the columns without the deleted rows, without changing this object, so that readers can run
+        meanwhile. The result is installed by self.compact().
+        """
+        return DataCompaction(self)
+
+    def compact(self, compaction: 'DataCompaction') -> bool:
+        """
+        Replace the columns with the ones built by 'compaction', reclaiming the deleted rows, unless the entries were
+        mutated since it was built. Open cursors and snapshots keep reading the previous columns. The indexes are
+        rebuilt when they are next used, and position tokens of cursors expire.
+        :return: whether the columns were replaced.
+        """
+        if compaction.version != self.version:
+            return False
+        for key in list(self._share):
+            if key != ("entries",):
+                self._unshare(key)
+        self.values = compaction.values
+        self.ids = compaction.ids
+        self.positions = compaction.positions
+        self.deleted = bytearray((len(self.ids) + 7) >> 3)
+        self._pending = {}
+        self._published_deleted = None
+        self.tombstones = 0
+        self.stamps = compaction.stamps
+        self.statistics = compaction.statistics
+        self.last = None
+        self.version = next_version()
+        self.last_rewrite = self.version
+        return True
+
+    def fork(self) -> 'Data':
+        """
+        Return a copy of this Data object in constant time. The copy shares the columns, ids, entries, positions and
+        tombstone bitmap of this object until one of them is mutated, which then copies the buffers it changes first
+        (see self._own()). The copy starts with its own statistics and with empty indexes over the same fields, which
+        are built when they are first used.
+        """
+        other = copy.copy(self)
+        for key in [*(("values", field_name) for field_name in self.values), *((name,) for name in _BUFFERS)]:
+            self._share.setdefault(key, [1])[0] += 1
+        other._share = dict(self._share)
+        other.values = dict(self.values)
+        other.computed = dict(self.computed)
+        other.accessed = dict(self.accessed)
+        other.statistics = copy.deepcopy(self.statistics)
+        other.stamps = (self.stamps[0], list(self.stamps[1]))
+        other.indexes = {field_name: SortedIndex(field_name) for field_name in self.indexes}
+        other._pending = {}
+        other._published_deleted = None
+        other.last = None
+        return other
+
+    def release(self):
+        """
+        Stop sharing buffers with forks, e.g. because this object is discarded. It must not be used afterwards.
+        """
+        for key in list(self._share):
+            self._unshare(key)
+
+    def _unshare(self, key: tuple[str, ...]) -> bool:
+        """
+        Stop counting this object among the holders of the buffer 'key' and return whether others still hold it.
+        """
+        token = self._share.pop(key, None)
+        if token is None:
+            return False
+        token[0] -= 1
+        return token[0] > 0
+
+    def _own(self, buffers: Iterable[str], columns: Iterable[str] = ()):
+        """
+        Copy the buffers shared with forks (or with the Data object this one was forked from) that are about to be
+        mutated. Only the first of the objects sharing a buffer to mutate it copies it, and the others keep sharing it.
+        :param buffers: the names of the attributes to copy, among _BUFFERS.
+        :param columns: the names of the fields whose columns to copy.
+        """
+        for name in buffers:
+            if self._unshare((name,)):
+                buffer = getattr(self, name)
+                setattr(self, name, {key: dict(counts) for key, counts in buffer.items()} if name == "unique" else
+                        copy.copy(buffer))
+        for field_name in columns:
+            if self._unshare(("values", field_name)):
+                self.values[field_name] = list(self.values[field_name])
+
+    def committed(self) -> int:
+        """
+        Return the number of committed rows.
+        """
+        stable, versions = self.stamps
+        return stable + len(versions)
+
+    def commit(self, version: int):
+        """
+        Publish the deletions and updates made since the last commit, which are written to copies of the tombstone
+        bitmap and of the columns until then, to the bitmap and columns read by snapshots and cursors, and stamp the
+        rows added since the last commit with the commit version 'version', making them visible to snapshots at this
+        version or later. Must be called while holding the commit lock of the graph, if any.
+        """
+        for field_name, (column, rows) in self._pending.items():
+            written = self.values[field_name]
+            column[len(column):] = written[len(column):]
+            for row in rows:
+                column[row] = written[row]
+            self.values[field_name] = column
+        self._pending = {}
+        if self._published_deleted is not None:
+            self._published_deleted[:] = self.deleted
+            self.deleted, self._published_deleted = self._published_deleted, None
+        self.stamps[1].extend([version] * (len(self.ids) - self.committed()))
+
+    def published(self) -> tuple[dict[str, list[Primitive]], bytearray]:
+        """
+        Return a copy of the dictionary of columns and the tombstone bitmap as of the last commit, without the
+        deletions and updates waiting for self.commit().
+        """
+        deleted = self.deleted
+        columns = dict(self.values)
+        columns.update((field_name, column) for field_name, (column, rows) in list(self._pending.items()))
+        published = self._published_deleted
+        return columns, deleted if published is None else published
+
+    def collect(self, oldest: int):
+        """
+        Forget the commit stamps at or before 'oldest', the version of the oldest open snapshot.
+        """
+        self.stamps = collect(self.stamps, oldest)
 
     def size(self) -> int:
         """
@@ -106,9 +666,85 @@ class Data:
     def get_field(self, field_name: str) -> Status:
         """
         Return an OK Status object containing the list of primitive type values for the field with name 'field_name'
-        in the context named "data".
+        in the context named "data", without the deleted rows.
         """
-        return DataGetFieldStatus(field_name, self.values.get(field_name))
+        return DataGetFieldStatus(field_name, self.live(field_name) if field_name in self.values else None)
+
+    def cursor(self, fields: Optional[list[str]] = None, batch_size: int = 1000) -> Status:
+        """
+        Open a DataCursor over the current entries, which reads them lazily in batches of 'batch_size' rows instead of
+        copying them like self.get_entries() and self.get_field().
+        :param fields: the names of the fields read by the cursor, including computed fields. All fields of the
+            datatype if None.
+        :return: an OK Status with the DataCursor in the context "data", or an ERROR Status if a field doesn't exist.
+        """
+        return self._open_cursor(fields, self.version, len(self.ids), 0, batch_size, None)
+
+    def resume(self, token: str, fields: Optional[list[str]] = None, batch_size: int = 1000) -> Status:
+        """
+        Open a DataCursor continuing a previous read from the position token returned by DataCursor.token(). The
+        cursor sees the same rows as the original cursor, even if entries were inserted since it was opened.
+        :return: an OK Status with the DataCursor in the context "data", or an ERROR Status if a field doesn't exist or
+            the token is invalid or has expired because existing rows have since been changed.
+        """
+        parsed = DataCursor.parse_token(token)
+        if parsed is None or parsed[0] < self.last_rewrite or parsed[1] > len(self.ids):
+            return DataCursorStatus(list(self.datatype.names) if fields is None else fields, token)
+        version, rows, position = parsed
+        return self._open_cursor(fields, version, rows, position, batch_size, token)
+
+    def _open_cursor(self, fields: Optional[list[str]], version: int, rows: int, position: int, batch_size: int,
+                     token: Optional[str]) -> Status:
+        fields = list(self.datatype.names) if fields is None else fields
+        if any(field_name not in self.values for field_name in fields):
+            return DataCursorStatus(fields, token)
+        columns = {field_name: self._read(field_name) for field_name in fields}
+        return DataCursorStatus(fields, token, DataCursor(columns, version, rows, position, batch_size, self.deleted))
+
+    def create_index(self, field_name: str) -> Status:
+        """
+        Create a SortedIndex over the field with name 'field_name', which may be a computed field. Creating an index
+        that already exists does nothing.
+        :return: an OK Status, or an ERROR Status if the field doesn't exist.
+        """
+        success = field_name in self.values
+        if success and field_name not in self.indexes:
+            self.indexes[field_name] = SortedIndex(field_name)
+        return DataCreateIndexStatus(field_name, success)
+
+    def drop_index(self, field_name: str):
+        """
+        Drop the index over the field with name 'field_name', if any.
+        """
+        self.indexes.pop(field_name, None)
+
+    def index(self, field_name: str) -> Optional[SortedIndex]:
+        """
+        Return the up-to-date index over the field with name 'field_name', or None if there is no such index.
+        """
+        index = self.indexes.get(field_name)
+        if index is not None:
+            index.refresh(self._read(field_name), self.version, self.last_rewrite,
+                          self.deleted if self.tombstones else None)
+        return index
+
+    def attach_field(self, field_name: str, datatype: PrimitiveTypes, values: list[Primitive]) -> Status:
+        """
+        Attaches a computed field (e.g. the result of an analytics algorithm) to the entries, replacing any computed
+        field with the same name. values[i] becomes the value of the field for the entry at position i of self.ids.
+        :return: an OK Status if the field is attached, or an ERROR Status if field_name is a field of self.datatype or
+            the values don't match the number of entries or the datatype.
+        """
+        success = (field_name not in self.datatype.names and len(values) == len(self.ids) and
+                   TYPEWIDE_CONSTRAINTS["CHECKTYPE_" + datatype.name].f([values]))
+        if success:
+            self._unshare(("values", field_name))
+            self.computed[field_name] = datatype
+            self.values[field_name] = list(values)
+            self.statistics.rebuild(field_name, self.values[field_name])
+            self.version = next_version()
+            self.last_rewrite = self.version
+        return DataAttachFieldStatus(field_name, success)
 
     def get_entry(self, id: Primitive) -> Optional[dict[str, Primitive]]:
         """
@@ -118,6 +754,62 @@ class Data:
 
     def get_entries(self) -> list[dict[str, Primitive]]:
         """
-        Return a list of all entries in self.entries.
+        Return a list of all entries in self.entries. The list is cached in RESULT_CACHE until the next mutation and
+        must not be modified.
+        """
+        return RESULT_CACHE.get(self, "get_entries", (), self.version, lambda: list(self.entries.values()))
+
+
+class DataCompaction:
+    """
+    The columns of a Data object without its deleted rows, built by Data.compaction() and installed by Data.compact().
+    The rows may also be permuted (see Graph.reordering()).
+    Attributes:
+        version: the version of the Data object the compaction was built from.
+        values: the compacted values of each field and computed field.
+        ids: the compacted ids.
+        positions: a dictionary mapping each id to its row in the compacted columns.
+        stamps: the commit stamps of the compacted rows.
+        statistics: the DataStatistics rebuilt over the compacted columns.
+        reclaimed: the number of rows removed.
+        reordered: whether the rows were permuted.
+    """
+
+    def __init__(self, data: Data, rows: Optional[list[int]] = None):
+        """
+        :param rows: the live rows of 'data' in the order of the new columns, or None to keep their order. The rows
+            visible to every snapshot (see Data.stamps) must come first, and the others must keep their order.
         """
-        return list(self.entries.values())
+        self.version = data.version
+        self.reordered = rows is not None
+        rows = data.live_rows() if rows is None else rows
+        self.values = {key: [values[row] for row in rows] for key, values in data.values.items()}
+        self.ids = [data.ids[row] for row in rows]
+        self.positions = {id: row for row, id in enumerate(self.ids)}
+        stable, versions = data.stamps
+        committed = stable + len(versions)
+        self.stamps = (sum(1 for row in rows if row < stable),
+                       [versions[row - stable] for row in rows if stable <= row < committed])
+        self.statistics = DataStatistics(list(self.values))
+        for key, values in self.values.items():
+            self.statistics.rebuild(key, values)
+        self.reclaimed = len(data.ids) - len(rows)
+
+
+class _LiveValues(Mapping):
+    """
+    The live rows of the columns of a Data object as a read-only dictionary, which gathers those of a field only when
+    it is read, i.e. by the typewide constraints that must see every value (see Data._check_constraints()).
+    """
+
+    def __init__(self, data: Data):
+        self.data = data
+
+    def __getitem__(self, field_name: str) -> list[Primitive]:
+        return self.data.live(field_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data.values)
+
+    def __len__(self) -> int:
+        return len(self.data.values)
@@ -1,16 +1,28 @@
+import copy
+import sys
+import threading
+from typing import Iterator
+
 from datatypes.vertex import *
 from datatypes.edge import *
 from datatypes.primitive import *
 from constraints.graphwide import *
+from constraints.parallel import GraphwideScheduler
 from statuses.status import *
+from graphs.csr import CSRAdjacency
+from graphs.statistics import GraphStatistics
+from graphs.data import DataCompaction
+from graphs.ordering import ORDERINGS, vertex_order
+from graphs.packed import PackedNeighbors
+from graphs.store import VertexStore
+from graphs.views import AggregateView, ViewStatus, VERTICES, EDGES
+from graphs.snapshot import GraphEdgesFromStatus, Snapshot, SnapshotRegistry, collect
+from utilities.cache import RESULT_CACHE, next_version
+from utilities.instrumentation import INSTRUMENTATION
+from utilities.memory import sample_size
 
-
-class GraphEdgesFromStatus(LeafStatus):
-    def __init__(self, id: Primitive, graph_name: str, data: Optional[list[dict[str, Primitive]]] = None):
-        super().__init__("Fetching Edges Successful",
-                         "Fetching Edges Failed -- id doesn't exist",
-                         data is not None,
-                         {"id": id, "Graph Name": graph_name})
+# the structures of a Graph shared with its forks until mutated (see Graph.fork())
+_SHARED = ("adjacency", "statistics", "views")
 
 
 class GraphMutatorStatus(DerivedStatus):
@@ -21,12 +33,39 @@ class GraphMutatorStatus(DerivedStatus):
                          {"Graph Name": graph_name})
 
 
+class GraphIncidentEdgesStatus(LeafStatus):
+    def __init__(self, id: Primitive, edges: int, graph_name: str):
+        super().__init__("No Remaining Incident Edges",
+                         "Vertex has Incident Edges -- Delete them or Cascade",
+                         edges == 0,
+                         {"id": id, "Incident Edges": edges, "Graph Name": graph_name})
+
+
+class GraphCompactionStatus(LeafStatus):
+    def __init__(self, graph_name: str, reclaimed: Optional[int] = None):
+        super().__init__("Compaction Successful",
+                         "Compaction Abandoned -- Graph Changed Meanwhile",
+                         reclaimed is not None,
+                         {"Graph Name": graph_name, "Rows Reclaimed": reclaimed})
+
+
+class GraphOrderingStatus(LeafStatus):
+    def __init__(self, method: str, graph_name: str):
+        super().__init__("Vertex Ordering Found",
+                         "Unknown Vertex Ordering",
+                         method in ORDERINGS,
+                         {"Ordering": method, "Graph Name": graph_name})
+
+
 class GraphCheckConstraintStatus(DerivedStatus):
-    def __init__(self, substatuses: list[Status], graph_name: str):
+    def __init__(self, substatuses: list[Status], graph_name: str, cancelled: Optional[list[str]] = None):
+        context = {"Graph Name": graph_name}
+        if cancelled:
+            context["Cancelled"] = cancelled
         super().__init__("Graphwide Constraints Passed",
                          "Graphwide Constraints Violated",
                          substatuses,
-                         {"Graph Name": graph_name})
+                         context)
 
 
 class Graph:
@@ -34,50 +73,276 @@ class Graph:
     A SQLonGraphs Graph, implemented using an adjacency matrix.
     Attributes:
         name: the string name of the graph.
-        vertices: the Data object containing the VertexType of the graph.
+        vertices: the Data object containing the VertexType of the graph, which is a SharedData view if the graph was
+            created over a VertexStore.
         edges: the Data object containing the EdgeType of the graph. In addition, the from and to attribute of every entry
             in the EdgeType must correspond to a valid id in the above VertexType so that self.check_constraints()
             doesn't return a Statuses containing errors.
         M: an adjacency matrix representing the graph. M[id] is the list of edges incident from the vertex with id 'id'.
         constraints: a list of GraphwideConstraints imposed on this graph. They must be satisfied so that
             self.check_constraints() doesn't return a Statuses containing errors.
+        statistics: the GraphStatistics of the graph, updated when insertions are committed.
+        vertex_versions: a dictionary mapping the id of each vertex to the version of the commit that added it, for
+            the vertices that some open snapshot may not see.
+        adjacency_stamps: a dictionary mapping the id of each vertex to the commit stamps of the edges in M[id] (see
+            graphs.snapshot.visible()).
+        snapshots: the SnapshotRegistry of the open snapshots of the graph (see self.snapshot()).
+        views: a dictionary mapping the name of each materialized view of the graph to the AggregateView, updated by
+            every insertion.
+        version: a number identifying the current state of the graph, replaced by a new, larger number from
+            utilities.cache.next_version() by every committed mutation. Rolled-back mutations leave it unchanged. The
+            results of read queries are cached in RESULT_CACHE under this version, so vertices and edges must only be
+            mutated through the graph.
+        parent: the Graph this graph was forked from (see self.fork()), or None.
+        base: the number of vertex and edge rows the graph shared with its parent when it was forked, after which the
+            rows inserted into the fork begin. (0, 0) if the graph isn't a fork.
+        scheduler: the GraphwideScheduler checking self.constraints in parallel, or None to check them one after the
+            other in the calling thread.
+        packed: the PackedNeighbors index of self.M built by self.pack(), which self.has_edge() searches and
+            self.neighbors() decodes instead of scanning the adjacency lists, or None. It is updated by every committed
+            mutation and rebuilt by a compaction of the vertices, whose rows it holds.
     """
 
-    def __init__(self, name: str, vertextype: VertexType, edgetype: EdgeType, constraints: list[GraphwideConstraint]):
+    def __init__(self, name: str, vertextype: VertexType, edgetype: EdgeType, constraints: list[GraphwideConstraint],
+                 store: Optional[VertexStore] = None):
         """
         Creates a graph with no vertices or edges and with the given VertexType, EdgeType, and GraphwideConstraints.
         Client should call self.check_constraints() immediately after constructor call to detect any ill-formed Graphs.
+        :param store: a VertexStore of the VertexType holding the vertices of the graph along with those of other
+            graphs, or None for the graph to hold its own.
         """
         self.name: str = name
-        self.vertices: Data = Data(vertextype)
+        self.vertices: Data = Data(vertextype) if store is None else store.view()
         self.edges: Data = Data(edgetype)
         self.constraints: list[GraphwideConstraint] = constraints
         self.constraints.append(GRAPHWIDE_CONSTRAINTS["REFERENTIAL_INTEGRITY"])
         self.M: dict[Primitive, list[dict[str, Primitive]]] = {}
+        self.statistics = GraphStatistics()
+        self.views: dict[str, AggregateView] = {}
+        self.vertex_versions: dict[Primitive, int] = {}
+        self.adjacency_stamps: dict[Primitive, tuple[int, list[int]]] = {}
+        self.snapshots = SnapshotRegistry()
+        self._unstable: set[Primitive] = set()
+        self._commit_lock = threading.Lock()
+        self.version: int = next_version()
+        self.parent: Optional[Graph] = None
+        self.base: tuple[int, int] = (0, 0)
+        self._share: dict[str, list[int]] = {}
+        self._owned: Optional[set[Primitive]] = None
+        self.scheduler: Optional[GraphwideScheduler] = None
+        self.packed: Optional[PackedNeighbors] = None
 
     def vertices_list(self) -> list[dict[str, Primitive]]:
         """
-        Return a list of all entries in the graph's VertexType.
+        Return a list of all entries in the graph's VertexType. The list is cached until the next committed mutation
+        and must not be modified.
         """
-        return list(self.vertices.entries.values())
+        return RESULT_CACHE.get(self, "vertices_list", (), self.version, lambda: list(self.vertices.entries.values()))
 
     def edges_list(self) -> list[dict[str, Primitive]]:
         """
-        Return a list of all entries (edges) in the graph's EdgeType.
+        Return a list of all entries (edges) in the graph's EdgeType. The list is cached until the next committed
+        mutation and must not be modified.
+        """
+        return RESULT_CACHE.get(self, "edges_list", (), self.version, lambda: list(self.edges.entries.values()))
+
+    def vertices_cursor(self, fields: Optional[list[str]] = None, batch_size: int = 1000) -> Status:
+        """
+        Open a cursor reading the vertices lazily (see Data.cursor()).
+        """
+        return self.vertices.cursor(fields, batch_size)
+
+    def edges_cursor(self, fields: Optional[list[str]] = None, batch_size: int = 1000) -> Status:
+        """
+        Open a cursor reading the edges lazily (see Data.cursor()).
         """
-        return list(self.edges.entries.values())
+        return self.edges.cursor(fields, batch_size)
 
     def edges_from(self, id: Primitive) -> Status:
         """
         Return an OK Status object containing a list of edges in the context "data" where the 'from' attributes of the entries
-        equal to 'id'. If 'id' doesn't exist, then an ERROR Status is returned.
+        equal to 'id'. If 'id' doesn't exist, then an ERROR Status is returned. The Status is cached until the next
+        committed mutation and must not be modified.
+        """
+        return RESULT_CACHE.get(self, "edges_from", (id,), self.version,
+                                lambda: GraphEdgesFromStatus(id, self.name, self.M.get(id)))
+
+    def csr(self, reverse: bool = False) -> CSRAdjacency:
+        """
+        Return a CSRAdjacency view of the graph, following the edges backwards if 'reverse' is True. The view is cached
+        until the next committed mutation and must not be modified.
+        """
+        return RESULT_CACHE.get(self, "csr", (reverse,), self.version,
+                                lambda: CSRAdjacency(self.vertices, self.edges, reverse))
+
+    def pack(self, block_size: int = 64):
+        """
+        Build self.packed from the adjacency lists, in time linear in the number of edges. It is then kept up to date
+        until it's set to None.
+        :param block_size: the number of rows per block of the longer lists (see PackedNeighbors).
+        """
+        packed = PackedNeighbors(block_size)
+        positions = self.vertices.positions
+        for id, adjacency in self.M.items():
+            for edge in adjacency:
+                packed.add(id, positions[edge[TO]])
+        packed.flush()
+        self.packed = packed
+
+    def snapshot(self) -> Snapshot:
+        """
+        Take a Snapshot of the committed state of the graph, which can be read without locking while the graph is
+        being written. The snapshot should be released (or used in a with block) once it is no longer needed, so that
+        its commit stamps can be garbage collected.
+        """
+        return Snapshot(self)
+
+    def collect(self, blocking: bool = True):
+        """
+        Garbage-collect the commit stamps that every open and future snapshot can see, i.e. those at or before the
+        version of the oldest open snapshot (or the current version if there is none).
+        :param blocking: if False, nothing is collected if a commit is in progress.
+        """
+        if not self._commit_lock.acquire(blocking):
+            return
+        try:
+            self._collect(self.snapshots.oldest(lambda: self.version))
+        finally:
+            self._commit_lock.release()
+
+    def _collect(self, oldest: int):
+        self.vertices.collect(oldest)
+        self.edges.collect(oldest)
+        for id in list(self._unstable):
+            if self.vertex_versions.get(id, oldest) <= oldest:
+                self.vertex_versions.pop(id, None)
+            stamps = self.adjacency_stamps[id] = collect(self.adjacency_stamps[id], oldest)
+            if not stamps[1] and id not in self.vertex_versions:
+                self._unstable.discard(id)
+
+    def fork(self, name: str) -> 'Graph':
+        """
+        Return a copy of the graph named 'name' in constant time, e.g. to try out speculative insertions. The fork
+        shares the columns of the vertices and edges, the adjacency matrix, the statistics and the views with this
+        graph until either graph is mutated: the mutated graph then copies the columns and dictionaries it changes
+        (see Data.fork()), and the adjacency list of a vertex only when an edge is added to it. The insertions into the
+        fork can be applied to this graph by self.merge(), or the fork discarded by self.release().
+        """
+        with self._commit_lock:
+            other = copy.copy(self)
+            other.name = name
+            other.vertices = self.vertices.fork()
+            other.edges = self.edges.fork()
+            other.constraints = list(self.constraints)
+            # Every row and adjacency entry of this graph is visible to every snapshot of the fork, whose commit
+            # stamps are thus only collected by this graph.
+            other.vertex_versions = {}
+            other._unstable = set()
+            other.snapshots = SnapshotRegistry()
+            other._commit_lock = threading.Lock()
+            other.parent = self
+            other.base = (self.vertices.committed(), self.edges.committed())
+            for name in _SHARED:
+                self._share.setdefault(name, [1])[0] += 1
+            other._share = dict(self._share)
+            self._owned = set()
+            other._owned = set()
+        return other
+
+    def merge(self, fork: 'Graph') -> Status:
+        """
+        Insert the vertices and edges inserted into 'fork' since it was forked from this graph (see self.insert()).
+        Insertions into this graph since the fork was made are kept, and the constraints are checked against both.
+        Deletions and updates of the entries shared with this graph aren't merged.
+        """
+        vertices = self._rows(fork.vertices, fork.base[0])
+        edges = self._rows(fork.edges, fork.base[1])
+        return self.insert(vertices, edges)
+
+    @staticmethod
+    def _rows(data: Data, start: int) -> list[dict[str, Primitive]]:
+        names = list(data.datatype.names)
+        columns = [data.values[name] for name in names]
+        return [dict(zip(names, (column[row] for column in columns)))
+                for row in data.live_rows(range(start, len(data.ids)))]
+
+    def release(self):
+        """
+        Stop sharing buffers with forks, e.g. because this graph is discarded. It must not be used afterwards.
+        """
+        self.vertices.release()
+        self.edges.release()
+        for name in list(self._share):
+            self._unshare(name)
+
+    def _unshare(self, name: str) -> bool:
+        token = self._share.pop(name, None)
+        if token is None:
+            return False
+        token[0] -= 1
+        return token[0] > 0
+
+    def _own(self, *names: str):
+        """
+        Copy the structures among _SHARED named 'names' that are shared with forks (or with the graph this one was
+        forked from) before mutating them: "adjacency" is the adjacency matrix and its commit stamps, whose adjacency
+        lists remain shared until self._own_adjacency() is called.
+        """
+        for name in names:
+            if not self._unshare(name):
+                continue
+            if name == "adjacency":
+                self.M = dict(self.M)
+                self.adjacency_stamps = dict(self.adjacency_stamps)
+                if self.packed is not None:
+                    self.packed = self.packed.copy()
+            else:
+                setattr(self, name, copy.deepcopy(getattr(self, name)))
+
+    def _own_adjacency(self, id: Primitive):
+        self.M[id] = list(self.M[id])
+        stable, versions = self.adjacency_stamps[id]
+        self.adjacency_stamps[id] = (stable, list(versions))
+        self._owned.add(id)
+
+    def create_view(self, name: str, view: AggregateView) -> Status:
         """
-        return GraphEdgesFromStatus(id, self.name, self.M.get(id))
+        Declare a materialized view named 'name' over the graph, e.g. AggregateView.out_degree(). The view is computed
+        from the current entries and then maintained by every insertion, so self.view(name).get(key) reads an
+        aggregate in constant time.
+        :return: an OK Status with the view in the context "data", or an ERROR Status if the name is already used or
+            the view refers to a field that doesn't exist.
+        """
+        statuses = view.validate(name, self.vertices.datatype, self.edges.datatype, set(self.views))
+        status = ViewStatus(statuses, name)
+        if not status.success:
+            return status
+        self._own("views")
+        view.apply(list((self.vertices if view.side == VERTICES else self.edges).entries.values()))
+        view.commit()
+        self.views[name] = view
+        return ViewStatus(statuses, name, view)
+
+    def drop_view(self, name: str) -> bool:
+        """
+        Remove the materialized view named 'name'. Return whether it existed.
+        """
+        return self.views.pop(name, None) is not None
+
+    def view(self, name: str) -> Optional[AggregateView]:
+        """
+        Return the materialized view named 'name', or None if there is no such view.
+        """
+        return self.views.get(name)
 
     def has_edge(self, start: Primitive, end: Primitive) -> bool:
         """
         Return whether there exists an edge with the from and to attribute equalling to 'start' and 'end' respectively.
+        The adjacency list of 'start' is searched in self.packed if the graph is packed, and scanned otherwise.
         """
+        if self.packed is not None:
+            row = self.vertices.positions.get(end)
+            return row is not None and self.packed.contains(start, row)
         if self.M.get(start) is None:
             return False
         for edge in self.M.get(start):
@@ -85,38 +350,327 @@ class Graph:
                 return True
         return False
 
+    def neighbors(self, id: Primitive) -> Iterator[Primitive]:
+        """
+        Iterate over the ids of the to vertices of the edges from the vertex 'id', once per edge. They are decoded from
+        self.packed in the order of their rows if the graph is packed, and read from self.M in the order of the
+        edges otherwise. The graph must not be mutated during the iteration.
+        """
+        if self.packed is not None:
+            column = self.vertices.values[ID]
+            return (column[row] for row in self.packed.neighbors(id))
+        return (edge[TO] for edge in self.M.get(id, []))
+
     def insert(self, new_vertices: Optional[list[dict[str, Primitive]]] = None,
-               new_edges: Optional[list[dict[str, Primitive]]] = None) -> Status:
+               new_edges: Optional[list[dict[str, Primitive]]] = None, dry_run: bool = False) -> Status:
         """
         Insert a list of vertices into the VertexType of the graph and insert a list of edges into the EdgeType of
         the graph. If self.check_constraints() returns no ERRORs after the insertion, then a Statuses object with no ERRORs
         is returned. Otherwise, the insertion is rolled back with no state changed and ERROR statuses will be thrown.
         :param new_vertices:
         :param new_edges:
+        :param dry_run: if True, the insertion is always rolled back, so only its Status is computed.
         :return: a Status showing the result of this operation.
         """
         new_vertices = [] if new_vertices is None else new_vertices
         new_edges = [] if new_edges is None else new_edges
+        self._own(*_SHARED)
         add_vertex_status = self.vertices.add_entries(new_vertices)
         add_edge_status = self.edges.add_entries(new_edges)
+        for view in self.views.values():
+            view.apply(new_vertices if view.side == VERTICES else new_edges)
         graph_constraints_status = self.check_constraints()
         status = GraphMutatorStatus([add_vertex_status, add_edge_status, graph_constraints_status],
                                     self.name)
-        if not status.success:
+        if not status.success or dry_run:
+            probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
             self.vertices.rollback(new_vertices)
             self.edges.rollback(new_edges)
+            for view in self.views.values():
+                view.rollback()
+            if probe is not None:
+                INSTRUMENTATION.stop("Graph.rollback", probe, len(new_vertices) + len(new_edges), status)
         else:
-            for vertex in new_vertices:
-                self.M[vertex[ID]] = []
-            for edge in new_edges:
-                self.M[edge[FROM]].append(edge)
+            for view in self.views.values():
+                view.commit()
+            with self._commit_lock:
+                version = next_version()
+                self.vertices.commit(version)
+                self.edges.commit(version)
+                probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
+                for vertex in new_vertices:
+                    self.vertex_versions[vertex[ID]] = version
+                    self.adjacency_stamps[vertex[ID]] = (0, [])
+                    self.M[vertex[ID]] = []
+                    if self._owned is not None:
+                        self._owned.add(vertex[ID])
+                for edge in new_edges:
+                    if self._owned is not None and edge[FROM] not in self._owned:
+                        self._own_adjacency(edge[FROM])
+                    self.adjacency_stamps[edge[FROM]][1].append(version)
+                    self.M[edge[FROM]].append(edge)
+                if self.packed is not None:
+                    positions = self.vertices.positions
+                    for edge in new_edges:
+                        self.packed.add(edge[FROM], positions[edge[TO]])
+                    self.packed.flush()
+                self._unstable.update(vertex[ID] for vertex in new_vertices)
+                self._unstable.update(edge[FROM] for edge in new_edges)
+                if probe is not None:
+                    INSTRUMENTATION.stop("Graph.adjacency_update", probe, len(new_vertices) + len(new_edges), status)
+                self.statistics.add([vertex[ID] for vertex in new_vertices],
+                                    [(edge[FROM], edge[TO]) for edge in new_edges])
+                self.version = version
+            self.collect()
         return status
 
+    def delete(self, vertex_ids: Optional[list[Primitive]] = None, edge_ids: Optional[list[Primitive]] = None,
+               cascade: bool = False, dry_run: bool = False) -> Status:
+        """
+        Delete the vertices and edges with the given ids (see Data.delete_entries()). The edges incident from a deleted
+        vertex are found in its adjacency list, and those incident to it by a scan of the edges, which is skipped if
+        the statistics show that there are none. If the constraints are violated after the deletion, then it is
+        rolled back with no state changed and ERROR statuses will be thrown.
+        :param cascade: if True, the edges incident to or from a deleted vertex are deleted as well. Otherwise, the
+            deletion fails unless they are deleted by the same call.
+        :param dry_run: if True, the deletion is always rolled back, so only its Status is computed.
+        :return: a Status showing the result of this operation.
+        """
+        vertex_ids = [] if vertex_ids is None else vertex_ids
+        edge_ids = [] if edge_ids is None else list(edge_ids)
+        doomed = set(vertex_ids)
+        incident: dict[Primitive, list[Primitive]] = {vid: [edge[ID] for edge in self.M.get(vid, [])]
+                                                      for vid in vertex_ids}
+        if any(self.statistics.in_degrees.get(vid) for vid in doomed):
+            for edge in self.edges.entries.values():
+                if edge[TO] in doomed and edge[FROM] != edge[TO]:
+                    incident[edge[TO]].append(edge[ID])
+        targeted = set(edge_ids)
+        statuses = []
+        for vid in vertex_ids:
+            remaining = [eid for eid in incident[vid] if eid not in targeted]
+            if cascade:
+                edge_ids.extend(remaining)
+                targeted.update(remaining)
+            else:
+                statuses.append(GraphIncidentEdgesStatus(vid, len(remaining), self.name))
+        self._own(*_SHARED)
+        delete_edge_status = self.edges.delete_entries(edge_ids)
+        delete_vertex_status = self.vertices.delete_entries(vertex_ids)
+        removed_vertices, removed_edges = self.vertices.last.data, self.edges.last.data
+        statuses += [delete_edge_status, delete_vertex_status, self.check_constraints()]
+        status = GraphMutatorStatus(statuses, self.name)
+        if not status.success or dry_run:
+            self._rollback()
+            return status
+        for view in self.views.values():
+            view.apply([], removed_vertices if view.side == VERTICES else removed_edges)
+            view.commit()
+        with self._commit_lock:
+            version = next_version()
+            self.vertices.commit(version)
+            self.edges.commit(version)
+            for edge in removed_edges:
+                self._unlink(edge)
+            if self.packed is not None:
+                # The rows of the deleted vertices are no longer in self.vertices.positions.
+                rows = {vertex[ID]: entry_context["row"]
+                        for vertex, entry_context in zip(removed_vertices, self.vertices.last.context)}
+                for edge in removed_edges:
+                    self.packed.remove(edge[FROM], rows.get(edge[TO], self.vertices.positions.get(edge[TO])))
+                for vertex in removed_vertices:
+                    self.packed.drop(vertex[ID])
+                self.packed.flush()
+            for vertex in removed_vertices:
+                vid = vertex[ID]
+                del self.M[vid]
+                del self.adjacency_stamps[vid]
+                self.vertex_versions.pop(vid, None)
+                self._unstable.discard(vid)
+            self.statistics.remove([vertex[ID] for vertex in removed_vertices],
+                                   [(edge[FROM], edge[TO]) for edge in removed_edges])
+            self.version = version
+        return status
+
+    def update(self, vertices: Optional[list[dict[str, Primitive]]] = None,
+               edges: Optional[list[dict[str, Primitive]]] = None, dry_run: bool = False) -> Status:
+        """
+        Update vertices and edges in place (see Data.update_entries()). The id of an entry and the from and to of an
+        edge can't be updated: delete the entry and insert a new one instead. If the constraints are violated after
+        the update, then it is rolled back with no state changed and ERROR statuses will be thrown.
+        :param vertices: a list of dictionaries mapping ID to the id of a vertex and some fields to their new values.
+        :param edges: the same for edges.
+        :param dry_run: if True, the update is always rolled back, so only its Status is computed.
+        :return: a Status showing the result of this operation.
+        """
+        vertices = [] if vertices is None else vertices
+        edges = [] if edges is None else edges
+        self._own("adjacency", "views")
+        update_vertex_status = self.vertices.update_entries(vertices)
+        update_edge_status = self.edges.update_entries(edges, (ID, FROM, TO))
+        transactions = {VERTICES: self.vertices.last, EDGES: self.edges.last}
+        status = GraphMutatorStatus([update_vertex_status, update_edge_status, self.check_constraints()], self.name)
+        if not status.success or dry_run:
+            self._rollback()
+            return status
+        for view in self.views.values():
+            last = transactions[view.side]
+            view.apply(last.data, [entry_context["previous"] for entry_context in last.context])
+            view.commit()
+        with self._commit_lock:
+            version = next_version()
+            self.vertices.commit(version)
+            self.edges.commit(version)
+            last = transactions[EDGES]
+            for edge, entry_context in zip(last.data, last.context):
+                source = edge[FROM]
+                if self._owned is not None and source not in self._owned:
+                    self._own_adjacency(source)
+                adjacency = self.M[source]
+                adjacency[self._position(adjacency, entry_context["previous"])] = edge
+            self.version = version
+        return status
+
+    def _rollback(self):
+        probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
+        rows = len(self.vertices.last.data) + len(self.edges.last.data)
+        self.vertices.rollback()
+        self.edges.rollback()
+        if probe is not None:
+            INSTRUMENTATION.stop("Graph.rollback", probe, rows)
+
+    @staticmethod
+    def _position(adjacency: list[dict[str, Primitive]], edge: dict[str, Primitive]) -> int:
+        return next(position for position, other in enumerate(adjacency) if other is edge)
+
+    def _unlink(self, edge: dict[str, Primitive]):
+        """
+        Remove 'edge' from the adjacency list of its from vertex and its commit stamp from the adjacency stamps.
+        """
+        source = edge[FROM]
+        if self._owned is not None and source not in self._owned:
+            self._own_adjacency(source)
+        adjacency = self.M[source]
+        position = self._position(adjacency, edge)
+        del adjacency[position]
+        stable, versions = self.adjacency_stamps[source]
+        if position < stable:
+            self.adjacency_stamps[source] = (stable - 1, versions)
+        else:
+            del versions[position - stable]
+
+    def memory(self) -> dict[str, Any]:
+        """
+        Estimate the memory held by the graph, in bytes: "Vertices" and "Edges" are the estimates of Data.memory(),
+        "Adjacency" is the size of the adjacency matrix and its commit stamps, without the edges it shares with
+        self.edges, "Packed" the size of self.packed (0 if the graph isn't packed), "Statistics" the size of the degree statistics and "Views" the size of the materialized views.
+        "Total" sums them.
+        """
+        stamps = lambda stamp: sys.getsizeof(stamp) + sys.getsizeof(stamp[1])
+        usage = {"Vertices": self.vertices.memory(), "Edges": self.edges.memory(),
+                 "Adjacency": (sys.getsizeof(self.M) + sample_size(self.M.values(), len(self.M)) +
+                               sys.getsizeof(self.adjacency_stamps) +
+                               sample_size(self.adjacency_stamps.values(), len(self.adjacency_stamps), stamps)),
+                 "Packed": self.packed.memory() if self.packed is not None else 0,
+                 "Statistics": sum(map(sys.getsizeof, (self.statistics.out_degrees, self.statistics.in_degrees,
+                                                       self.statistics.out_histogram, self.statistics.in_histogram))),
+                 "Views": sum(sys.getsizeof(view.groups) + sample_size(view.groups.values(), len(view.groups))
+                              for view in self.views.values())}
+        usage["Total"] = (usage["Vertices"]["Total"] + usage["Edges"]["Total"] + usage["Adjacency"] +
+                          usage["Packed"] + usage["Statistics"] + usage["Views"])
+        return usage
+
+    def tombstone_ratio(self) -> float:
+        """
+        Return the fraction of the rows of the vertices and edges that were deleted and not yet compacted. Vertices in
+        a shared VertexStore aren't compacted and don't count.
+        """
+        owned = [data for data in (self.vertices, self.edges) if not data.shared]
+        rows = sum(len(data.ids) for data in owned)
+        return sum(data.tombstones for data in owned) / rows if rows else 0.0
+
+    def compaction(self) -> tuple[Optional[DataCompaction], DataCompaction]:
+        """
+        Build compacted copies of the columns of the vertices and edges (see Data.compaction()). Since the graph is
+        only read, this can run while holding a read lock, and the result is installed by self.compact(). The vertex
+        compaction is None if the vertices are in a shared VertexStore.
+        """
+        return self.vertices.compaction(), self.edges.compaction()
+
+    def compact(self, compaction: tuple[Optional[DataCompaction], DataCompaction]) -> Status:
+        """
+        Install the compacted columns built by self.compaction() or self.reordering(), reclaiming the deleted rows,
+        unless the graph was mutated since they were built.
+        :return: an OK Status with the number of rows reclaimed, or an ERROR Status if the compaction is out of date.
+        """
+        vertex_compaction, edge_compaction = compaction
+        with self._commit_lock:
+            if ((vertex_compaction is not None and vertex_compaction.version != self.vertices.version) or
+                    edge_compaction.version != self.edges.version):
+                return GraphCompactionStatus(self.name)
+            reclaimed = edge_compaction.reclaimed
+            if vertex_compaction is not None:
+                self.vertices.compact(vertex_compaction)
+                reclaimed += vertex_compaction.reclaimed
+                if vertex_compaction.reordered:
+                    # The adjacency lists are iterated in the order of the vertices as well.
+                    self.M = {vid: self.M[vid] for vid in self.vertices.ids}
+                    self.adjacency_stamps = {vid: self.adjacency_stamps[vid] for vid in self.vertices.ids}
+                if self.packed is not None:
+                    self.pack(self.packed.block_size)
+            self.edges.compact(edge_compaction)
+            self.version = next_version()
+        return GraphCompactionStatus(self.name, reclaimed)
+
+    def reordering(self, method: str = "rcm") -> tuple[Optional[DataCompaction], DataCompaction]:
+        """
+        Build compacted copies of the columns of the vertices and edges (see self.compaction()) with the vertices in
+        the order computed by graphs.ordering.vertex_order(), and the edges sorted by the new rows of their from and
+        to vertices, so that the edges of a vertex, and the vertices adjacent to it, are stored close to each other.
+        Once installed by self.compact(), every view built from the columns, such as self.csr(), and every snapshot
+        taken afterwards follow the new order; ids are unchanged. The rows that some open snapshot may not see keep
+        their order at the end of the columns. The vertices of a shared VertexStore aren't reordered.
+        :param method: one of ORDERINGS.
+        """
+        self.collect()
+        forward = CSRAdjacency(self.vertices, self.edges)
+        backward = CSRAdjacency(self.vertices, self.edges, reverse=True)
+        vertex_rows = self.vertices.live_rows()
+        vertex_compaction = None
+        if not self.vertices.shared:
+            stable = self.vertices.stamps[0]
+            stable_indices = [i for i, row in enumerate(forward.vertex_rows) if row < stable]
+            order = vertex_order(forward, backward, stable_indices, method)
+            vertex_rows = [forward.vertex_rows[i] for i in order] + [row for row in vertex_rows if row >= stable]
+            vertex_compaction = DataCompaction(self.vertices, vertex_rows)
+        position = {self.vertices.ids[row]: k for k, row in enumerate(vertex_rows)}
+        sources, destinations = self.edges.values[FROM], self.edges.values[TO]
+        stable = self.edges.stamps[0]
+        edge_rows = self.edges.live_rows()
+        order = sorted((row for row in edge_rows if row < stable),
+                       key=lambda row: (position[sources[row]], position[destinations[row]], row))
+        edge_compaction = DataCompaction(self.edges, order + [row for row in edge_rows if row >= stable])
+        return vertex_compaction, edge_compaction
+
+    def reorder(self, method: str = "rcm") -> Status:
+        """
+        Store the vertices and edges in a cache-friendly order (see self.reordering()), reclaiming the deleted rows.
+        :return: an OK Status with the number of rows reclaimed, or an ERROR Status if 'method' is unknown.
+        """
+        ordering_status = GraphOrderingStatus(method, self.name)
+        if not ordering_status.success:
+            return ordering_status
+        return self.compact(self.reordering(method))
+
     def check_constraints(self) -> Status:
         """
         Checks whether the graphwide constraints of this graph is satisfied. If so, then an OK Status is returned.
-        Otherwise, an ERROR is returned.
+        Otherwise, an ERROR is returned. With a scheduler, the constraints left unchecked after one fails are listed in
+        the context "Cancelled".
         """
+        if self.scheduler is not None:
+            statuses, cancelled = self.scheduler.check(self.constraints, self.vertices, self.edges)
+            return GraphCheckConstraintStatus(statuses, self.name, cancelled)
         statuses = []
         for constraint in self.constraints:
             statuses.append(constraint.check(self.vertices, self.edges))
@@ -0,0 +1,108 @@
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+from datatypes.primitive import Primitive, NULL
+
+
+class SortedIndex:
+    """
+    A secondary index over one field of a Data object, answering equality and range lookups by binary search.
+    The index is maintained lazily: Data.index() calls self.refresh(), which indexes the rows appended since the last
+    refresh, and rebuilds the index if rows were rewritten. Data.rollback() truncates the rows it removes, and rows
+    deleted or updated in place are removed by Data and, if updated, indexed again by the next refresh (see
+    self.remove() and self.reindex()). Deleted rows are never indexed.
+    Attributes:
+        field_name: the name of the indexed field.
+        keys: the non-NULL values of the field, sorted in ascending order.
+        rows: the row of each value in keys. Rows with equal values are sorted in ascending order.
+        size: the number of rows of the Data object covered by the index.
+        version: the version of the Data object when the index was last refreshed.
+        pending: the rows covered by the index whose value was removed and must be indexed again by the next refresh.
+    """
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.keys: list[Primitive] = []
+        self.rows: list[int] = []
+        self.size = 0
+        self.version = -1
+        self.pending: set[int] = set()
+
+    def refresh(self, values: list[Primitive], version: int, last_rewrite: int, deleted: Optional[bytearray] = None):
+        """
+        Bring the index up to date with the column 'values' of a Data object at 'version'.
+        :param last_rewrite: the version of the last mutation of the Data object that changed existing rows.
+        :param deleted: the tombstone bitmap of the Data object (see Data.deleted), if any row is deleted.
+        """
+        if version == self.version and not self.pending:
+            return
+        if last_rewrite > self.version:
+            self.keys, self.rows, self.size = [], [], 0
+            self.pending = set()
+        for row in sorted(self.pending):
+            value = values[row]
+            if value is not NULL and (deleted is None or not deleted[row >> 3] & (1 << (row & 7))):
+                start, end = bisect_left(self.keys, value), bisect_right(self.keys, value)
+                position = bisect_left(self.rows, row, start, end)
+                self.keys.insert(position, value)
+                self.rows.insert(position, row)
+        self.pending = set()
+        appended = [(value, row) for row, value in enumerate(values[self.size:], self.size) if value is not NULL and
+                    (deleted is None or not deleted[row >> 3] & (1 << (row & 7)))]
+        if len(appended) > len(self.keys) // 8:
+            pairs = sorted(list(zip(self.keys, self.rows)) + appended)
+            self.keys = [key for key, _ in pairs]
+            self.rows = [row for _, row in pairs]
+        else:
+            for value, row in appended:
+                position = bisect_right(self.keys, value)
+                self.keys.insert(position, value)
+                self.rows.insert(position, row)
+        self.size = len(values)
+        self.version = version
+
+    def truncate(self, size: int):
+        """
+        Remove the rows at and after position 'size' from the index, e.g. after they were rolled back.
+        """
+        if size < self.size:
+            kept = [(key, row) for key, row in zip(self.keys, self.rows) if row < size]
+            self.keys = [key for key, _ in kept]
+            self.rows = [row for _, row in kept]
+            self.size = size
+            self.pending = {row for row in self.pending if row < size}
+
+    def reindex(self, row: int):
+        """
+        Index the value of 'row' again at the next refresh, e.g. because it was updated.
+        """
+        if row < self.size:
+            self.pending.add(row)
+
+    def remove(self, value: Primitive, row: int):
+        """
+        Remove 'value' at 'row' from the index, if the row is indexed.
+        """
+        if value is not NULL and row < self.size and row not in self.pending:
+            start, end = bisect_left(self.keys, value), bisect_right(self.keys, value)
+            position = bisect_left(self.rows, row, start, end)
+            if position < end and self.rows[position] == row:
+                del self.keys[position]
+                del self.rows[position]
+
+    def equal(self, value: Primitive) -> list[int]:
+        """
+        Return the sorted list of rows whose value equals 'value'.
+        """
+        if value is NULL:
+            return []
+        return sorted(self.rows[bisect_left(self.keys, value):bisect_right(self.keys, value)])
+
+    def range(self, low: Optional[Primitive] = None, high: Optional[Primitive] = None, include_low: bool = True,
+              include_high: bool = True) -> list[int]:
+        """
+        Return the sorted list of rows whose value lies between 'low' and 'high'. A bound of None is unbounded.
+        """
+        start = 0 if low is None else (bisect_left if include_low else bisect_right)(self.keys, low)
+        end = len(self.keys) if high is None else (bisect_right if include_high else bisect_left)(self.keys, high)
+        return sorted(self.rows[start:end])
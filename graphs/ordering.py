@@ -0,0 +1,45 @@
+from collections import deque
+
+from graphs.csr import CSRAdjacency
+
+ORDERINGS = {"degree", "bfs", "rcm"}
+
+
+def _neighbors(forward: CSRAdjacency, backward: CSRAdjacency, i: int) -> list[int]:
+    return sorted(set(forward.neighbors(i)) | set(backward.neighbors(i)))
+
+
+def vertex_order(forward: CSRAdjacency, backward: CSRAdjacency, indices: list[int], method: str) -> list[int]:
+    """
+    Return the vertex indices in 'indices' of the forward and backward CSRAdjacency views of the graph in a
+    cache-friendly order, so that the indices of adjacent vertices are close to each other:
+    - "degree" sorts the vertices by decreasing degree, which packs the hubs that most traversals go through;
+    - "bfs" lists the vertices in breadth-first order of the undirected graph, starting each connected component from
+      its vertex of highest degree;
+    - "rcm" is the reverse Cuthill-McKee order, a breadth-first order starting each component from a vertex of lowest
+      degree and visiting the neighbors of a vertex by increasing degree, reversed, which minimizes the bandwidth of
+      the adjacency matrix.
+    Ties are broken by index, so the order is deterministic. 'method' must be one of ORDERINGS.
+    """
+    degree = lambda i: forward.degree(i) + backward.degree(i)
+    if method == "degree":
+        return sorted(indices, key=lambda i: -degree(i))
+    rcm = method == "rcm"
+    seeds = sorted(indices, key=degree if rcm else lambda i: -degree(i))
+    wanted = set(indices)
+    visited: set[int] = set()
+    order = []
+    for seed in seeds:
+        if seed in visited:
+            continue
+        visited.add(seed)
+        queue = deque([seed])
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            neighbors = [j for j in _neighbors(forward, backward, i) if j not in visited and j in wanted]
+            if rcm:
+                neighbors.sort(key=degree)
+            visited.update(neighbors)
+            queue.extend(neighbors)
+    return order[::-1] if rcm else order
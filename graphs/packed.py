@@ -0,0 +1,166 @@
+import sys
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from typing import Iterable, Iterator, Union
+
+from datatypes.primitive import Primitive
+from graphs.csr import PackedArray
+
+
+def _encode(rows: Iterable[int]) -> bytes:
+    """
+    Encode non-negative rows sorted in ascending order as the varints of their differences.
+    """
+    data = bytearray()
+    previous = 0
+    for row in rows:
+        delta = row - previous
+        previous = row
+        while delta > 0x7F:
+            data.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        data.append(delta)
+    return bytes(data)
+
+
+def _decode(data: bytes) -> list[int]:
+    rows = []
+    row, delta, shift = 0, 0, 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            row += delta
+            rows.append(row)
+            delta, shift = 0, 0
+        else:
+            shift += 7
+    return rows
+
+
+def _count(rows: list[int], row: int) -> int:
+    return bisect_right(rows, row) - bisect_left(rows, row)
+
+
+class PackedNeighbors:
+    """
+    A packed index of the adjacency lists of a Graph (see Graph.pack()). The adjacency list of each vertex is
+    indexed by the rows of the to vertices of its edges, sorted and encoded as the varints of their differences, so
+    that Graph.has_edge() searches them instead of scanning the list, and Graph.neighbors() decodes them as it goes.
+    A list of at most block_size rows is a single bytes string, decoded whole. A longer one is a PackedArray, whose
+    blocks are located by binary search over their skip pointers, so a search decodes at most two blocks.
+    The rows added to or removed from a list are kept in sorted tails, which self.flush() merges into the list once
+    they hold an eighth of its rows, so a mutation re-encodes a constant number of rows on average.
+    Attributes:
+        block_size: the number of rows per block of a PackedArray.
+        lists: a dictionary mapping the id of each vertex with edges from it to its encoded rows.
+        added: a dictionary mapping the id of a vertex to the sorted rows added to its list since it was encoded.
+        removed: the same for the rows removed from its list.
+        dirty: the ids of the vertices whose tails were changed since the last call to self.flush().
+    """
+
+    def __init__(self, block_size: int = 64):
+        self.block_size = block_size
+        self.lists: dict[Primitive, Union[bytes, PackedArray]] = {}
+        self.added: dict[Primitive, list[int]] = {}
+        self.removed: dict[Primitive, list[int]] = {}
+        self.dirty: set[Primitive] = set()
+
+    def add(self, id: Primitive, row: int):
+        """
+        Add 'row' to the list of the vertex 'id'. Parallel edges add the same row more than once.
+        """
+        removed = self.removed.get(id)
+        position = bisect_left(removed, row) if removed else 0
+        if removed and position < len(removed) and removed[position] == row:
+            del removed[position]
+        else:
+            insort(self.added.setdefault(id, []), row)
+        self.dirty.add(id)
+
+    def remove(self, id: Primitive, row: int):
+        """
+        Remove 'row' from the list of the vertex 'id' once. The row must be in the list.
+        """
+        added = self.added.get(id)
+        position = bisect_left(added, row) if added else 0
+        if added and position < len(added) and added[position] == row:
+            del added[position]
+        else:
+            insort(self.removed.setdefault(id, []), row)
+        self.dirty.add(id)
+
+    def drop(self, id: Primitive):
+        """
+        Remove the list of the vertex 'id'.
+        """
+        self.lists.pop(id, None)
+        self.added.pop(id, None)
+        self.removed.pop(id, None)
+        self.dirty.discard(id)
+
+    def contains(self, id: Primitive, row: int) -> bool:
+        """
+        Return whether 'row' is in the list of the vertex 'id'.
+        """
+        encoded = self.lists.get(id)
+        count = 0
+        if isinstance(encoded, bytes):
+            count = _count(_decode(encoded), row)
+        elif encoded is not None:
+            position = encoded.find(row, 0, len(encoded))
+            while 0 <= position < len(encoded) and encoded[position] == row:
+                count += 1
+                position += 1
+        return count + _count(self.added.get(id, []), row) - _count(self.removed.get(id, []), row) > 0
+
+    def neighbors(self, id: Primitive) -> Iterator[int]:
+        """
+        Iterate over the rows in the list of the vertex 'id' in ascending order, decoding a block at a time. The index
+        must not be mutated during the iteration.
+        """
+        encoded = self.lists.get(id, b"")
+        rows = _decode(encoded) if isinstance(encoded, bytes) else encoded
+        removed = self.removed.get(id, [])
+        k = 0
+        for row in merge(rows, self.added.get(id, [])):
+            if k < len(removed) and removed[k] == row:
+                k += 1
+            else:
+                yield row
+
+    def flush(self):
+        """
+        Merge the tails of the lists changed since the last call into the encoded rows, unless they hold less than an
+        eighth of the rows of a PackedArray.
+        """
+        dirty, self.dirty = self.dirty, set()
+        for id in dirty:
+            encoded = self.lists.get(id)
+            changes = len(self.added.get(id, [])) + len(self.removed.get(id, []))
+            if isinstance(encoded, PackedArray) and changes * 8 < len(encoded):
+                continue
+            rows = list(self.neighbors(id))
+            self.drop(id)
+            if rows:
+                self.lists[id] = _encode(rows) if len(rows) <= self.block_size else PackedArray(rows, self.block_size)
+
+    def copy(self) -> 'PackedNeighbors':
+        """
+        Return a copy of the index, which shares the encoded rows with it, e.g. for a fork of its Graph.
+        """
+        other = PackedNeighbors(self.block_size)
+        other.lists = dict(self.lists)
+        other.added = {id: list(rows) for id, rows in self.added.items()}
+        other.removed = {id: list(rows) for id, rows in self.removed.items()}
+        other.dirty = set(self.dirty)
+        return other
+
+    def memory(self) -> int:
+        """
+        Estimate the memory held by the index, in bytes, including the dictionaries and tails.
+        """
+        size = lambda encoded: (sys.getsizeof(encoded) if isinstance(encoded, bytes) else
+                                sys.getsizeof(encoded) + encoded.nbytes())
+        return (sys.getsizeof(self.lists) + sum(map(size, self.lists.values())) +
+                sum(sys.getsizeof(tails) + sum(map(sys.getsizeof, tails.values()))
+                    for tails in (self.added, self.removed)))
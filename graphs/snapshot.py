@@ -0,0 +1,203 @@
+import threading
+from bisect import bisect_right
+from typing import Callable, Optional, TYPE_CHECKING
+
+from datatypes.primitive import Primitive
+from graphs.cursor import DataCursor
+from statuses.status import *
+
+if TYPE_CHECKING:
+    from graphs.graph import Graph
+
+
+class GraphEdgesFromStatus(LeafStatus):
+    def __init__(self, id: Primitive, graph_name: str, data: Optional[list[dict[str, Primitive]]] = None):
+        context = {"id": id, "Graph Name": graph_name}
+        if data is not None:
+            context["data"] = data
+        super().__init__("Fetching Edges Successful",
+                         "Fetching Edges Failed -- id doesn't exist",
+                         data is not None,
+                         context)
+
+
+class SnapshotFieldStatus(LeafStatus):
+    def __init__(self, field_name: str, success: bool):
+        super().__init__("Field Found",
+                         "Field does not Exist",
+                         success,
+                         {"Field Name": field_name})
+
+
+class SnapshotStatus(DerivedStatus):
+    def __init__(self, substatuses: list[Status], graph_name: str, data=None):
+        context = {"Graph Name": graph_name}
+        if data is not None:
+            context["data"] = data
+        super().__init__("Snapshot Read Successful",
+                         "Snapshot Read Failed",
+                         substatuses,
+                         context)
+
+
+def visible(stamps: tuple[int, list[int]], version: int) -> int:
+    """
+    Return the number of rows or adjacency entries committed at or before 'version', given their commit stamps as a
+    (number of rows visible to every snapshot, commit versions of the following rows) pair.
+    """
+    stable, versions = stamps
+    return stable + bisect_right(versions, version)
+
+
+def collect(stamps: tuple[int, list[int]], oldest: int) -> tuple[int, list[int]]:
+    """
+    Return 'stamps' without the commit versions at or before 'oldest', which every snapshot can see.
+    """
+    stable, versions = stamps
+    k = bisect_right(versions, oldest)
+    return (stable + k, versions[k:]) if k else stamps
+
+
+class SnapshotRegistry:
+    """
+    The versions pinned by the open snapshots of a Graph, which tells garbage collection which commit stamps are still
+    needed.
+    Attributes:
+        pins: a dictionary mapping each pinned version to the number of open snapshots at this version.
+    """
+
+    def __init__(self):
+        self.pins: dict[int, int] = {}
+        self.lock = threading.Lock()
+
+    def pin(self, current: Callable[[], int]) -> int:
+        """
+        Pin and return the version current() at the time of the call.
+        """
+        with self.lock:
+            version = current()
+            self.pins[version] = self.pins.get(version, 0) + 1
+            return version
+
+    def release(self, version: int):
+        with self.lock:
+            self.pins[version] -= 1
+            if self.pins[version] == 0:
+                del self.pins[version]
+
+    def oldest(self, current: Callable[[], int]) -> int:
+        """
+        Return the oldest pinned version, or current() if there is none. Commit stamps at or before this version are
+        visible to every open and future snapshot.
+        """
+        with self.lock:
+            return min(self.pins) if self.pins else current()
+
+
+class Snapshot:
+    """
+    A consistent read-only view of a Graph as of a committed version. Every row of the vertices and edges and every
+    entry of the adjacency matrix is stamped with the version of the commit that added it, so a snapshot only sees
+    what was committed before it was taken: insertions committed later, and insertions in progress or rolled back, are
+    invisible. Reading a snapshot takes no lock, and taking one only waits for a commit being installed, so it never
+    waits for writers checking their constraints.
+    Statistics, views and indexes of the graph are not versioned and always reflect the latest state, and neither are
+    deletions and updates once committed: they are applied to copies of the tombstone bitmap and of the columns they
+    change, which are written back when they are committed (see Data.commit()), so an open snapshot sees the rows
+    whose deletion is committed before the graph is next compacted as deleted, and the committed values of the rows
+    it sees, but never the deletions and updates in progress or rolled back.
+    Attributes:
+        graph: the Graph.
+        version: the version of the graph the snapshot sees.
+        vertex_rows: the number of vertex rows visible.
+        edge_rows: the number of edge rows visible.
+        vertex_columns: the columns of the vertices when the snapshot was taken.
+        edge_columns: the columns of the edges when the snapshot was taken.
+        vertex_deleted: the tombstone bitmap of vertex_columns (see Data.deleted).
+        edge_deleted: the tombstone bitmap of edge_columns.
+        open: whether the snapshot still pins its version (see self.release()).
+    """
+
+    def __init__(self, graph: 'Graph'):
+        self.graph = graph
+        # Taken between commits, which only hold the lock while they are installed, so that the columns, bitmaps and
+        # stamps are those of the same version.
+        with graph._commit_lock:
+            self.version = graph.snapshots.pin(lambda: graph.version)
+            self.vertex_columns, self.vertex_deleted = graph.vertices.published()
+            self.edge_columns, self.edge_deleted = graph.edges.published()
+            self.vertex_rows = visible(graph.vertices.stamps, self.version)
+            self.edge_rows = visible(graph.edges.stamps, self.version)
+        self.open = True
+
+    def release(self):
+        """
+        Unpin the version of the snapshot, so that the commit stamps it needed can be garbage collected. The snapshot
+        must not be read afterwards.
+        """
+        if self.open:
+            self.open = False
+            self.graph.snapshots.release(self.version)
+            self.graph.collect(blocking=False)
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    @staticmethod
+    def _rows(names: list[str], columns: dict[str, list[Primitive]], rows: int,
+              deleted: bytearray) -> list[dict[str, Primitive]]:
+        projected = [columns[name] for name in names]
+        return [dict(zip(names, values)) for row, values in enumerate(zip(*(column[:rows] for column in projected)))
+                if not deleted[row >> 3] & (1 << (row & 7))]
+
+    def vertices_list(self) -> list[dict[str, Primitive]]:
+        """
+        Return a list of the vertices visible in the snapshot.
+        """
+        return self._rows(list(self.graph.vertices.datatype.names), self.vertex_columns, self.vertex_rows,
+                          self.vertex_deleted)
+
+    def edges_list(self) -> list[dict[str, Primitive]]:
+        """
+        Return a list of the edges visible in the snapshot.
+        """
+        return self._rows(list(self.graph.edges.datatype.names), self.edge_columns, self.edge_rows,
+                          self.edge_deleted)
+
+    def has_vertex(self, id: Primitive) -> bool:
+        """
+        Return whether the vertex with id 'id' is visible in the snapshot.
+        """
+        if id not in self.graph.M:
+            return False
+        created = self.graph.vertex_versions.get(id)
+        return created is None or created <= self.version
+
+    def edges_from(self, id: Primitive) -> Status:
+        """
+        Return an OK Status object containing the list of edges from the vertex with id 'id' visible in the snapshot
+        in the context "data", or an ERROR Status if the vertex isn't visible (see Graph.edges_from()).
+        """
+        if not self.has_vertex(id):
+            return GraphEdgesFromStatus(id, self.graph.name)
+        stamps = self.graph.adjacency_stamps.get(id, (0, []))
+        return GraphEdgesFromStatus(id, self.graph.name, self.graph.M[id][:visible(stamps, self.version)])
+
+    def cursor(self, edges: bool = False, fields: Optional[list[str]] = None, batch_size: int = 1000) -> Status:
+        """
+        Open a cursor over the vertices (or the edges if 'edges' is True) visible in the snapshot.
+        :return: an OK Status with the DataCursor in the context "data", or an ERROR Status if a field doesn't exist.
+        """
+        data, columns, deleted = ((self.graph.edges, self.edge_columns, self.edge_deleted) if edges else
+                                  (self.graph.vertices, self.vertex_columns, self.vertex_deleted))
+        fields = list(data.datatype.names) if fields is None else fields
+        statuses = [SnapshotFieldStatus(field_name, field_name in columns) for field_name in fields]
+        status = SnapshotStatus(statuses, self.graph.name)
+        if not status.success:
+            return status
+        cursor = DataCursor({field_name: columns[field_name] for field_name in fields}, self.version,
+                            self.edge_rows if edges else self.vertex_rows, batch_size=batch_size, deleted=deleted)
+        return SnapshotStatus(statuses, self.graph.name, cursor)
@@ -0,0 +1,221 @@
+from math import log
+from typing import Optional
+
+from datatypes.primitive import Primitive, NULL
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(value: Primitive) -> int:
+    """
+    Return a well-distributed 64-bit hash of 'value'. Python's hash() is the identity on small integers, so it is
+    scrambled with the splitmix64 finalizer.
+    """
+    z = (hash(value) + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+class HyperLogLog:
+    """
+    A HyperLogLog sketch estimating the number of distinct values added to it in constant memory, with a relative
+    standard error of about 1.04 / sqrt(2 ** precision).
+    Attributes:
+        precision: the number of hash bits selecting a register.
+        registers: for each register, the largest position of the leading 1 bit seen among the hashes mapped to it.
+    """
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Primitive):
+        x = _mix(value)
+        j = x & ((1 << self.precision) - 1)
+        w = x >> self.precision
+        rank = 64 - self.precision - w.bit_length() + 1
+        if rank > self.registers[j]:
+            self.registers[j] = rank
+
+    def estimate(self) -> float:
+        """
+        Return the estimated number of distinct values added.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * log(m / zeros)
+        return raw
+
+
+class ColumnStatistics:
+    """
+    Statistics over the values of one field of a Data object.
+    Attributes:
+        rows: the number of values.
+        nulls: the number of NULL values.
+        minimum: the smallest non-NULL value, or None.
+        maximum: the largest non-NULL value, or None.
+        distinct: a HyperLogLog sketch of the non-NULL values.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.minimum: Primitive = NULL
+        self.maximum: Primitive = NULL
+        self.distinct = HyperLogLog()
+
+    def add(self, values: list[Primitive]):
+        self.rows += len(values)
+        present = [value for value in values if value is not NULL]
+        self.nulls += len(values) - len(present)
+        if not present:
+            return
+        try:
+            low, high = min(present), max(present)
+            self.minimum = low if self.minimum is NULL or low < self.minimum else self.minimum
+            self.maximum = high if self.maximum is NULL or high > self.maximum else self.maximum
+        except TypeError:
+            pass
+        for value in present:
+            self.distinct.add(value)
+
+    def remove(self, values: list[Primitive]):
+        """
+        Forget 'values', e.g. because their rows were deleted. The minimum, maximum and distinct count can't be
+        decremented and remain upper bounds until the statistics are rebuilt.
+        """
+        self.rows -= len(values)
+        self.nulls -= sum(1 for value in values if value is NULL)
+
+    def distinct_count(self) -> float:
+        """
+        Return the estimated number of distinct non-NULL values, which is at least 1 if there are any.
+        """
+        if self.rows == self.nulls:
+            return 0.0
+        return min(max(1.0, self.distinct.estimate()), float(self.rows - self.nulls))
+
+    def snapshot(self) -> tuple:
+        return self.rows, self.nulls, self.minimum, self.maximum, bytes(self.distinct.registers)
+
+    def restore(self, snapshot: tuple):
+        self.rows, self.nulls, self.minimum, self.maximum, registers = snapshot
+        self.distinct.registers[:] = registers
+
+
+class DataStatistics:
+    """
+    Statistics over every field and computed field of a Data object, maintained incrementally by Data.add_entries(),
+    Data.delete_entries() and Data.update_entries(), and undone by Data.rollback().
+    Attributes:
+        columns: a dictionary mapping each field name to its ColumnStatistics.
+    """
+
+    def __init__(self, names: list[str]):
+        self.columns: dict[str, ColumnStatistics] = {name: ColumnStatistics() for name in names}
+        self._previous: Optional[dict[str, tuple]] = None
+
+    def add(self, values: dict[str, list[Primitive]], start: int):
+        """
+        Add the rows from position 'start' onwards of the columns in 'values'. Only the last addition can be undone.
+        """
+        self._previous = {name: column.snapshot() for name, column in self.columns.items()}
+        for name, column in self.columns.items():
+            column.add(values[name][start:])
+
+    def update(self, removed: dict[str, list[Primitive]], added: dict[str, list[Primitive]]):
+        """
+        Forget the values in 'removed' and add the values in 'added', both dictionaries mapping some field names to
+        lists of values. Only the last update or addition can be undone.
+        """
+        self._previous = {name: column.snapshot() for name, column in self.columns.items()}
+        for name, values in removed.items():
+            self.columns[name].remove(values)
+        for name, values in added.items():
+            self.columns[name].add(values)
+
+    def rollback(self):
+        """
+        Undo the last call to self.add() or self.update().
+        """
+        if self._previous is not None:
+            for name, snapshot in self._previous.items():
+                self.columns[name].restore(snapshot)
+            self._previous = None
+
+    def rebuild(self, name: str, values: list[Primitive]):
+        """
+        Replace the statistics of the column 'name' with statistics over 'values'.
+        """
+        self.columns[name] = ColumnStatistics()
+        self.columns[name].add(values)
+        self._previous = None
+
+
+class GraphStatistics:
+    """
+    Degree statistics of a Graph, maintained incrementally when insertions and deletions are committed.
+    Attributes:
+        out_degrees: a dictionary mapping each vertex id to the number of edges incident from it.
+        in_degrees: a dictionary mapping each vertex id to the number of edges incident to it.
+        out_histogram: a dictionary mapping each out-degree to the number of vertices with it.
+        in_histogram: a dictionary mapping each in-degree to the number of vertices with it.
+        edge_count: the number of edges.
+    """
+
+    def __init__(self):
+        self.out_degrees: dict[Primitive, int] = {}
+        self.in_degrees: dict[Primitive, int] = {}
+        self.out_histogram: dict[int, int] = {}
+        self.in_histogram: dict[int, int] = {}
+        self.edge_count = 0
+
+    @staticmethod
+    def _increment(degrees: dict[Primitive, int], histogram: dict[int, int], vid: Primitive, step: int = 1):
+        degree = degrees[vid]
+        histogram[degree] -= 1
+        if histogram[degree] == 0:
+            del histogram[degree]
+        degrees[vid] = degree + step
+        histogram[degree + step] = histogram.get(degree + step, 0) + 1
+
+    def add(self, vertex_ids: list[Primitive], edges: list[tuple[Primitive, Primitive]]):
+        """
+        Account for committed vertices with ids 'vertex_ids' and edges given as (from, to) pairs.
+        """
+        for vid in vertex_ids:
+            self.out_degrees[vid] = self.in_degrees[vid] = 0
+        if vertex_ids:
+            self.out_histogram[0] = self.out_histogram.get(0, 0) + len(vertex_ids)
+            self.in_histogram[0] = self.in_histogram.get(0, 0) + len(vertex_ids)
+        self.edge_count += len(edges)
+        for source, target in edges:
+            self._increment(self.out_degrees, self.out_histogram, source)
+            self._increment(self.in_degrees, self.in_histogram, target)
+
+    def remove(self, vertex_ids: list[Primitive], edges: list[tuple[Primitive, Primitive]]):
+        """
+        Account for the deletion of the edges given as (from, to) pairs, then of the vertices with ids 'vertex_ids',
+        which must have no remaining edges.
+        """
+        self.edge_count -= len(edges)
+        for source, target in edges:
+            self._increment(self.out_degrees, self.out_histogram, source, -1)
+            self._increment(self.in_degrees, self.in_histogram, target, -1)
+        for vid in vertex_ids:
+            for degrees, histogram in ((self.out_degrees, self.out_histogram), (self.in_degrees, self.in_histogram)):
+                degree = degrees.pop(vid)
+                histogram[degree] -= 1
+                if histogram[degree] == 0:
+                    del histogram[degree]
+
+    def average_degree(self) -> float:
+        """
+        Return the average out-degree (equal to the average in-degree) of the vertices.
+        """
+        return self.edge_count / len(self.out_degrees) if self.out_degrees else 0.0
@@ -0,0 +1,349 @@
+import copy
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, Optional
+
+from datatypes.primitive import Primitive, PrimitiveTypes, NULL
+from datatypes.raw import ID
+from datatypes.vertex import VertexType
+from graphs.data import *
+from graphs.index import SortedIndex
+from statuses.status import *
+from utilities.Transaction import Transaction
+from utilities.cache import next_version
+from utilities.instrumentation import INSTRUMENTATION
+from utilities.memory import column_size, sample_size
+
+
+class VertexStoreEntryStatus(LeafStatus):
+    def __init__(self, id: Primitive, success: bool):
+        super().__init__("Vertex Added to the Graph",
+                         "Vertex Already in the Graph, or Conflicting with a Shared Vertex with the Same id",
+                         success,
+                         {"id": id})
+
+
+class VertexStoreSharedStatus(LeafStatus):
+    def __init__(self, id: Primitive):
+        super().__init__("",
+                         "Vertex Shared with Another Graph can't be Updated",
+                         False,
+                         {"id": id})
+
+
+class VertexStore:
+    """
+    The rows of the vertices of a VertexType, shared by every Graph created over the store (see
+    Database.create_graph()). Each graph reads the rows through a SharedData view that only keeps a membership bitmap,
+    so a vertex inserted into several graphs is stored once. Inserting a vertex whose id is already in the store adds
+    the existing row to the graph, provided that the values are equal; a row in no graph is reused with the new
+    values. Rows are never removed from the store, but a row left in no graph is reused when its id is inserted again.
+    Attributes:
+        datatype: the VertexType of the vertices.
+        values: a dictionary mapping each field name to the list of values that the field has.
+        ids: a list of values of the id field.
+        positions: a dictionary mapping each id to its row.
+        entries: a dictionary mapping each id to the entry with this id.
+        counts: the number of graphs containing each row.
+        views: the SharedData views of the graphs over the store, which keep the store alive.
+        lock: the lock serializing the mutations of the store and of the membership of its views.
+    """
+
+    def __init__(self, vertextype: VertexType):
+        self.datatype = vertextype
+        self.values: dict[str, list[Primitive]] = {field_name: [] for field_name in vertextype.names}
+        self.ids: list[Primitive] = []
+        self.positions: dict[Primitive, int] = {}
+        self.entries: dict[Primitive, dict[str, Primitive]] = {}
+        self.counts: list[int] = []
+        self.views: list[SharedData] = []
+        self.lock = threading.Lock()
+
+    def view(self) -> 'SharedData':
+        """
+        Return a new SharedData view over the store containing no rows.
+        """
+        with self.lock:
+            return SharedData(self)
+
+    def memory(self) -> dict[str, Any]:
+        """
+        Estimate the memory held by the store, in bytes, like Data.memory(), with the per-row graph counts in
+        "Counts".
+        """
+        usage = {"Columns": {field_name: column_size(column) for field_name, column in self.values.items()},
+                 "Ids": sys.getsizeof(self.ids),
+                 "Entries": sys.getsizeof(self.entries) + sample_size(self.entries.values(), len(self.entries)),
+                 "Positions": (sys.getsizeof(self.positions) +
+                               sample_size(self.positions.values(), len(self.positions))),
+                 "Counts": sys.getsizeof(self.counts)}
+        usage["Total"] = sum(usage["Columns"].values()) + sum(value for key, value in usage.items() if key != "Columns")
+        return usage
+
+    def orphans(self) -> int:
+        """
+        Return the number of rows contained by no graph.
+        """
+        return self.counts.count(0)
+
+    def intern(self, entry: dict[str, Primitive]) -> Optional[int]:
+        """
+        Return the row of 'entry', appended to the columns if its id isn't in the store yet, or None if another row
+        contained by a graph has the same id but different values. Must be called while holding self.lock.
+        """
+        id = entry.get(ID)
+        row = self.positions.get(id)
+        if row is None:
+            row = len(self.ids)
+            # The views cover the new row before it is appended, since they may be read meanwhile.
+            for view in self.views:
+                if (row >> 3) >= len(view.deleted):
+                    view.deleted.append(0xFF)
+                view.tombstones += 1
+            for field_name, values in self.values.items():
+                values.append(entry.get(field_name, NULL))
+            self.ids.append(id)
+            self.positions[id] = row
+            self.entries[id] = entry
+            self.counts.append(0)
+        elif any(entry.get(field_name, NULL) != values[row] for field_name, values in self.values.items()):
+            if self.counts[row]:
+                return None
+            for field_name, values in self.values.items():
+                values[row] = entry.get(field_name, NULL)
+            self.entries[id] = entry
+        return row
+
+
+class _Members(Mapping):
+    """
+    A read-only dictionary keyed by the ids of the rows of a SharedData view, over a dictionary of its VertexStore.
+    Assigning a value to an existing key writes it through to the store.
+    """
+
+    def __init__(self, view: 'SharedData', mapping: dict):
+        self.view = view
+        self.mapping = mapping
+
+    def __getitem__(self, id: Primitive):
+        row = self.view.store.positions[id]
+        if self.view.is_deleted(row):
+            raise KeyError(id)
+        return self.mapping[id]
+
+    def __setitem__(self, id: Primitive, value):
+        self[id]
+        self.mapping[id] = value
+
+    def __iter__(self) -> Iterator[Primitive]:
+        ids = self.view.ids
+        return iter([ids[row] for row in self.view.live_rows()])
+
+    def __len__(self) -> int:
+        return len(self.view.ids) - self.view.tombstones
+
+
+class SharedData(Data):
+    """
+    The vertices of a Graph stored in a VertexStore shared with other graphs. The columns, ids and entries are the
+    store's, and the rows of the store that aren't in the graph are marked in self.deleted, so every reader of a Data
+    object skips them like deleted rows, as long as it goes through self.live_rows() or self.live(), as the
+    CSRAdjacency views the algorithms run on do. Deleting a vertex only removes its row from the graph; the rows of the graph
+    are never compacted. A vertex in another graph can't be updated. The indexes, statistics and commit stamps are the
+    graph's own. Membership isn't versioned: a vertex added to the graph from the store becomes visible to the open
+    snapshots of the graph once committed, like deletions (see Data.commit()). Updates are written to the columns of
+    the store in place, since other graphs append to them.
+    Attributes:
+        store: the VertexStore.
+    """
+
+    shared = True
+
+    def __init__(self, store: VertexStore):
+        """
+        Initialize a view over 'store' containing no rows. Must be called while holding store.lock.
+        """
+        super().__init__(store.datatype)
+        self.store = store
+        self.values = dict(store.values)
+        self.ids = store.ids
+        self.entries = _Members(self, store.entries)
+        self.positions = _Members(self, store.positions)
+        self.deleted = bytearray(b"\xff" * ((len(store.ids) + 7) >> 3))
+        self.tombstones = len(store.ids)
+        self.stamps = (len(store.ids), [])
+        store.views.append(self)
+
+    def _join(self, row: int):
+        deleted = self._tombstones()
+        deleted[row >> 3] &= ~(1 << (row & 7))
+        self.tombstones -= 1
+        self.store.counts[row] += 1
+        for index in self.indexes.values():
+            index.reindex(row)
+
+    def _leave(self, row: int):
+        deleted = self._tombstones()
+        deleted[row >> 3] |= 1 << (row & 7)
+        self.tombstones += 1
+        self.store.counts[row] -= 1
+        for index in self.indexes.values():
+            index.remove(self.values[index.field_name][row], row)
+
+    def _rows(self, rows: list[int]) -> dict[str, list[Primitive]]:
+        return {key: [values[row] for row in rows] for key, values in self.values.items()}
+
+    def _write(self, field_name: str, row: int, value: Primitive):
+        self.values[field_name][row] = value
+
+    def commit(self, version: int):
+        with self.store.lock:
+            super().commit(version)
+
+    def add_entries(self, entries: list[dict[str, Primitive]]) -> Status:
+        """
+        Adds the rows of multiple entries to the graph, appending them to the store if their ids are new (see
+        VertexStore.intern()).
+        :return: a Statuses object showing result of this operation, which is an ERROR if an entry is already in the
+            graph or conflicts with a vertex of another graph. This operation is NOT ROLLED BACK even if it's
+            unsuccessful.
+        """
+        probe = INSTRUMENTATION.start() if INSTRUMENTATION.enabled else None
+        statuses = []
+        context = []
+        with self.store.lock:
+            for entry in entries:
+                row = self.store.intern(entry)
+                success = row is not None and self.is_deleted(row)
+                statuses.append(VertexStoreEntryStatus(entry.get(ID), success))
+                if success:
+                    self._join(row)
+                    context.append({"row": row})
+        joined = self._rows([entry_context["row"] for entry_context in context])
+        self.statistics.update({}, joined)
+        deltas = {key: [entry.get(key, NULL) for entry in entries] for key in self.datatype.names}
+        # The ids were checked against the rows of the graph when they were added (see VertexStoreEntryStatus).
+        statuses.append(self._check_constraints(deltas, deltas, {ID: (), **self.unique}))
+        self._count(joined, 1)
+        new_status = DataAddEntriesStatus(self.datatype, statuses)
+        self.last = Data.INSERTDataTransaction(Transaction.TransactionType.INSERT, entries, context, self.version)
+        self.version = next_version()
+        if probe is not None:
+            INSTRUMENTATION.stop("Data.add_entries", probe, len(entries), new_status)
+        return new_status
+
+    def rollback(self, entries: Optional[list[dict[str, Primitive]]] = None):
+        """
+        Undoes the last call to self.add_entries(), which must have added 'entries', by removing the rows it added
+        from the graph, or to self.delete_entries() or self.update_entries() if 'entries' is None.
+        """
+        if entries is None:
+            super().rollback()
+            return
+        last = self.last if self.last is not None and self.last.data is entries else None
+        if last is None:
+            return
+        self._count(self._rows([entry_context["row"] for entry_context in last.context]), -1)
+        with self.store.lock:
+            for entry_context in reversed(last.context):
+                self._leave(entry_context["row"])
+        self.statistics.rollback()
+        self.version = last.version
+        self.last = None
+
+    def delete_entries(self, ids: list[Primitive]) -> Status:
+        """
+        Removes the rows of the entries with the given ids from the graph. The rows stay in the store.
+        :return: a Statuses object showing result of this operation, which is an ERROR if an id isn't in the graph.
+            This operation is NOT ROLLED BACK even if it's unsuccessful (see self.rollback()).
+        """
+        statuses = []
+        removed, context = [], []
+        with self.store.lock:
+            for id in ids:
+                row = self.positions.get(id)
+                statuses.append(DataEntryFoundStatus(id, [], row is not None))
+                if row is not None:
+                    removed.append(self.entries[id])
+                    context.append({"row": row})
+                    self._leave(row)
+        values = self._rows([entry_context["row"] for entry_context in context])
+        self.statistics.update(values, {})
+        self._count(values, -1)
+        deltas = {key: [] for key in self.datatype.names}
+        statuses.append(self._check_constraints(deltas, deltas))
+        self.last = Data.DELETEDataTransaction(Transaction.TransactionType.DELETE, removed, context, self.version)
+        self.version = next_version()
+        return DataDeleteEntriesStatus(self.datatype, statuses)
+
+    def update_entries(self, changes: list[dict[str, Primitive]], fixed: tuple[str, ...] = (ID,)) -> Status:
+        """
+        Updates entries in place (see Data.update_entries()), unless one of them is in another graph.
+        """
+        with self.store.lock:
+            shared = [change.get(ID) for change in changes if change.get(ID) in self.positions and
+                      self.store.counts[self.positions[change.get(ID)]] > 1]
+            if not shared:
+                return super().update_entries(changes, fixed)
+        self.statistics.update({}, {})
+        self.last = Data.UPDATEDataTransaction(Transaction.TransactionType.UPDATE, [], [], self.version)
+        self.version = next_version()
+        return DataUpdateEntriesStatus(self.datatype, [VertexStoreSharedStatus(id) for id in shared])
+
+    def _undo(self, last: Transaction):
+        with self.store.lock:
+            if last.type != Transaction.TransactionType.DELETE:
+                super()._undo(last)
+                return
+            for entry_context in last.context:
+                self._join(entry_context["row"])
+        self._count(self._rows([entry_context["row"] for entry_context in last.context]), 1)
+        self.statistics.rollback()
+        self.version = last.version
+
+    def attach_field(self, field_name: str, datatype: PrimitiveTypes, values: list[Primitive]) -> Status:
+        """
+        Computed fields can't be attached to rows shared with other graphs.
+        """
+        return DataAttachFieldStatus(field_name, False)
+
+    def compaction(self) -> None:
+        """
+        The rows belong to the store and aren't compacted (see Graph.compaction()).
+        """
+        return None
+
+    def fork(self) -> 'SharedData':
+        """
+        Return a new view over the store containing the same rows.
+        """
+        with self.store.lock:
+            other = copy.copy(self)
+            other.entries = _Members(other, self.store.entries)
+            other.positions = _Members(other, self.store.positions)
+            other.deleted = bytearray(self.deleted)
+            other._published_deleted = None
+            other.unique = {field_name: dict(counts) for field_name, counts in self.unique.items()}
+            other.stamps = (self.stamps[0], list(self.stamps[1]))
+            other.statistics = copy.deepcopy(self.statistics)
+            other.indexes = {field_name: SortedIndex(field_name) for field_name in self.indexes}
+            other.last = None
+            for row in self.live_rows():
+                self.store.counts[row] += 1
+            self.store.views.append(other)
+        return other
+
+    def release(self):
+        """
+        Remove the rows of the graph from the store, e.g. because the graph is discarded. It must not be used
+        afterwards.
+        """
+        with self.store.lock:
+            if self in self.store.views:
+                for row in self.live_rows():
+                    self.store.counts[row] -= 1
+                self.store.views.remove(self)
+
+    def _own(self, buffers: Iterable[str], columns: Iterable[str] = ()):
+        pass
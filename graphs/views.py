@@ -0,0 +1,153 @@
+from typing import Optional
+
+from datatypes.edge import FROM, TO
+from datatypes.primitive import Primitive, PrimitiveTypes, NULL
+from datatypes.raw import RawType
+from statuses.status import *
+
+VIEW_FUNCTIONS = {"COUNT", "SUM", "AVG"}
+
+VERTICES = "vertices"
+EDGES = "edges"
+
+
+class ViewFieldStatus(LeafStatus):
+    def __init__(self, field_name: Optional[str], side: str, success: bool):
+        super().__init__("Field Found",
+                         "Field does not Exist, or Isn't of Type INT or FLOAT",
+                         success,
+                         {"Field Name": field_name, "Side": side})
+
+
+class ViewDefinitionStatus(LeafStatus):
+    def __init__(self, view_name: str, success: bool):
+        super().__init__("View Definition Valid",
+                         "View Name Already Used, Unknown Side or Unknown Aggregate Function",
+                         success,
+                         {"View Name": view_name})
+
+
+class ViewStatus(DerivedStatus):
+    def __init__(self, substatuses: list[Status], view_name: str, data=None):
+        context = {"View Name": view_name}
+        if data is not None:
+            context["data"] = data
+        super().__init__("View Created",
+                         "Unable to Create View",
+                         substatuses,
+                         context)
+
+
+class AggregateView:
+    """
+    A materialized view holding an aggregate of the vertices or edges of a Graph per value of a field, e.g. the
+    out-degree of each vertex (the COUNT of edges per from value) or the number of vertices with each label. The view
+    is updated from the inserted, deleted and updated entries by Graph.insert(), Graph.delete() and Graph.update() in
+    the same transaction and undone if the mutation is rolled back, so reading the aggregate of a key costs one
+    dictionary lookup.
+    Attributes:
+        side: VERTICES or EDGES, the Data object of the graph being aggregated.
+        group_field: the name of the field whose values are the keys of the view.
+        function: the aggregate function, one of VIEW_FUNCTIONS.
+        field_name: the name of the aggregated field, or None for COUNT(*).
+        groups: a dictionary mapping each key to a [rows, non-NULL values, sum of values] list.
+    """
+
+    def __init__(self, side: str, group_field: str, function: str, field_name: Optional[str] = None):
+        self.side = side
+        self.group_field = group_field
+        self.function = function
+        self.field_name = field_name
+        self.groups: dict[Primitive, list] = {}
+        self._undo: Optional[dict[Primitive, Optional[list]]] = None
+
+    @staticmethod
+    def out_degree() -> 'AggregateView':
+        return AggregateView(EDGES, FROM, "COUNT")
+
+    @staticmethod
+    def in_degree() -> 'AggregateView':
+        return AggregateView(EDGES, TO, "COUNT")
+
+    @staticmethod
+    def out_weight(field_name: str) -> 'AggregateView':
+        return AggregateView(EDGES, FROM, "SUM", field_name)
+
+    @staticmethod
+    def vertex_count(group_field: str) -> 'AggregateView':
+        return AggregateView(VERTICES, group_field, "COUNT")
+
+    def validate(self, name: str, vertextype: RawType, edgetype: RawType, names: set[str]) -> list[Status]:
+        """
+        Return a list of Statuses checking that the view refers to existing fields and a known function.
+        """
+        datatype = {VERTICES: vertextype, EDGES: edgetype}.get(self.side)
+        statuses: list[Status] = [ViewDefinitionStatus(name, name not in names and datatype is not None and
+                                                       self.function in VIEW_FUNCTIONS)]
+        if datatype is not None:
+            statuses.append(ViewFieldStatus(self.group_field, self.side, self.group_field in datatype.names))
+            if self.field_name is not None or self.function != "COUNT":
+                numeric = datatype.types.get(self.field_name) in (PrimitiveTypes.INT, PrimitiveTypes.FLOAT)
+                allowed = numeric or (self.function == "COUNT" and self.field_name in datatype.names)
+                statuses.append(ViewFieldStatus(self.field_name, self.side, allowed))
+        return statuses
+
+    def apply(self, entries: list[dict[str, Primitive]], removed: Optional[list[dict[str, Primitive]]] = None):
+        """
+        Remove the entries in 'removed' from the aggregates, then add 'entries'. Only the last call can be undone.
+        """
+        undo: dict[Primitive, Optional[list]] = {}
+        groups = self.groups
+        for sign, changed in ((-1, [] if removed is None else removed), (1, entries)):
+            for entry in changed:
+                key = entry.get(self.group_field)
+                group = groups.get(key)
+                if key not in undo:
+                    undo[key] = None if group is None else list(group)
+                if group is None:
+                    group = groups[key] = [0, 0, 0]
+                group[0] += sign
+                if self.field_name is not None:
+                    value = entry.get(self.field_name)
+                    if value is not NULL:
+                        group[1] += sign
+                        group[2] += sign * value if self.function != "COUNT" else 0
+                if group[0] == 0:
+                    del groups[key]
+        self._undo = undo
+
+    def rollback(self):
+        """
+        Undo the last call to self.apply().
+        """
+        if self._undo is not None:
+            for key, group in self._undo.items():
+                if group is None:
+                    self.groups.pop(key, None)
+                else:
+                    self.groups[key] = group
+            self._undo = None
+
+    def commit(self):
+        """
+        Forget the undo information of the last call to self.apply().
+        """
+        self._undo = None
+
+    def get(self, key: Primitive) -> Primitive:
+        """
+        Return the aggregate of the entries whose group field equals 'key': 0 for a COUNT and NULL for a SUM or AVG
+        over no values.
+        """
+        group = self.groups.get(key)
+        if self.function == "COUNT":
+            return 0 if group is None else group[0] if self.field_name is None else group[1]
+        if group is None or group[1] == 0:
+            return NULL
+        return group[2] if self.function == "SUM" else group[2] / group[1]
+
+    def items(self) -> dict[Primitive, Primitive]:
+        """
+        Return a dictionary mapping each key with at least one entry to its aggregate.
+        """
+        return {key: self.get(key) for key in self.groups}
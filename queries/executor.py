@@ -0,0 +1,345 @@
+import heapq
+import operator
+from typing import Any, Callable, Optional
+
+from datatypes.primitive import Primitive, PrimitiveTypes, NULL
+from graphs.data import Data
+from statuses.status import *
+
+OPERATORS: dict[str, Callable[[Primitive, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "IN": lambda value, values: value in values,
+}
+
+INDEXABLE_OPERATORS = {"=", "<", "<=", ">", ">=", "IN"}
+
+AGGREGATES = {"COUNT", "SUM", "MIN", "MAX", "AVG"}
+
+NUMERIC_TYPES = (PrimitiveTypes.INT, PrimitiveTypes.FLOAT)
+
+CHUNK_SIZE = 4096
+
+
+class QueryFieldStatus(LeafStatus):
+    def __init__(self, field_name: Optional[str], clause: str, success: bool):
+        super().__init__("Field Found",
+                         "Field does not Exist or Cannot be Used in this Clause",
+                         success,
+                         {"Field Name": field_name, "Clause": clause})
+
+
+class QueryOperatorStatus(LeafStatus):
+    def __init__(self, name: str, clause: str, success: bool):
+        super().__init__("Operator Found",
+                         "Unknown Operator or Aggregate Function",
+                         success,
+                         {"Operator": name, "Clause": clause})
+
+
+class QueryStatus(DerivedStatus):
+    def __init__(self, substatuses: list[Status], type_name: str, data=None, context: Optional[dict] = None):
+        context = {"Type Name": type_name} | ({} if context is None else context)
+        if data is not None:
+            context["data"] = data
+        super().__init__("Query Successful",
+                         "Query Failed",
+                         substatuses,
+                         context)
+
+
+def field_type(data: Data, field_name: str) -> Optional[PrimitiveTypes]:
+    """
+    Return the primitive datatype of a field or computed field of 'data', or None if there is no such field.
+    """
+    return data.datatype.types.get(field_name, data.computed.get(field_name))
+
+
+class _Descending:
+    """
+    Wraps a value so that it sorts in descending order.
+    """
+    __slots__ = ["value"]
+
+    def __init__(self, value: Primitive):
+        self.value = value
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: '_Descending') -> bool:
+        return self.value == other.value
+
+
+def sort_key(order: list[tuple[str, bool]], lookup: Callable[[Any, str], Primitive]) -> Callable[[Any], tuple]:
+    """
+    Return a key function sorting items by the fields in 'order' (pairs of a field name and whether it is sorted in
+    descending order), looking up the value of a field of an item with lookup(item, field_name). NULLs sort last.
+    """
+
+    def key(item) -> tuple:
+        result = ()
+        for field_name, descending in order:
+            value = lookup(item, field_name)
+            if value is NULL:
+                result += (True, 0)
+            else:
+                result += (False, _Descending(value) if descending else value)
+        return result
+
+    return key
+
+
+class Query:
+    """
+    A selection, projection and aggregation query over the entries of a Data object, built by chaining the clause
+    methods and run with self.execute():
+        SELECT fields, aggregates FROM data WHERE predicates GROUP BY group_fields ORDER BY order LIMIT count
+    Predicates are evaluated column at a time. Predicates on fields with an index (see Data.create_index()) and an
+    equality, range or IN operator are answered from the index instead.
+    Attributes:
+        data: the queried Data object.
+        predicates: a list of (field name, operator, operand) triples that must all hold. The operator is a key of
+            OPERATORS or a function of the value of the field returning a bool, in which case the operand is ignored.
+        fields: the names of the projected fields, or None for every field of the datatype.
+        group_fields: the names of the fields the rows are grouped by.
+        aggregates: a list of (output name, aggregate function, field name) triples. The function is one of AGGREGATES,
+            and the field name is None for COUNT(*).
+        order: a list of (field name, descending) pairs the result is sorted by.
+        count: the maximum number of rows returned, or None.
+        index_fields: the names of the fields whose indexes may be used, or None for every index. Set by the planner.
+    """
+
+    def __init__(self, data: Data):
+        self.data = data
+        self.predicates: list[tuple[str, Any, Any]] = []
+        self.fields: Optional[list[str]] = None
+        self.group_fields: list[str] = []
+        self.aggregates: list[tuple[str, str, Optional[str]]] = []
+        self.order: list[tuple[str, bool]] = []
+        self.count: Optional[int] = None
+        self.index_fields: Optional[list[str]] = None
+
+    def where(self, field_name: str, op: Any, operand: Any = None) -> 'Query':
+        """
+        Add a predicate (see the predicates attribute). Returns self.
+        """
+        self.predicates.append((field_name, op, operand))
+        return self
+
+    def select(self, *fields: str) -> 'Query':
+        """
+        Project the result onto 'fields', which must be group fields if the query is grouped. Returns self.
+        """
+        self.fields = list(fields)
+        return self
+
+    def group_by(self, *fields: str) -> 'Query':
+        """
+        Group the rows by 'fields'. Returns self.
+        """
+        self.group_fields = list(fields)
+        return self
+
+    def aggregate(self, function: str, field_name: Optional[str] = None, name: Optional[str] = None) -> 'Query':
+        """
+        Add an aggregate to the result, named 'name' or e.g. "SUM(weight)" by default. Returns self.
+        """
+        name = f"{function}({'*' if field_name is None else field_name})" if name is None else name
+        self.aggregates.append((name, function, field_name))
+        return self
+
+    def order_by(self, field_name: str, descending: bool = False) -> 'Query':
+        """
+        Sort the result by 'field_name', after the fields it is already sorted by. Grouped queries can only be sorted
+        by their output fields. Returns self.
+        """
+        self.order.append((field_name, descending))
+        return self
+
+    def limit(self, count: int) -> 'Query':
+        """
+        Return at most 'count' rows. Sorted queries keep the first 'count' rows with a heap instead of sorting every
+        row. Returns self.
+        """
+        self.count = count
+        return self
+
+    def grouped(self) -> bool:
+        """
+        Return whether the query groups or aggregates its rows.
+        """
+        return bool(self.group_fields or self.aggregates)
+
+    def output_fields(self) -> list[str]:
+        """
+        Return the names of the fields of the rows produced by the query.
+        """
+        if self.grouped():
+            fields = self.group_fields if self.fields is None else self.fields
+            return fields + [name for name, _, _ in self.aggregates]
+        return list(self.data.datatype.names) if self.fields is None else self.fields
+
+    def validate(self) -> list[Status]:
+        """
+        Return a list of Statuses checking that every clause refers to existing fields and operators.
+        """
+        values = self.data.values
+        statuses: list[Status] = []
+        for field_name, op, _ in self.predicates:
+            statuses.append(QueryFieldStatus(field_name, "WHERE", field_name in values))
+            statuses.append(QueryOperatorStatus(str(op), "WHERE", op in OPERATORS or callable(op)))
+        for field_name in self.group_fields:
+            statuses.append(QueryFieldStatus(field_name, "GROUP BY", field_name in values))
+        for field_name in [] if self.fields is None else self.fields:
+            allowed = field_name in (self.group_fields if self.grouped() else values)
+            statuses.append(QueryFieldStatus(field_name, "SELECT", allowed))
+        for _, function, field_name in self.aggregates:
+            statuses.append(QueryOperatorStatus(function, "SELECT", function in AGGREGATES))
+            if field_name is not None or function != "COUNT":
+                allowed = field_name in values and (function not in ("SUM", "AVG") or
+                                                    field_type(self.data, field_name) in NUMERIC_TYPES)
+                statuses.append(QueryFieldStatus(field_name, function, allowed))
+        for field_name, _ in self.order:
+            allowed = field_name in (self.output_fields() if self.grouped() else values)
+            statuses.append(QueryFieldStatus(field_name, "ORDER BY", allowed))
+        return statuses
+
+    def index_predicates(self) -> list[tuple[str, Any, Any]]:
+        """
+        Return the predicates that are answered from an index when the query is executed.
+        """
+        return [(field_name, op, operand) for field_name, op, operand in self.predicates
+                if op in INDEXABLE_OPERATORS and field_name in self.data.indexes and
+                (self.index_fields is None or field_name in self.index_fields)]
+
+    def _index_rows(self, field_name: str, op: str, operand: Any) -> list[int]:
+        index = self.data.index(field_name)
+        if op == "=":
+            return index.equal(operand)
+        if op == "IN":
+            return sorted(row for value in set(operand) for row in index.equal(value))
+        if op in ("<", "<="):
+            return index.range(high=operand, include_high=op == "<=")
+        return index.range(low=operand, include_low=op == ">=")
+
+    def select_rows(self, context: dict[str, Any]) -> list[int]:
+        """
+        Return the sorted list of the rows satisfying every predicate. If the query is neither grouped nor ordered,
+        the scan stops as soon as self.count rows are found. Records the number of rows examined by column scans and
+        the indexes used, the rows found in indexes and the rows selected in 'context'.
+        """
+        indexed = self.index_predicates()
+        candidates: Optional[list[int]] = None
+        for field_name, op, operand in indexed:
+            rows = self._index_rows(field_name, op, operand)
+            candidates = rows if candidates is None else sorted(set(candidates).intersection(rows))
+        residual = [predicate for predicate in self.predicates if predicate not in indexed]
+        total = len(self.data.ids) if candidates is None else len(candidates)
+        stop = self.count if not self.grouped() and not self.order else None
+        selected: list[int] = []
+        examined = 0
+        for start in range(0, total, CHUNK_SIZE):
+            chunk = (self.data.live_rows(range(start, min(total, start + CHUNK_SIZE))) if candidates is None
+                     else candidates[start:start + CHUNK_SIZE])
+            examined += len(chunk) if residual else 0
+            for field_name, op, operand in residual:
+                column = self.data.values[field_name]
+                if callable(op):
+                    chunk = [row for row in chunk if column[row] is not NULL and op(column[row])]
+                else:
+                    f = OPERATORS[op]
+                    chunk = [row for row in chunk if column[row] is not NULL and f(column[row], operand)]
+            selected.extend(chunk)
+            if stop is not None and len(selected) >= stop:
+                break
+        context["Rows Examined"] = examined
+        context["Indexes Used"] = [field_name for field_name, _, _ in indexed]
+        context["Index Rows"] = total if candidates is not None else None
+        context["Rows Selected"] = len(selected)
+        return selected
+
+    def _aggregate(self, rows: list[int]) -> list[dict[str, Primitive]]:
+        """
+        Group 'rows' by self.group_fields with a hash table and compute the aggregates of each group column at a time.
+        """
+        values = self.data.values
+        group_columns = [values[field_name] for field_name in self.group_fields]
+        groups: dict[tuple, int] = {}
+        group_ids = [groups.setdefault(tuple(column[row] for column in group_columns), len(groups)) for row in rows]
+        if not self.group_fields and not groups:
+            groups[()] = 0
+        results = [dict(zip(self.group_fields, key)) for key in groups]
+        for name, function, field_name in self.aggregates:
+            n = len(groups)
+            if field_name is None:
+                counts = [0] * n
+                for g in group_ids:
+                    counts[g] += 1
+                for result, c in zip(results, counts):
+                    result[name] = c
+                continue
+            column = values[field_name]
+            counts, accumulators = [0] * n, [NULL] * n
+            for g, row in zip(group_ids, rows):
+                value = column[row]
+                if value is NULL:
+                    continue
+                counts[g] += 1
+                current = accumulators[g]
+                if current is NULL:
+                    accumulators[g] = value
+                elif function in ("SUM", "AVG"):
+                    accumulators[g] = current + value
+                elif function == "MIN" and value < current:
+                    accumulators[g] = value
+                elif function == "MAX" and value > current:
+                    accumulators[g] = value
+            for result, c, accumulator in zip(results, counts, accumulators):
+                if function == "COUNT":
+                    result[name] = c
+                elif function == "AVG":
+                    result[name] = accumulator / c if c else NULL
+                else:
+                    result[name] = accumulator
+        if self.fields is not None:
+            kept = self.output_fields()
+            results = [{key: result[key] for key in kept} for result in results]
+        return results
+
+    def execute(self) -> Status:
+        """
+        Run the query.
+        :return: an OK Status with the list of result rows (dictionaries mapping each output field to its value) in
+            the context "data" and the number of rows examined and indexes used in the context, or an ERROR Status if a
+            clause refers to a field or operator that doesn't exist.
+        """
+        statuses = self.validate()
+        status = QueryStatus(statuses, self.data.datatype.name)
+        if not status.success:
+            return status
+        context: dict[str, Any] = {}
+        rows = self.select_rows(context)
+        if self.grouped():
+            results = self._aggregate(rows)
+            if self.order:
+                key = sort_key(self.order, lambda result, field_name: result[field_name])
+                results = (heapq.nsmallest(self.count, results, key) if self.count is not None
+                           else sorted(results, key=key))
+            elif self.count is not None:
+                results = results[:self.count]
+        else:
+            if self.order:
+                values = self.data.values
+                key = sort_key(self.order, lambda row, field_name: values[field_name][row])
+                rows = heapq.nsmallest(self.count, rows, key) if self.count is not None else sorted(rows, key=key)
+            elif self.count is not None:
+                rows = rows[:self.count]
+            columns = {field_name: self.data.values[field_name] for field_name in self.output_fields()}
+            results = [{field_name: column[row] for field_name, column in columns.items()} for row in rows]
+        context["Rows Returned"] = len(results)
+        return QueryStatus(statuses, self.data.datatype.name, results, context)
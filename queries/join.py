@@ -0,0 +1,213 @@
+from typing import Any, Iterator, Optional
+
+from datatypes.edge import FROM, TO
+from datatypes.primitive import Primitive, NULL
+from datatypes.raw import ID
+from graphs.data import Data
+from graphs.graph import Graph
+from queries.executor import Query, CHUNK_SIZE
+from statuses.status import *
+
+
+class JoinFieldStatus(LeafStatus):
+    def __init__(self, field_name: str, side: str, success: bool):
+        super().__init__("Field Found",
+                         "Field does not Exist, or Output Name Used Twice",
+                         success,
+                         {"Field Name": field_name, "Side": side})
+
+
+class JoinStatus(DerivedStatus):
+    def __init__(self, substatuses: list[Status], data=None, context: Optional[dict] = None):
+        context = {} if context is None else dict(context)
+        if data is not None:
+            context["data"] = data
+        super().__init__("Join Successful",
+                         "Join Failed",
+                         substatuses,
+                         context)
+
+
+def join_keys(data: Data, fields: list[str], rows: list[int]) -> list[Primitive]:
+    """
+    Return the join key of each row in 'rows': the value of the single field in 'fields', or the tuple of the values
+    of several fields.
+    """
+    columns = [data.values[field_name] for field_name in fields]
+    if len(columns) == 1:
+        column = columns[0]
+        return [column[row] for row in rows]
+    return [tuple(column[row] for column in columns) for row in rows]
+
+
+def _is_null(key: Primitive) -> bool:
+    return key is NULL or (type(key) is tuple and NULL in key)
+
+
+def hash_join_items(build_keys: list[Primitive], build_items: list[Any], probe_keys: list[Primitive],
+                    probe_items: list[Any], batch_size: int = CHUNK_SIZE) -> Iterator[list[tuple[Any, Any]]]:
+    """
+    The core of the hash joins. Builds a hash table on the build side, then probes it 'batch_size' probe items at a
+    time and yields, for each batch, the list of (build item, probe item) pairs with equal keys. Items with NULL keys
+    never match.
+    :param build_keys: the key of each item in build_items.
+    :param probe_keys: the key of each item in probe_items.
+    """
+    table: dict[Primitive, list[Any]] = {}
+    for key, item in zip(build_keys, build_items):
+        if not _is_null(key):
+            table.setdefault(key, []).append(item)
+    for start in range(0, len(probe_items), batch_size):
+        pairs = []
+        for key, item in zip(probe_keys[start:start + batch_size], probe_items[start:start + batch_size]):
+            matches = table.get(key)
+            if matches is not None:
+                pairs.extend((match, item) for match in matches)
+        if pairs:
+            yield pairs
+
+
+def _project(sources: list[tuple[Data, list[str], str]], validated: list[Status]) -> list[tuple[str, list[Primitive]]]:
+    """
+    Return the (output name, column) pairs projected from each (data, fields, prefix) source, and append a Status
+    checking each field to 'validated'.
+    """
+    projected = []
+    names = set()
+    for data, fields, prefix in sources:
+        for field_name in fields:
+            name = prefix + field_name
+            validated.append(JoinFieldStatus(field_name, data.datatype.name,
+                                             field_name in data.values and name not in names))
+            names.add(name)
+            projected.append((name, data.values.get(field_name)))
+    return projected
+
+
+def hash_join(left: Data, right: Data, on: list[tuple[str, str]], left_fields: Optional[list[str]] = None,
+              right_fields: Optional[list[str]] = None, left_rows: Optional[list[int]] = None,
+              right_rows: Optional[list[int]] = None, left_prefix: str = "", right_prefix: str = "",
+              batch_size: int = CHUNK_SIZE) -> Status:
+    """
+    Equi-joins the entries of two Data objects. The hash table is built on the side with fewer rows and probed with
+    the other side in batches, and only the projected fields are copied into the result.
+    :param on: a list of (left field, right field) pairs whose values must be equal.
+    :param left_fields: the names of the fields of 'left' in the result, each renamed to left_prefix + name. Every
+        field of the datatype if None.
+    :param right_fields: the same for 'right'.
+    :param left_rows: the rows of 'left' taking part in the join (e.g. from Query.select_rows()), or None for all rows.
+    :param right_rows: the same for 'right'.
+    :return: an OK Status with the list of joined rows in the context "data", or an ERROR Status if a field doesn't
+        exist or two output fields have the same name.
+    """
+    statuses = [JoinFieldStatus(a, left.datatype.name, a in left.values) for a, _ in on]
+    statuses += [JoinFieldStatus(b, right.datatype.name, b in right.values) for _, b in on]
+    left_fields = list(left.datatype.names) if left_fields is None else left_fields
+    right_fields = list(right.datatype.names) if right_fields is None else right_fields
+    projected = _project([(left, left_fields, left_prefix), (right, right_fields, right_prefix)], statuses)
+    status = JoinStatus(statuses)
+    if not status.success:
+        return status
+    left_rows = left.live_rows() if left_rows is None else left_rows
+    right_rows = right.live_rows() if right_rows is None else right_rows
+    left_keys = join_keys(left, [a for a, _ in on], left_rows)
+    right_keys = join_keys(right, [b for _, b in on], right_rows)
+    build_left = len(left_rows) <= len(right_rows)
+    batches = (hash_join_items(left_keys, left_rows, right_keys, right_rows, batch_size) if build_left else
+               hash_join_items(right_keys, right_rows, left_keys, left_rows, batch_size))
+    left_projected, right_projected = projected[:len(left_fields)], projected[len(left_fields):]
+    results = []
+    for pairs in batches:
+        for a, b in pairs:
+            left_row, right_row = (a, b) if build_left else (b, a)
+            row = {name: column[left_row] for name, column in left_projected}
+            row.update({name: column[right_row] for name, column in right_projected})
+            results.append(row)
+    return JoinStatus(statuses, results, {"Build Side": left.datatype.name if build_left else right.datatype.name,
+                                          "Rows Returned": len(results)})
+
+
+def join_endpoints(graph: Graph, edge_fields: Optional[list[str]] = None, source_fields: Optional[list[str]] = None,
+                   target_fields: Optional[list[str]] = None, edges: Optional[Query] = None,
+                   sources: Optional[Query] = None, targets: Optional[Query] = None, targets_first: bool = False,
+                   batch_size: int = CHUNK_SIZE) -> Status:
+    """
+    Joins the edges of a graph to the vertices they come from and go to, e.g. to find the edges whose source vertex
+    has label X and whose target vertex has property Y. Each side is first filtered with the predicates of the given
+    Query (its other clauses are ignored), then the edges are hash-joined on their from field with the remaining source
+    vertices and on their to field with the remaining target vertices, each time building on the smaller side. A side
+    that is neither filtered nor projected is not joined at all.
+    :param edge_fields: the names of the edge fields in the result. Every field of the EdgeType if None.
+    :param source_fields: the names of the fields of the source vertex in the result, each renamed to "from.name".
+        Empty if None.
+    :param target_fields: the same for the target vertex, renamed to "to.name".
+    :param edges: a Query over graph.edges whose predicates the edges must satisfy, or None.
+    :param sources: a Query over graph.vertices whose predicates the source vertices must satisfy, or None.
+    :param targets: the same for the target vertices.
+    :param targets_first: whether the edges are joined with the target vertices before the source vertices, e.g.
+        because the predicates on the targets are more selective (see queries.planner).
+    :return: an OK Status with the list of joined rows in the context "data", the number of rows after the first join
+        and in the result, and the context of Query.select_rows() for each filtered side ("Edge Scan", "Source Scan",
+        "Target Scan", None if the side isn't filtered), or an ERROR Status if a field doesn't exist.
+    """
+    edge_fields = list(graph.edges.datatype.names) if edge_fields is None else edge_fields
+    source_fields = [] if source_fields is None else source_fields
+    target_fields = [] if target_fields is None else target_fields
+    statuses: list[Status] = []
+    for query in (edges, sources, targets):
+        if query is not None:
+            statuses += query.validate()
+    projected = _project([(graph.edges, edge_fields, ""), (graph.vertices, source_fields, FROM + "."),
+                          (graph.vertices, target_fields, TO + ".")], statuses)
+    status = JoinStatus(statuses)
+    if not status.success:
+        return status
+
+    scans: dict[str, Optional[dict]] = {"Edge Scan": None, "Source Scan": None, "Target Scan": None}
+
+    def rows(query: Optional[Query], data: Data, side: str) -> list[int]:
+        if query is None:
+            return data.live_rows()
+        scans[side] = {}
+        return query.select_rows(scans[side])
+
+    def join_step(items: list[tuple], field_name: str, query: Optional[Query], fields: list[str],
+                  side: str) -> list[tuple]:
+        """
+        Join (edge row, ...) tuples with the vertices on field_name = id, appending the vertex row to each tuple.
+        The join is skipped (appending -1) if the vertices are neither filtered nor projected, since every edge refers
+        to a valid vertex.
+        """
+        if query is None and not fields:
+            return [item + (-1,) for item in items]
+        vertex_rows = rows(query, graph.vertices, side)
+        column = graph.edges.values[field_name]
+        item_keys = [column[item[0]] for item in items]
+        vertex_keys = join_keys(graph.vertices, [ID], vertex_rows)
+        if len(vertex_rows) <= len(items):
+            return [item + (v,) for batch in hash_join_items(vertex_keys, vertex_rows, item_keys, items, batch_size)
+                    for v, item in batch]
+        return [item + (v,) for batch in hash_join_items(item_keys, items, vertex_keys, vertex_rows, batch_size)
+                for item, v in batch]
+
+    items = [(e,) for e in rows(edges, graph.edges, "Edge Scan")]
+    if targets_first:
+        items = join_step(items, TO, targets, target_fields, "Target Scan")
+        first = len(items)
+        triples = [(e, s, t) for e, t, s in join_step(items, FROM, sources, source_fields, "Source Scan")]
+    else:
+        items = join_step(items, FROM, sources, source_fields, "Source Scan")
+        first = len(items)
+        triples = join_step(items, TO, targets, target_fields, "Target Scan")
+    triples.sort()
+    edge_projected = projected[:len(edge_fields)]
+    source_projected = projected[len(edge_fields):len(edge_fields) + len(source_fields)]
+    target_projected = projected[len(edge_fields) + len(source_fields):]
+    results = []
+    for e, s, t in triples:
+        row = {name: column[e] for name, column in edge_projected}
+        row.update({name: column[s] for name, column in source_projected})
+        row.update({name: column[t] for name, column in target_projected})
+        results.append(row)
+    return JoinStatus(statuses, results, {"Graph Name": graph.name, "Rows After First Join": first,
+                                          "Rows Returned": len(results)} | scans)
@@ -0,0 +1,327 @@
+from collections import deque
+from math import prod
+from typing import Any, Callable, Optional
+
+from datatypes.edge import FROM, TO
+from datatypes.primitive import Primitive
+from graphs.data import Data
+from graphs.graph import Graph
+from queries.executor import Query, INDEXABLE_OPERATORS
+from queries.join import join_endpoints
+from statuses.status import *
+
+INDEX_THRESHOLD = 0.1
+
+UNKNOWN_SELECTIVITY = 1 / 3
+
+
+class ReachabilityVertexStatus(LeafStatus):
+    def __init__(self, id: Primitive, graph_name: str, success: bool):
+        super().__init__("Vertex Found",
+                         "Vertex does not Exist in the Graph",
+                         success,
+                         {"id": id, "Graph Name": graph_name})
+
+
+class ReachabilityStatus(DerivedStatus):
+    def __init__(self, substatuses: list[Status], graph_name: str, data=None, context: Optional[dict] = None):
+        context = {"Graph Name": graph_name} | ({} if context is None else context)
+        if data is not None:
+            context["data"] = data
+        super().__init__("Reachability Query Successful",
+                         "Reachability Query Failed",
+                         substatuses,
+                         context)
+
+
+class PlanNode:
+    """
+    One operator of a QueryPlan.
+    Attributes:
+        operator: the name of the operator, e.g. "Index Scan" or "Hash Join".
+        details: a dictionary describing the operator, e.g. its predicates.
+        estimated_rows: the number of rows the planner expects the operator to produce.
+        actual_rows: the number of rows the operator produced, or None if the plan hasn't been executed or the
+            executor doesn't report it.
+        children: the operators producing the input of this operator.
+    """
+
+    def __init__(self, operator: str, details: dict[str, Any], estimated_rows: float,
+                 children: Optional[list['PlanNode']] = None):
+        self.operator = operator
+        self.details = details
+        self.estimated_rows = estimated_rows
+        self.actual_rows: Optional[int] = None
+        self.children = [] if children is None else children
+
+    def explain(self, depth: int = 0) -> list[str]:
+        """
+        Return one line per operator of the subtree rooted at this node, indented by depth.
+        """
+        details = ", ".join(f"{key}: {value}" for key, value in self.details.items())
+        actual = "-" if self.actual_rows is None else self.actual_rows
+        line = f"{'  ' * depth}{self.operator}{f' ({details})' if details else ''} " \
+               f"[estimated rows: {round(self.estimated_rows)}, actual rows: {actual}]"
+        return [line] + [line for child in self.children for line in child.explain(depth + 1)]
+
+
+class QueryPlan:
+    """
+    The plan chosen for a query, which can be executed and explained.
+    Attributes:
+        root: the PlanNode producing the result.
+        executed: whether the plan has been executed, i.e. whether the actual row counts are filled in.
+    """
+
+    def __init__(self, root: PlanNode, run: Callable[[], Status]):
+        """
+        :param run: a function executing the plan, filling in the actual row counts of its nodes and returning the
+            Status of the execution.
+        """
+        self.root = root
+        self.executed = False
+        self._run = run
+
+    def execute(self) -> Status:
+        status = self._run()
+        self.executed = status.success
+        return status
+
+    def explain(self, analyze: bool = False) -> str:
+        """
+        Return a description of the plan with one line per operator, like SQL EXPLAIN. If 'analyze' is True, the plan
+        is executed first (unless it already was) so that actual row counts are shown next to the estimates.
+        """
+        if analyze and not self.executed:
+            self.execute()
+        return "\n".join(self.root.explain())
+
+
+def selectivity(data: Data, field_name: str, op: Any, operand: Any) -> float:
+    """
+    Return the estimated fraction of the rows of 'data' satisfying a predicate (see Query.predicates), from the
+    statistics of the field: 1 / distinct values for equality, the covered fraction of [minimum, maximum] for ranges
+    over numbers, and UNKNOWN_SELECTIVITY when the statistics don't tell. NULLs never satisfy a predicate.
+    """
+    statistics = data.statistics.columns.get(field_name)
+    if statistics is None or statistics.rows == 0:
+        return UNKNOWN_SELECTIVITY
+    present = 1 - statistics.nulls / statistics.rows
+    distinct = statistics.distinct_count()
+    if distinct == 0:
+        return 0.0
+    if callable(op):
+        return present * UNKNOWN_SELECTIVITY
+    if op == "=":
+        return present / distinct
+    if op == "!=":
+        return present * (1 - 1 / distinct)
+    if op == "IN":
+        return present * min(1.0, len(set(operand)) / distinct)
+    low, high = statistics.minimum, statistics.maximum
+    numbers = (int, float)
+    if not (isinstance(low, numbers) and isinstance(high, numbers) and isinstance(operand, numbers)):
+        return present * UNKNOWN_SELECTIVITY
+    if high == low:
+        return present if {"<": low < operand, "<=": low <= operand, ">": low > operand,
+                            ">=": low >= operand}[op] else 0.0
+    below = min(1.0, max(0.0, (operand - low) / (high - low)))
+    return present * (below if op in ("<", "<=") else 1 - below)
+
+
+def estimate_rows(query: Query, predicates: Optional[list[tuple[str, Any, Any]]] = None) -> float:
+    """
+    Return the estimated number of rows satisfying 'predicates' (every predicate of the query if None), assuming the
+    predicates are independent.
+    """
+    predicates = query.predicates if predicates is None else predicates
+    return len(query.data.ids) * prod(selectivity(query.data, *predicate) for predicate in predicates)
+
+
+def _describe(predicates: list[tuple[str, Any, Any]]) -> str:
+    return " AND ".join(f"{field_name} <function>" if callable(op) else f"{field_name} {op} {operand!r}"
+                        for field_name, op, operand in predicates)
+
+
+def _scan_plan(query: Query) -> PlanNode:
+    """
+    Choose between an index lookup and a scan for each predicate of the query by setting query.index_fields: an index
+    is used if the predicate is estimated to select at most INDEX_THRESHOLD of the rows. Return the PlanNode producing
+    the selected rows.
+    """
+    data = query.data
+    query.index_fields = [field_name for field_name, op, operand in query.predicates
+                          if op in INDEXABLE_OPERATORS and field_name in data.indexes and
+                          selectivity(data, field_name, op, operand) <= INDEX_THRESHOLD]
+    indexed = query.index_predicates()
+    residual = [predicate for predicate in query.predicates if predicate not in indexed]
+    if indexed:
+        node = PlanNode("Index Scan", {"Type Name": data.datatype.name, "Index Condition": _describe(indexed)},
+                        estimate_rows(query, indexed))
+    else:
+        node = PlanNode("Scan", {"Type Name": data.datatype.name}, len(data.ids))
+    if residual:
+        node = PlanNode("Filter", {"Condition": _describe(residual)}, estimate_rows(query), [node])
+    return node
+
+
+def _fill_scan(node: PlanNode, context: dict[str, Any], rows: int):
+    """
+    Fill in the actual row counts of a subtree built by _scan_plan() from the context of Query.select_rows().
+    """
+    if node.children:
+        node.children[0].actual_rows = rows if context["Index Rows"] is None else context["Index Rows"]
+    node.actual_rows = context["Rows Selected"]
+
+
+def plan_query(query: Query) -> QueryPlan:
+    """
+    Plan a Query: choose index lookups or scans for its predicates from the statistics of the queried Data object, and
+    estimate the rows produced by each operator.
+    """
+    data = query.data
+    scan = _scan_plan(query)
+    node = scan
+    estimate = scan.estimated_rows
+    if query.grouped():
+        if query.group_fields:
+            columns = data.statistics.columns
+            groups = prod(max(1.0, columns[field_name].distinct_count()) if field_name in columns else estimate
+                          for field_name in query.group_fields)
+            estimate = min(estimate, groups)
+        else:
+            estimate = 1.0
+        node = PlanNode("Aggregate", {"Group By": ", ".join(query.group_fields)}, estimate, [node])
+    if query.order:
+        order = ", ".join(f"{field_name}{' DESC' if descending else ''}" for field_name, descending in query.order)
+        node = PlanNode("Top-K Sort" if query.count is not None else "Sort", {"Order": order}, estimate, [node])
+    if query.count is not None:
+        node = PlanNode("Limit", {"Count": query.count}, min(estimate, query.count), [node])
+    root = node
+
+    def run() -> Status:
+        rows = len(data.ids)
+        status = query.execute()
+        if status.success:
+            _fill_scan(scan, status.context, rows)
+            parent = root
+            while parent is not scan:
+                parent.actual_rows = status["Rows Returned"] if parent is root else None
+                parent = parent.children[0]
+        return status
+
+    return QueryPlan(root, run)
+
+
+def plan_endpoints(graph: Graph, edge_fields: Optional[list[str]] = None, source_fields: Optional[list[str]] = None,
+                   target_fields: Optional[list[str]] = None, edges: Optional[Query] = None,
+                   sources: Optional[Query] = None, targets: Optional[Query] = None) -> QueryPlan:
+    """
+    Plan a join_endpoints() query: choose index lookups or scans for each side, and join the edges first with the side
+    whose predicates are more selective. Since every edge refers to exactly one source and one target vertex, joining
+    the edges with a side keeping a fraction f of the vertices is estimated to keep a fraction f of the edges.
+    """
+    source_fields = [] if source_fields is None else source_fields
+    target_fields = [] if target_fields is None else target_fields
+    n = len(graph.vertices.ids)
+
+    def side(query: Optional[Query], data: Data, name: str) -> tuple[Optional[PlanNode], float]:
+        if query is None:
+            return PlanNode("Scan", {"Type Name": data.datatype.name}, len(data.ids)), 1.0
+        node = _scan_plan(query)
+        node.details["Side"] = name
+        return node, node.estimated_rows / len(data.ids) if len(data.ids) else 0.0
+
+    edge_node, edge_fraction = side(edges, graph.edges, "Edges")
+    source_node, source_fraction = side(sources, graph.vertices, "Sources")
+    target_node, target_fraction = side(targets, graph.vertices, "Targets")
+    targets_first = target_fraction < source_fraction
+    steps = [(TO, target_node, target_fraction, targets is not None or bool(target_fields)),
+             (FROM, source_node, source_fraction, sources is not None or bool(source_fields))]
+    steps = steps if targets_first else steps[::-1]
+    estimate = edge_node.estimated_rows
+    node = edge_node
+    joins = []
+    for field_name, vertex_node, fraction, joined in steps:
+        if joined:
+            estimate *= fraction
+            node = PlanNode("Hash Join", {"Condition": f"{field_name} = id"}, estimate, [node, vertex_node])
+            joins.append(node)
+    root = node
+
+    def run() -> Status:
+        vertex_rows, edge_rows = n, len(graph.edges.ids)
+        status = join_endpoints(graph, edge_fields, source_fields, target_fields, edges, sources, targets,
+                                targets_first)
+        if not status.success:
+            return status
+        for node, query, key, rows in ((edge_node, edges, "Edge Scan", edge_rows),
+                                       (source_node, sources, "Source Scan", vertex_rows),
+                                       (target_node, targets, "Target Scan", vertex_rows)):
+            if status[key] is not None:
+                _fill_scan(node, status[key], rows)
+            elif query is None:
+                node.actual_rows = rows
+        counts = [status["Rows After First Join"], status["Rows Returned"]]
+        for join, count in zip(joins, counts if len(joins) == 2 else counts[1:]):
+            join.actual_rows = count
+        return status
+
+    return QueryPlan(root, run)
+
+
+def plan_reachability(graph: Graph, sources: list[Primitive], targets: list[Primitive],
+                      max_hops: Optional[int] = None) -> QueryPlan:
+    """
+    Plan a query for the smallest number of hops from any of the vertices 'sources' to any of the vertices 'targets',
+    answered with a multi-source breadth-first search. The search runs forwards from the sources if their total
+    out-degree is at most the total in-degree of the targets, and backwards from the targets otherwise, so that the
+    first frontier expanded is the smaller one.
+    :param max_hops: the maximum number of hops explored, or None for no limit.
+    :return: a QueryPlan whose execution returns an OK Status with whether a target is reachable in the context
+        "data" and the smallest number of hops (None if no target is reachable) in the context "Hops", or an ERROR
+        Status if a vertex doesn't exist in the graph.
+    """
+    statistics = graph.statistics
+    forward_cost = sum(statistics.out_degrees.get(vid, 0) for vid in set(sources))
+    backward_cost = sum(statistics.in_degrees.get(vid, 0) for vid in set(targets))
+    forward = forward_cost <= backward_cost
+    average = statistics.average_degree()
+    start_count, cost = (len(set(sources)), forward_cost) if forward else (len(set(targets)), backward_cost)
+    root = PlanNode("Breadth-First Search",
+                    {"Direction": "Forward" if forward else "Backward",
+                     "Max Hops": "-" if max_hops is None else max_hops},
+                    1.0 if sources and targets else 0.0,
+                    [PlanNode("Frontier Expansion", {"Estimated Cost": cost, "Average Degree": round(average, 2)},
+                              cost if start_count else 0.0)])
+
+    def run() -> Status:
+        csr = graph.csr(reverse=not forward)
+        statuses = [ReachabilityVertexStatus(vid, graph.name, vid in csr.index) for vid in sources + targets]
+        status = ReachabilityStatus(statuses, graph.name)
+        if not status.success:
+            return status
+        starts = {csr.index[vid] for vid in (sources if forward else targets)}
+        goals = {csr.index[vid] for vid in (targets if forward else sources)}
+        distances = dict.fromkeys(starts, 0)
+        queue = deque(starts)
+        hops, expanded = (0 if starts & goals else None), 0
+        while queue and hops is None:
+            u = queue.popleft()
+            if max_hops is not None and distances[u] >= max_hops:
+                continue
+            start, end = csr.offsets[u], csr.offsets[u + 1]
+            expanded += end - start
+            for v in csr.targets[start:end]:
+                if v not in distances:
+                    distances[v] = distances[u] + 1
+                    if v in goals:
+                        hops = distances[v]
+                        break
+                    queue.append(v)
+        root.actual_rows = 0 if hops is None else 1
+        root.children[0].actual_rows = expanded
+        return ReachabilityStatus(statuses, graph.name, hops is not None,
+                                  {"Hops": hops, "Direction": root.details["Direction"], "Edges Expanded": expanded})
+
+    return QueryPlan(root, run)
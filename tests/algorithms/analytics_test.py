@@ -0,0 +1,59 @@
+import pytest
+from algorithms.analytics import *
+
+
+def test_pagerank(make_graph):
+    graph = make_graph([(1, 2), (2, 3), (3, 1), (4, 3)], weighted=False)
+    analytics = Analytics(graph)
+    status = analytics.pagerank(tolerance=1e-10, max_iterations=500)
+    assert status.success
+    ranks = dict(zip(analytics.ids, status["data"]))
+    assert abs(sum(ranks.values()) - 1) < 1e-9
+    assert ranks[3] > ranks[1] > ranks[2] > ranks[4]
+    personalized = dict(zip(analytics.ids, analytics.pagerank(personalization={4: 1.0})["data"]))
+    assert personalized[4] > ranks[4]
+    assert not analytics.pagerank(personalization={100: 1.0}).success
+    assert not analytics.pagerank(max_iterations=1).success
+
+
+def test_weighted_pagerank(make_graph):
+    graph = make_graph([(1, 2, 9.0), (1, 3, 1.0), (2, 1, 1.0), (3, 1, 1.0)])
+    ranks = dict(zip(graph.vertices.ids, Analytics(graph).pagerank(weight="weight")["data"]))
+    assert ranks[2] > ranks[3]
+
+
+def test_centralities(make_graph):
+    graph = make_graph([(1, 2), (1, 3), (1, 4), (2, 1)], weighted=False)
+    analytics = Analytics(graph)
+    assert analytics.degree_centrality()["data"] == [1.0, 1 / 3, 0.0, 0.0]
+    assert analytics.degree_centrality("both")["data"] == [4 / 3, 2 / 3, 1 / 3, 1 / 3]
+    assert not analytics.degree_centrality("sideways").success
+    centrality = analytics.eigenvector_centrality(tolerance=1e-9)["data"]
+    assert centrality[0] == max(centrality)
+    assert abs(sum(c * c for c in centrality) - 1) < 1e-9
+
+
+def test_label_propagation_and_attach(make_graph):
+    edges = [(1, 2), (2, 3), (3, 1), (4, 5), (5, 6), (6, 4), (3, 4)]
+    graph = make_graph(edges + [(b, a) for a, b in edges], weighted=False)
+    analytics = Analytics(graph)
+    status = analytics.label_propagation()
+    assert status.success
+    labels = dict(zip(analytics.ids, status["data"]))
+    assert labels[1] == labels[2] == labels[3] != labels[4] == labels[5] == labels[6]
+    assert analytics.attach("community", status).success
+    assert graph.vertices.get_field("community")["data"] == status["data"]
+    assert analytics.attach("rank", analytics.pagerank()).success
+    assert not analytics.attach("id", analytics.pagerank()).success
+    assert graph.insert([{"id": 7}], []).success
+    assert graph.vertices.get_field("rank")["data"][-1] is None
+
+
+def test_deleted_vertices_are_skipped(make_graph):
+    graph = make_graph([(1, 2), (2, 3), (3, 1), (3, 4)], weighted=False)
+    assert graph.delete([4], cascade=True).success
+    analytics = Analytics(graph)
+    status = analytics.pagerank(tolerance=1e-10, max_iterations=500)
+    assert analytics.ids == [1, 2, 3] and all(abs(rank - 1 / 3) < 1e-9 for rank in status["data"])
+    assert analytics.attach("rank", status).success
+    assert graph.vertices.values["rank"][:3] == status["data"] and graph.vertices.values["rank"][3] is None
@@ -0,0 +1,49 @@
+import pytest
+from algorithms.patterns import *
+
+
+def test_intersect_sorted():
+    assert intersect_sorted([[1, 2, 2, 5, 9], [2, 5, 7, 9], [0, 2, 9]]) == [2, 9]
+    assert intersect_sorted([[1, 3], []]) == []
+
+
+def test_match_paths_and_triangles(make_graph):
+    graph = make_graph([(1, 2), (2, 3), (3, 1), (3, 4), (4, 4)], weighted=False)
+    matcher = PatternMatcher(graph)
+    triangles = matcher.match(Pattern.triangle())["data"]
+    assert sorted(tuple(m[v] for v in "abc") for m in triangles) == [(1, 2, 3), (2, 3, 1), (3, 1, 2)]
+    paths = matcher.match(Pattern.path(2))["data"]
+    assert {(m["v0"], m["v1"], m["v2"]) for m in paths} == {(1, 2, 3), (2, 3, 1), (3, 1, 2), (2, 3, 4)}
+    assert len(matcher.match(Pattern.path(2), limit=2)["data"]) == 2
+    loops = matcher.match(Pattern().edge("x", "x"))["data"]
+    assert loops == [{"x": 4}]
+    assert len(matcher.match(Pattern.path(1), injective=False)["data"]) == 5
+
+
+def test_match_predicates(make_graph):
+    vertices = [{"id": 1, "label": "person"}, {"id": 2, "label": "person"}, {"id": 3, "label": "city"}]
+    graph = make_graph([(1, 2, 1.0), (2, 3, 5.0), (1, 3, 2.0)], vertices=vertices)
+    matcher = PatternMatcher(graph)
+    pattern = (Pattern().vertex("p", {"label": lambda x: x == "person"})
+               .vertex("c", {"label": lambda x: x == "city"})
+               .edge("p", "c", {"weight": lambda w: w > 3}))
+    assert matcher.match(pattern)["data"] == [{"p": 2, "c": 3}]
+    assert not matcher.match(Pattern().vertex("x", {"age": lambda x: True})).success
+
+
+def test_triangle_count_and_clustering(make_graph):
+    graph = make_graph([(1, 2), (2, 3), (3, 1), (1, 3), (3, 4), (1, 4), (4, 5), (2, 2)], weighted=False)
+    matcher = PatternMatcher(graph)
+    assert matcher.triangle_count()["data"] == 2
+    clustering = dict(zip(matcher.ids, matcher.clustering()["data"]))
+    assert clustering == {1: 2 / 3, 2: 1.0, 3: 2 / 3, 4: 1 / 3, 5: 0.0}
+
+
+def test_deleted_vertices_are_skipped(make_graph):
+    vertices = [{"id": 1, "label": "x"}, {"id": 2, "label": "y"}, {"id": 3, "label": "x"}, {"id": 4, "label": "y"}]
+    graph = make_graph([(2, 3, 1.0), (3, 4, 1.0)], vertices=vertices)
+    assert graph.delete([1]).success
+    matcher = PatternMatcher(graph)
+    assert matcher.match(Pattern().vertex("a"))["data"] == [{"a": 2}, {"a": 3}, {"a": 4}]
+    assert matcher.match(Pattern().vertex("a", {"label": lambda x: x == "x"}))["data"] == [{"a": 3}]
+    assert matcher.match(Pattern.path(1))["data"] == [{"v0": 2, "v1": 3}, {"v0": 3, "v1": 4}]
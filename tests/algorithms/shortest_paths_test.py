@@ -0,0 +1,51 @@
+import pytest
+from math import inf
+from algorithms.shortest_paths import *
+from constraints.graphwide import GRAPHWIDE_CONSTRAINTS
+
+
+EDGES = [(1, 2, 7.0), (1, 3, 9.0), (1, 6, 14.0), (2, 3, 10.0), (2, 4, 15.0), (3, 4, 11.0), (3, 6, 2.0),
+         (4, 5, 6.0), (6, 5, 9.0), (7, 1, 1.0)]
+
+
+def test_dijkstra(make_graph):
+    status = dijkstra(make_graph(EDGES, constraints=[GRAPHWIDE_CONSTRAINTS["WEIGHTED"]]), 1)
+    assert status.success
+    paths = status["data"]
+    assert paths.distance(5) == 20.0
+    assert paths.path(5) == [1, 3, 6, 5]
+    assert paths.distance(7) == inf and paths.path(7) is None
+    assert not dijkstra(make_graph(EDGES), 100).success
+
+
+def test_unweighted(make_graph):
+    graph = make_graph([(a, b) for a, b, _ in EDGES], weighted=False)
+    assert not dijkstra(graph, 1).success
+    assert dijkstra(graph, 1, None)["data"].distance(5) == 2.0
+
+
+def test_point_to_point(make_graph):
+    graph = make_graph(EDGES)
+    for status in [bidirectional_dijkstra(graph, 1, 5), astar(graph, 1, 5)]:
+        assert status.success
+        assert status["data"].path(5) == [1, 3, 6, 5]
+        assert status["data"].distance(5) == 20.0
+    assert bidirectional_dijkstra(graph, 5, 1)["data"].path(1) is None
+    assert bidirectional_dijkstra(graph, 4, 4)["data"].path(4) == [4]
+
+
+def test_bellman_ford(make_graph):
+    graph = make_graph([(1, 2, 4.0), (1, 3, 5.0), (3, 2, -3.0), (2, 4, 1.0)])
+    assert not dijkstra(graph, 1).success
+    status = bellman_ford(graph, 1)
+    assert status.success and status["data"].path(4) == [1, 3, 2, 4]
+    assert status["data"].distance(4) == 3.0
+    cyclic = make_graph([(1, 2, 1.0), (2, 3, -2.0), (3, 2, 1.0)])
+    assert not bellman_ford(cyclic, 1).success
+
+
+def test_deleted_vertices_are_skipped(make_graph):
+    graph = make_graph(EDGES)
+    assert graph.delete([7], cascade=True).success
+    assert not dijkstra(graph, 7).success and dijkstra(graph, 1)["data"].distance(5) == 20.0
+    assert bidirectional_dijkstra(graph, 1, 5)["data"].path(5) == [1, 3, 6, 5]
@@ -0,0 +1,31 @@
+import pytest
+from benchmarks.generators import *
+
+
+@pytest.mark.parametrize("kind", list(GENERATORS))
+def test_generators(kind):
+    n, pairs = GENERATORS[kind](200, 7)
+    assert (n, pairs) == GENERATORS[kind](200, 7)
+    assert 180 <= len(pairs) <= 200 and all(0 <= vid < n for pair in pairs for vid in pair)
+    graph = build(kind, 200, 7)
+    assert graph.edges.size() == len(pairs) and graph.vertices.size() == n
+    assert graph.check_constraints().success
+
+
+def test_shapes():
+    _, pairs = dag(100, 1)
+    assert all(source < target for source, target in pairs) and len(set(pairs)) == 100
+    n, pairs = tree(50, 1)
+    assert n == 51 and sorted(source for source, _ in pairs) == list(range(1, 51))
+    _, pairs = barabasi_albert(400, 1)
+    degrees = [0] * 401
+    for source, target in pairs:
+        degrees[target] += 1
+    assert max(degrees) > 4 * len(pairs) / len(degrees)
+
+
+@pytest.mark.parametrize("edges", [0, 1, 12, 30])
+def test_small_sizes(edges):
+    for generator in (erdos_renyi, dag):
+        n, pairs = generator(edges, 0)
+        assert len(set(pairs)) == edges and n * (n - 1) >= 2 * edges
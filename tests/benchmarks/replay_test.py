@@ -0,0 +1,42 @@
+import json
+
+from benchmarks.replay import *
+from databases.workload import WorkloadRecorder
+
+
+def test_replay_and_compare(make_database, tmp_path):
+    db = make_database()
+    path = str(tmp_path / "trace.bin")
+    db.recorder = WorkloadRecorder(path)
+    for i in range(20):
+        assert db.insert_graph("G", i, [{"id": i}]).success
+    assert not db.insert_graph("G", 20, [{"id": 0}]).success and db.drop("G", 21).success
+    db.recorder.close()
+    replayed = make_database()
+    records = replay(path, replayed, speed=1000.0)
+    insert = next(record for record in records if record["name"] == "insert_graph")
+    assert insert["calls"] == 21 and insert["mismatches"] == 0 and insert["errors"] == 0
+    assert 0 < insert["p50"] <= insert["p90"] <= insert["p99"] <= insert["max"] and "G" not in replayed.graphs
+    assert replay(path)[0]["mismatches"] == 20 and compare(records, records) == []
+    slower = [dict(record, p99=record["p99"] / 10) for record in records]
+    assert [regression["keys"] for regression in compare(records, slower)] == [["p99"], ["p99"]]
+    baseline = str(tmp_path / "baseline.json")
+    assert main([path, "--output", baseline]) == 0 and json.loads(open(baseline).read())["results"]
+    assert main([path, "--output", str(tmp_path / "run.json"), "--baseline", baseline, "--tolerance", "1000"]) == 0
+
+
+def test_replay_mutations(make_database, tmp_path):
+    db = make_database()
+    path = str(tmp_path / "trace.bin")
+    with WorkloadRecorder(path) as recorder:
+        db.recorder = recorder
+        assert db.insert_graph("G", 4, [{"id": i} for i in range(4)], [{"id": 0, "from": 0, "to": 1}]).success
+        assert db.fork_graph("G", "F", 5).success and db.insert_graph("F", 6, [{"id": 4}]).success
+        assert db.merge_graph("F", 7).success
+        assert db.delete_graph("G", 8, [1], cascade=True).success and db.update_graph("G", 9, [{"id": 2}]).success
+        assert db.compact_graph("G", 10).success and db.reorder_graph("G", 11).success
+        assert db.insert_graph("G", 12, [{"id": 1}]).success and not db.insert_graph("G", 13, [{"id": 4}]).success
+    records = replay(path, make_database())
+    assert {record["name"] for record in records} == {"insert_graph", "fork_graph", "merge_graph", "delete_graph",
+                                                       "update_graph", "compact_graph", "reorder_graph"}
+    assert all(record["mismatches"] == 0 and record["errors"] == 0 for record in records)
@@ -0,0 +1,41 @@
+import json
+
+from benchmarks.suite import *
+
+
+def test_run_and_compare(tmp_path):
+    records = run(["grid"], [100])
+    names = {record["name"] for record in records}
+    assert {"Graph.insert", "Data.add_entries", "graphwide.REFERENTIAL_INTEGRITY", "typewide.UNIQUE",
+            "dijkstra", "pagerank"} <= names
+    assert len(names) == 2 + len(GRAPHWIDE_CONSTRAINTS) + len(TYPEWIDE_FIELDS) + 11
+    insert = next(record for record in records if record["name"] == "Graph.insert")
+    assert insert["seconds"] > 0 and insert["peak"] > 0 and insert["throughput"] > 0
+    assert insert["median"] >= insert["seconds"]
+    assert compare(records, records) == []
+    faster = [dict(record, seconds=record["seconds"] / 2) if "seconds" in record else record for record in records]
+    assert {regression["name"] for regression in compare(records, faster, 0.5, 0.0)} == names - {
+        record["name"] for record in records if "error" in record}
+    path = tmp_path / "baseline.json"
+    assert main(["--kinds", "tree", "--sizes", "50", "--output", str(path)]) == 0
+    assert json.loads(path.read_text())["results"]
+    assert main(["--kinds", "tree", "--sizes", "50", "--output", str(tmp_path / "run.json"), "--baseline",
+                 str(path), "--tolerance", "1000"]) == 0
+
+
+def test_measure_repeats():
+    graphs = []
+    record = measure("Graph.insert", "grid", 1, 1, lambda graph: graph.append(1), lambda: graphs.append([]) or
+                     graphs[-1], repeat=3)
+    assert len(graphs) == 5 and all(graph == [1] for graph in graphs) and record["peak"] >= 0
+    calls = []
+    measure("noop", "grid", 1, 1, lambda: calls.append(1), repeat=3)
+    assert len(calls) > 4
+    assert "error" in measure("failing", "grid", 1, 1, lambda: 1 / 0)
+
+
+def test_run_compared_with_itself_passes(tmp_path):
+    path = tmp_path / "baseline.json"
+    arguments = ["--kinds", "grid", "tree", "--sizes", "50", "--repeat", "3"]
+    assert main(arguments + ["--output", str(path)]) == 0
+    assert main(arguments + ["--output", str(tmp_path / "run.json"), "--baseline", str(path)]) == 0
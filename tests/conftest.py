@@ -0,0 +1,50 @@
+import pytest
+from databases.database import Database
+from graphs.graph import *
+
+
+def build_graph(edges, weighted=True, vertices=None, constraints=None):
+    """
+    Builds a Graph named "G" with INT ids from a list of (from, to) or (from, to, weight) tuples. Vertices are the
+    ids named in 'edges' plus the optional list of extra vertex entries.
+    """
+    bound = lambda name, fields: BoundTypewideConstraint(TYPEWIDE_CONSTRAINTS[name], fields)
+    vertextype = VertexType("V", ["id", "label"], {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR},
+                            [bound("UNIQUE", ["id"]), bound("NOTNULL", ["id"])])
+    names = ["id", "from", "to"] + (["weight"] if weighted else [])
+    types = {name: PrimitiveTypes.INT for name in names}
+    if weighted:
+        types["weight"] = PrimitiveTypes.FLOAT
+    edgetype = EdgeType("E", names, types,
+                        [bound("UNIQUE", ["id"]), bound("NOTNULL", ["id"]), bound("NOTNULL", ["from"]),
+                         bound("NOTNULL", ["to"])])
+    graph = Graph("G", vertextype, edgetype, [] if constraints is None else constraints)
+    vertices = [] if vertices is None else vertices
+    ids = {vid for edge in edges for vid in edge[:2]} - {vertex["id"] for vertex in vertices}
+    entries = [dict(zip(names, (i,) + tuple(edge))) for i, edge in enumerate(edges)]
+    assert graph.insert([{"id": vid} for vid in sorted(ids)] + vertices, entries).success
+    return graph
+
+
+@pytest.fixture
+def make_graph():
+    return build_graph
+
+
+def build_database():
+    """
+    Builds a Database with a VertexType "V" (an INT id), an EdgeType "E" (INT id, from and to) and a Graph "G" over
+    them.
+    """
+    keys = [(TYPEWIDE_CONSTRAINTS["UNIQUE"], ["id"]), (TYPEWIDE_CONSTRAINTS["NOTNULL"], ["id"])]
+    db = Database()
+    assert db.create_vertextype("V", ["id"], {"id": PrimitiveTypes.INT}, keys, 1).success
+    assert db.create_edgetype("E", ["id", "from", "to"], {name: PrimitiveTypes.INT for name in ["id", "from", "to"]},
+                              keys + [(TYPEWIDE_CONSTRAINTS["NOTNULL"], ["from", "to"])], 2).success
+    assert db.create_graph("G", "E", "V", [], 3).success
+    return db
+
+
+@pytest.fixture
+def make_database():
+    return build_database
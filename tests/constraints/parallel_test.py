@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+import pytest
+
+from constraints import parallel
+from constraints.parallel import GraphwideScheduler, TypewideScheduler
+from graphs.graph import *
+from utilities.instrumentation import INSTRUMENTATION
+
+
+def sleeping(vertices: Data, edges: Data) -> bool:
+    time.sleep(30)
+    return True
+
+
+def failing(vertices: Data, edges: Data) -> bool:
+    raise ValueError("constraint failed")
+
+
+def violations(status: Status) -> dict[str, list[int]]:
+    found = {}
+    for substatus in getattr(status, "substatuses", []):
+        found.update(violations(substatus))
+    if not status.success and status.context is not None and "Rows" in status.context:
+        found[status["Constraint Name"]] = status["Rows"]
+    return found
+
+
+def test_parallel_matches_sequential(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 1.0), (3, 1, 1.0)])
+    graph.constraints += [GRAPHWIDE_CONSTRAINTS[name] for name in ("DIRECTED", "UNWEIGHTED", "WEIGHTED")]
+    expected = graph.check_constraints()
+    graph.scheduler = GraphwideScheduler(processes=2, fail_fast=False, min_rows=0)
+    status = graph.check_constraints()
+    assert status.success == expected.success and not status.success
+    assert ([substatus["Constraint Name"] for substatus in status.substatuses] ==
+            [substatus["Constraint Name"] for substatus in expected.substatuses])
+    assert [substatus.success for substatus in status.substatuses] == [substatus.success for substatus in
+                                                                        expected.substatuses]
+    assert "Cancelled" not in status.context
+
+
+def test_fail_fast_cancels_remaining(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    graph.constraints[:] = [GraphwideConstraint("SLOW", sleeping),
+                            GraphwideConstraint("FALSE", lambda vertices, edges: False)]
+    graph.scheduler = GraphwideScheduler(processes=2, min_rows=0)
+    start = time.perf_counter()
+    status = graph.check_constraints()
+    assert time.perf_counter() - start < 20
+    assert not status.success and status["Cancelled"] == ["SLOW"]
+    assert [substatus["Constraint Name"] for substatus in status.substatuses] == ["FALSE"]
+
+
+def test_sequential_fallback(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    graph.constraints[:0] = [GraphwideConstraint("FALSE", lambda vertices, edges: False),
+                             GRAPHWIDE_CONSTRAINTS["DIRECTED"]]
+    graph.scheduler = GraphwideScheduler(processes=2)
+    status = graph.check_constraints()
+    assert not status.success and status["Cancelled"] == ["DIRECTED", "REFERENTIAL_INTEGRITY"]
+
+
+def test_calibration(make_graph, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    graph = make_graph([(1, 2, 1.0)])
+    graph.constraints += [GRAPHWIDE_CONSTRAINTS[name] for name in ("DIRECTED", "WEIGHTED")]
+    graph.scheduler = scheduler = GraphwideScheduler(processes=2)
+    assert graph.check_constraints().success and scheduler.row_seconds > 0 and scheduler.startup is None
+    scheduler.row_seconds = 1.0
+    assert graph.check_constraints().success and scheduler.startup > 0
+    scheduler.row_seconds, scheduler.startup = 1e-12, 1.0
+    assert graph.check_constraints().success and scheduler.startup == 1.0
+
+
+def test_spilled_columns_are_checked_sequentially(make_graph, tmp_path):
+    graph = make_graph([(1, 2, 1.0)])
+    graph.constraints += [GRAPHWIDE_CONSTRAINTS[name] for name in ("DIRECTED", "WEIGHTED")]
+    graph.scheduler = GraphwideScheduler(processes=2, min_rows=0)
+    assert graph.edges.spill("weight", str(tmp_path))
+    assert graph.check_constraints().success and graph.scheduler.startup is None
+
+
+def test_worker_metrics_are_merged(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    graph.constraints += [GRAPHWIDE_CONSTRAINTS[name] for name in ("DIRECTED", "WEIGHTED")]
+    graph.scheduler = GraphwideScheduler(processes=2, min_rows=0)
+    INSTRUMENTATION.reset()
+    INSTRUMENTATION.enable()
+    try:
+        assert graph.check_constraints().success
+        stats = INSTRUMENTATION.stats()
+    finally:
+        INSTRUMENTATION.disable()
+        INSTRUMENTATION.reset()
+    assert stats["graphwide.DIRECTED"]["Calls"] == 1 and stats["graphwide.REFERENTIAL_INTEGRITY"]["Calls"] == 1
+
+
+def test_worker_exception_raised(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    graph.constraints.append(GraphwideConstraint("FAILING", failing))
+    graph.scheduler = GraphwideScheduler(processes=2, min_rows=0)
+    with pytest.raises(ValueError, match="constraint failed"):
+        graph.check_constraints()
+
+
+@pytest.mark.parametrize("min_rows", [0, 1000])
+def test_typewide_chunks(make_graph, min_rows):
+    vertices = make_graph([(1, 2, 1.0)]).vertices
+    vertices.scheduler = TypewideScheduler(processes=2, chunk_rows=3, min_rows=min_rows)
+    assert vertices.add_entries([{"id": i, "label": str(i)} for i in range(3, 10)]).success
+    entries = [{"id": 10}, {"id": 11}, {"id": 2}, {"id": 12, "label": 5}, {"id": 10}, {"id": None}, {"id": 13}]
+    status = vertices.add_entries(entries)
+    assert not status.success
+    assert violations(status) == {"UNIQUE": [2, 4], "CHECKTYPE_STR": [3], "NOTNULL": [5]}
+    vertices.rollback(entries)
+    sequential = vertices.datatype.check_constraints(vertices.values, vertices.values)
+    assert sequential.success and vertices.add_entries([{"id": 10}]).success
+
+
+def test_typewide_sequential_is_lock_free(make_graph):
+    vertices = make_graph([(1, 2, 1.0)]).vertices
+    vertices.scheduler = TypewideScheduler(processes=2, chunk_rows=3)
+    statuses = []
+    with parallel._TASK_LOCK:
+        thread = threading.Thread(target=lambda: statuses.append(vertices.add_entries([{"id": 3}, {"id": 4}])),
+                                  daemon=True)
+        thread.start()
+        thread.join(10)
+    assert statuses and statuses[0].success
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from databases.async_database import *
+
+
+def test_inserts_are_batched(make_database):
+    db = make_database()
+    adb = AsyncDatabase(db)
+
+    async def main():
+        vertices = [adb.insert_graph("G", i, [{"id": i}]) for i in range(20)]
+        edges = [adb.insert_graph("G", 100 + i, [], [{"id": i, "from": i, "to": (i + 1) % 20}]) for i in range(20)]
+        first = await asyncio.gather(*vertices)
+        second = await asyncio.gather(*edges)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert all(status.success for status in first + second) and adb.batches == 2
+    assert first[3]["lineno"] == 3 and len(db.graphs["G"].edges.ids) == 20
+    batch = first[3].substatuses[0]
+    assert batch["Batch Size"] == 20 and batch["Vertex ids"] == [3] and batch["Edge ids"] == []
+    assert second[4].substatuses[0]["Edge ids"] == [4] and len(second[4].substatuses) == 1
+
+
+def test_failing_statements_are_isolated(make_database):
+    db = make_database()
+    adb = AsyncDatabase(db, max_batch=8)
+
+    async def main():
+        statuses = await asyncio.gather(*[adb.insert_graph("G", i, [{"id": i if i not in (2, 5) else 0}])
+                                          for i in range(8)])
+        missing = await adb.insert_graph("X", 9, [{"id": 1}])
+        read = await adb.read_snapshot("G", lambda snapshot: snapshot.edges_from(7), 10)
+        await adb.flush()
+        return statuses, missing, read
+
+    statuses, missing, read = asyncio.run(main())
+    assert [status.success for status in statuses] == [True, True, False, True, True, False, True, True]
+    assert statuses[2]["lineno"] == 2 and not missing.success and read.success
+    assert sorted(db.graphs["G"].vertices.ids) == [0, 1, 3, 4, 6, 7]
@@ -0,0 +1,202 @@
+import threading
+import time
+
+import pytest
+from constraints.typewide import TYPEWIDE_CONSTRAINTS
+from databases.database import *
+
+KEYS = [(TYPEWIDE_CONSTRAINTS["UNIQUE"], ["id"]), (TYPEWIDE_CONSTRAINTS["NOTNULL"], ["id"])]
+
+
+def test_catalog_names(make_database):
+    db = make_database()
+    assert sorted(db.names()) == ["E", "G", "V"] and "G" in db.catalog
+    assert not db.create_vertextype("G", ["id"], {"id": PrimitiveTypes.INT}, KEYS, 4).success
+    assert not db.create_graph("H", "V", "E", [], 5).success
+    assert not db.create_graph("H", "E", "W", [], 6).success
+    assert db.insert_graph("G", 7, [{"id": 1}], [{"id": 1, "from": 1, "to": 1}]).success
+    assert not db.insert_graph("V", 8, [{"id": 2}]).success
+
+
+def test_drop_dependencies(make_database):
+    db = make_database()
+    assert db.create_graph("H", "E", "V", [], 4).success
+    assert db.catalog.dependents["V"] == {"G", "H"}
+    status = db.drop("V", 5)
+    assert not status.success and "V" in db.vertextypes
+    assert db.drop("G", 6).success and db.drop("H", 7).success and not db.catalog.has_dependents("E")
+    assert db.drop("E", 8).success and db.drop("V", 9).success and db.names() == []
+    assert not db.drop("V", 10).success
+
+
+def test_concurrent_reads_and_writes(make_database):
+    db = make_database()
+    assert db.create_graph("H", "E", "V", [], 4).success
+    started, release = threading.Event(), threading.Event()
+
+    def slow(graph):
+        started.set()
+        release.wait(5)
+        return graph.edges_from(1)
+
+    reader = threading.Thread(target=lambda: db.read_graph("H", slow, 5))
+    writer = threading.Thread(target=lambda: db.insert_graph("H", 6, [{"id": 1}]))
+    reader.start()
+    started.wait(5)
+    writer.start()
+    assert db.insert_graph("G", 7, [{"id": 1}]).success
+    assert db.read_graph("G", lambda graph: graph.edges_from(1), 8).success
+    time.sleep(0.05)
+    assert writer.is_alive()
+    release.set()
+    reader.join()
+    writer.join()
+    assert 1 in db.graphs["H"].vertices.entries
+    metrics = db.lock_metrics()
+    assert metrics["H"]["write"]["Contended"] == 1 and metrics["H"]["write"]["Max Wait"] >= 0.05
+    assert metrics["G"]["write"]["Contended"] == 0 and metrics["catalog"]["read"]["Acquisitions"] >= 4
+    assert not db.read_graph("X", lambda graph: None, 9).success
+
+
+def test_waiting_for_graph_releases_catalog(make_database):
+    db = make_database()
+    assert db.create_graph("H", "E", "V", [], 4).success
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow(graph):
+        started.set()
+        release.wait(5)
+        return graph.edges_from(1)
+
+    writer = threading.Thread(target=lambda: db.insert_graph("H", 5, [{"id": 1}]))
+    holder = threading.Thread(target=lambda: db.read_graph("H", slow, 6))
+    holder.start()
+    started.wait(5)
+    writer.start()
+    time.sleep(0.05)
+    creator = threading.Thread(target=lambda: results.append(
+        db.create_vertextype("W", ["id"], {"id": PrimitiveTypes.INT}, KEYS, 7).success))
+    creator.start()
+    creator.join(1)
+    assert results == [True] and db.insert_graph("G", 8, [{"id": 1}]).success
+    dropper = threading.Thread(target=lambda: results.append(db.drop("H", 9).success))
+    dropper.start()
+    release.set()
+    for thread in (holder, writer, dropper):
+        thread.join(5)
+    assert results == [True, True] and "H" not in db.graphs and "H" not in db.locks
+
+
+def test_fork_merge_and_discard(make_database):
+    db = make_database()
+    assert db.insert_graph("G", 4, [{"id": 1}, {"id": 2}]).success
+    assert db.fork_graph("G", "F", 5).success
+    assert not db.fork_graph("G", "F", 6).success and not db.fork_graph("X", "Y", 6).success
+    assert db.insert_graph("F", 7, [], [{"id": 1, "from": 1, "to": 2}]).success
+    assert not db.drop("G", 8).success and db.graphs["G"].edges.size() == 0
+    assert db.merge_graph("F", 9).success
+    assert "F" not in db.catalog and db.graphs["G"].has_edge(1, 2)
+    assert not db.merge_graph("G", 10).success
+    assert db.fork_graph("G", "F", 11).success
+    assert db.insert_graph("F", 12, [{"id": 3}]).success
+    assert db.drop("F", 13).success and 3 not in db.graphs["G"].vertices.entries
+    assert all(token == [1] for token in db.graphs["G"]._share.values()) and db.drop("G", 14).success
+
+
+def test_delete_update_and_compact(make_database):
+    db = make_database()
+    assert db.insert_graph("G", 4, [{"id": i} for i in range(4)],
+                           [{"id": i, "from": i, "to": (i + 1) % 4} for i in range(4)]).success
+    assert not db.delete_graph("G", 5, [0]).success
+    assert not db.update_graph("G", 6, [], [{"id": 0, "to": 2}]).success
+    db.compaction_threshold = 0.5
+    assert db.delete_graph("G", 7, [0], cascade=True).success and "G" not in db.compactions
+    assert db.delete_graph("G", 8, [1], cascade=True).success
+    db.compactions["G"].join(5)
+    graph = db.graphs["G"]
+    assert graph.vertices.ids == [2, 3] and graph.edges.ids == [2] and graph.tombstone_ratio() == 0.0
+    status = db.compact_graph("G", 9)
+    assert status.success and status.substatuses[0]["Rows Reclaimed"] == 0
+    assert not db.delete_graph("X", 10, [0]).success and not db.compact_graph("X", 11).success
+
+
+def test_shared_vertex_store(make_database):
+    db = make_database()
+    assert db.create_graph("A", "E", "V", [], 4, shared=True).success
+    assert db.create_graph("B", "E", "V", [], 5, shared=True).success
+    store = db.stores["V"]
+    assert db.insert_graph("A", 6, [{"id": i} for i in range(4)], [{"id": 0, "from": 0, "to": 1}]).success
+    assert db.insert_graph("B", 7, [{"id": i} for i in range(2, 6)]).success
+    assert store.ids == list(range(6)) and db.graphs["G"].vertices.size() == 0
+    assert db.delete_graph("A", 8, [0], cascade=True).success
+    db.compactions["A"].join(5)
+    assert db.graphs["A"].edges.ids == [] and store.ids == list(range(6)) and db.compact_graph("A", 9).success
+    assert not db.drop("V", 10).success and db.drop("A", 11).success
+    assert store.counts == [0, 0, 1, 1, 1, 1] and list(db.graphs["B"].vertices.entries) == [2, 3, 4, 5]
+    assert db.drop("B", 12).success and "V" not in db.stores
+
+
+def test_memory_budget(make_database, tmp_path):
+    db = make_database()
+    assert db.create_vertextype("W", ["id", "label"], {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR},
+                                KEYS, 4).success
+    assert db.create_graph("H", "E", "W", [], 5).success
+    db.spill_directory = str(tmp_path)
+    assert db.insert_graph("H", 6, [{"id": i, "label": "x" * 100 + str(i)} for i in range(1000)]).success
+    usage = db.memory()
+    columns = usage["Graphs"]["H"]["Vertices"]["Columns"]
+    assert usage["Total"] > columns["label"] > columns["id"] and usage["Budget"] is None
+    db.memory_budget = usage["Total"] - columns["label"] // 2
+    assert db.enforce_budget() == 1
+    usage = db.memory()
+    assert "label" in usage["Graphs"]["H"]["Vertices"]["Spilled"] and usage["Total"] <= db.memory_budget
+    assert db.insert_graph("H", 7, [{"id": 1000, "label": "y"}]).success
+    graph = db.graphs["H"]
+    assert graph.vertices.get_entry(1000) == {"id": 1000, "label": "y"}
+    assert graph.vertices.live("label")[:2] == ["x" * 100 + "0", "x" * 100 + "1"]
+    assert isinstance(graph.vertices.values["label"], list) and db.enforce_budget() == 1
+
+
+def test_enforce_budget_releases_catalog(make_database, tmp_path):
+    db = make_database()
+    assert db.create_vertextype("W", ["id", "label"], {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR},
+                                KEYS, 4).success
+    assert db.create_graph("H", "E", "W", [], 5).success
+    db.spill_directory = str(tmp_path)
+    assert db.insert_graph("H", 6, [{"id": i, "label": "x" * 100 + str(i)} for i in range(1000)]).success
+    db.memory_budget = db.memory()["Total"] // 2
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow(graph):
+        started.set()
+        release.wait(5)
+        return graph.edges_from(1)
+
+    holder = threading.Thread(target=lambda: db.read_graph("H", slow, 7))
+    enforcer = threading.Thread(target=lambda: results.append(db.enforce_budget()))
+    holder.start()
+    started.wait(5)
+    enforcer.start()
+    time.sleep(0.05)
+    creator = threading.Thread(target=lambda: results.append(
+        db.create_vertextype("U", ["id"], {"id": PrimitiveTypes.INT}, KEYS, 8).success))
+    creator.start()
+    creator.join(1)
+    assert results == [True] and enforcer.is_alive()
+    release.set()
+    for thread in (holder, enforcer):
+        thread.join(5)
+    assert results == [True, 1]
+
+
+def test_reorder_graph(make_database):
+    db = make_database()
+    assert db.insert_graph("G", 4, [{"id": i} for i in range(6)],
+                           [{"id": i, "from": i, "to": (i * 5) % 6} for i in range(6)]).success
+    assert not db.reorder_graph("G", 5, "random").success and not db.reorder_graph("X", 6).success
+    assert db.reorder_graph("G", 7, "bfs").success
+    graph = db.graphs["G"]
+    assert sorted(graph.vertices.ids) == list(range(6)) and graph.vertices.ids != list(range(6))
+    assert all(graph.has_edge(i, (i * 5) % 6) for i in range(6))
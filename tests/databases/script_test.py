@@ -0,0 +1,32 @@
+import pytest
+from databases.script import *
+
+
+def test_script_commits_once(make_database):
+    db = make_database()
+    assert db.create_graph("H", "E", "V", [], 4).success
+    script = Script(db)
+    for i in range(10):
+        assert script.insert_graph("G", 10 + i, [{"id": i}], [{"id": i, "from": i, "to": 0}] if i else []).success
+    assert script.insert_graph("H", 20, [{"id": 1}]).success
+    assert len(db.graphs["G"].vertices.ids) == 0
+    assert script.commit(21).success and script.statements == []
+    assert len(db.graphs["G"].edges.ids) == 9 and db.graphs["H"].vertices.ids == [1]
+
+
+def test_script_rolls_back_and_reports_lineno(make_database):
+    db = make_database()
+    script = Script(db)
+    assert script.insert_graph("G", 1, [{"id": 1}, {"id": 2}]).success
+    assert script.insert_graph("G", 2, [], [{"id": 1, "from": 1, "to": 2}]).success
+    assert script.insert_graph("G", 3, [], [{"id": 2, "from": 2, "to": 7}]).success
+    assert script.insert_graph("G", 4, [{"id": 7}]).success
+    assert script.insert_graph("G", 5, [{"id": 1}]).success
+    status = script.commit(6)
+    assert not status.success and status.substatuses[0]["lineno"] == 5
+    assert db.graphs["G"].vertices.ids == []
+    assert not script.insert_graph("G", 7, [{"id": "x"}]).success
+    assert not script.insert_graph("X", 8, [{"id": 1}]).success
+    assert script.insert_graph("G", 9, [{"id": 1}]).success
+    status = script.commit(10)
+    assert [substatus["lineno"] for substatus in status.substatuses] == [7, 8] and db.graphs["G"].vertices.ids == []
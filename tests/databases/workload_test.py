@@ -0,0 +1,30 @@
+import pytest
+from databases.database import *
+from databases.workload import *
+
+
+def test_record_and_read(make_database, tmp_path):
+    db = make_database()
+    path = str(tmp_path / "trace.bin")
+    with WorkloadRecorder(path) as recorder:
+        db.recorder = recorder
+        keys = [(TYPEWIDE_CONSTRAINTS["UNIQUE"], ["id"]), (TYPEWIDE_CONSTRAINTS["NOTNULL"], ["id"])]
+        assert db.create_vertextype("W", ["id"], {"id": PrimitiveTypes.INT}, keys, 4).success
+        assert db.create_graph("H", "E", "W", [GRAPHWIDE_CONSTRAINTS["DIRECTED"]], 5).success
+        assert db.insert_graph("H", 6, [{"id": 1}, {"id": 2}], edges=[{"id": 0, "from": 1, "to": 2}]).success
+        assert not db.insert_graph("H", 7, [{"id": 1}]).success
+        assert db.compact_graph("H", 8).success and db.drop("H", 9).success
+    assert db.create_graph("H", "E", "W", [], 10).success and recorder.calls == 6
+    records = list(read_trace(path))
+    assert [record.operation for record in records] == ["create_vertextype", "create_graph", "insert_graph",
+                                                        "insert_graph", "compact_graph", "drop"]
+    assert [record.success for record in records] == [True, True, True, False, True, True]
+    assert records[0].arguments["types"] == {"id": "INT"} and records[1].arguments["constraints"] == ["DIRECTED"]
+    assert records[2].arguments["edges"] == [{"id": 0, "from": 1, "to": 2}] and records[3].lineno == 7
+    assert decode("create_vertextype", records[0].arguments)["constraints"] == keys
+    assert all(record.seconds > 0 and record.start >= 0 for record in records)
+    with open(path, "ab") as file:
+        file.write(b"\x10\x00")
+    assert len(list(read_trace(path))) == 6
+    with pytest.raises(ValueError):
+        list(read_trace(__file__))
@@ -0,0 +1,30 @@
+import random
+from array import array
+
+import pytest
+
+from graphs.csr import PackedArray, PackedCSRAdjacency
+from graphs.graph import *
+
+
+def test_packed_array():
+    generator = random.Random(7)
+    values = sorted(generator.randrange(-1000, 10 ** 12) for _ in range(500)) + [3, 3, 1, -5]
+    packed = PackedArray(values, 16)
+    assert list(packed) == values and len(packed) == 504 and packed[-1] == -5 and packed[100] == values[100]
+    assert packed[37:133] == array('q', values[37:133]) and packed[10:10] == array('q')
+    assert packed.find(values[250], 0, 500) == values.index(values[250]) and packed.find(3, 500, 504) == 500
+    assert all(packed.find(value, 0, 500) == (values.index(value) if value in values[:500] else -1)
+               for value in [values[0] - 1, values[499] + 1] + [values[k] + d for k in range(0, 500, 9) for d in (0, 1)])
+
+
+def test_packed_csr(make_graph):
+    generator = random.Random(3)
+    edges = [(generator.randrange(200), generator.randrange(200), 1.0) for _ in range(2000)]
+    graph = make_graph(edges)
+    csr = graph.csr()
+    packed = PackedCSRAdjacency(graph.vertices, graph.edges)
+    assert list(packed.targets) == list(csr.targets)
+    assert list(packed.rows) == list(csr.rows) and packed.neighbors(5) == csr.neighbors(5)
+    assert all(packed.find(i, j) == csr.find(i, j) for i in range(0, 200, 7) for j in range(200))
+    assert packed.nbytes() * 2 < sum(a.itemsize * len(a) for a in (csr.offsets, csr.targets, csr.rows))
@@ -0,0 +1,26 @@
+import pytest
+from datatypes.primitive import PrimitiveTypes
+from graphs.cursor import *
+
+
+def test_cursor_pages(make_graph):
+    graph = make_graph([(i, i + 1, float(i)) for i in range(10)])
+    cursor = graph.edges_cursor(["id", "weight"], batch_size=4)["data"]
+    assert cursor.fetch() == [{"id": i, "weight": float(i)} for i in range(4)]
+    token = cursor.token()
+    assert [len(chunk["id"]) for chunk in cursor.chunks()] == [4, 2]
+    assert cursor.exhausted() and cursor.fetch() == []
+    assert graph.insert([{"id": 100}], [{"id": 10, "from": 1, "to": 100, "weight": 0.5}]).success
+    resumed = graph.edges.resume(token, ["id"])["data"]
+    assert [row["id"] for row in resumed] == list(range(4, 10))
+    assert len(list(graph.edges_cursor()["data"])) == 11
+
+
+def test_cursor_errors(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    assert not graph.vertices_cursor(["age"]).success
+    assert not graph.vertices.resume("not a token").success
+    token = graph.vertices_cursor()["data"].token()
+    assert graph.vertices.resume(token).success
+    graph.vertices.attach_field("score", PrimitiveTypes.FLOAT, [1.0, 2.0])
+    assert not graph.vertices.resume(token).success
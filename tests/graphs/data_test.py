@@ -0,0 +1,82 @@
+from graphs.graph import *
+from utilities.memory import SpilledColumn
+
+
+def test_delete_and_rollback(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 2.0), (3, 1, 3.0)])
+    edges = graph.edges
+    index = edges.create_index("weight") and edges.index("weight")
+    version = edges.version
+    assert edges.delete_entries([1]).success
+    assert edges.tombstones == 1 and edges.is_deleted(1) and edges.size() == 2
+    assert edges.live("weight") == [1.0, 3.0] and index.range() == [0, 2]
+    assert edges.statistics.columns["weight"].rows == 2
+    assert [row["id"] for row in edges.cursor(["id"])["data"]] == [0, 2]
+    edges.rollback()
+    assert edges.tombstones == 0 and list(edges.entries) == [0, 1, 2] and edges.version == version
+    assert edges.index("weight").range() == [0, 1, 2] and edges.statistics.columns["weight"].rows == 3
+    assert not edges.delete_entries([7]).success
+
+
+def test_update_and_rollback(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 2.0)])
+    edges = graph.edges
+    edges.create_index("weight")
+    assert edges.update_entries([{"id": 0, "weight": 5.0}]).success
+    assert edges.values["weight"] == [5.0, 2.0] and edges.index("weight").equal(5.0) == [0]
+    assert edges.entries[0]["weight"] == 5.0 and edges.index("weight").equal(1.0) == []
+    assert not edges.update_entries([{"id": 1, "weight": "heavy"}]).success
+    edges.rollback()
+    assert edges.values["weight"] == [5.0, 2.0] and edges.index("weight").equal(2.0) == [1]
+    assert not edges.update_entries([{"id": 0, "from": 3}], (ID, FROM, TO)).success
+    assert not edges.update_entries([{"id": 9, "weight": 1.0}]).success
+
+
+def test_compaction(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 2.0), (3, 1, 3.0)])
+    edges = graph.edges
+    edges.create_index("weight")
+    assert edges.delete_entries([0, 2]).success
+    cursor = edges.cursor(["id"])["data"]
+    token = cursor.token()
+    compaction = edges.compaction()
+    assert compaction.reclaimed == 2 and edges.compact(compaction)
+    assert edges.ids == [1] and edges.positions == {1: 0} and edges.tombstones == 0
+    assert edges.index("weight").equal(2.0) == [0] and edges.stamps == (1, [])
+    assert [row["id"] for row in cursor] == [1] and not edges.resume(token).success
+    assert edges.add_entries([{"id": 0, "from": 1, "to": 2, "weight": 1.0}]).success
+    assert not edges.compact(compaction)
+
+
+def test_unique_is_checked_incrementally():
+    bound = lambda name, fields: BoundTypewideConstraint(TYPEWIDE_CONSTRAINTS[name], fields)
+    vertextype = VertexType("V", ["id", "label"], {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR},
+                            [bound("UNIQUE", ["id", "label"]), bound("NOTNULL", ["id"])])
+    vertices = Data(vertextype)
+    assert vertices.add_entries([{"id": 1, "label": "a"}, {"id": 2, "label": "b"}]).success
+    entries = [{"id": 3, "label": "a"}]
+    assert not vertices.add_entries(entries).success
+    vertices.rollback(entries)
+    assert vertices.unique == {"label": {"a": 1, "b": 1}}
+    assert vertices.delete_entries([1]).success and vertices.add_entries([{"id": 3, "label": "a"}]).success
+    assert vertices.update_entries([{"id": 2, "label": "a"}, {"id": 3, "label": "b"}]).success
+    assert not vertices.update_entries([{"id": 2, "label": "b"}]).success
+    vertices.rollback()
+    assert vertices.unique == {"label": {"a": 1, "b": 1}} and vertices.live("label") == ["a", "b"]
+
+
+def test_spilled_columns_stay_spilled(tmp_path):
+    bound = lambda name, fields: BoundTypewideConstraint(TYPEWIDE_CONSTRAINTS[name], fields)
+    vertextype = VertexType("V", ["id", "label"], {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR},
+                            [bound("UNIQUE", ["id", "label"]), bound("NOTNULL", ["id"]), bound("CHECKTYPE_STR", ["label"])])
+    vertices = Data(vertextype)
+    assert vertices.add_entries([{"id": i, "label": str(i)} for i in range(10)]).success
+    assert vertices.spill("label", str(tmp_path))
+    assert vertices.delete_entries([3]).success
+    vertices.rollback()
+    assert vertices.delete_entries([4]).success and vertices.add_entries([{"id": 10, "label": "4"}]).success
+    entries = [{"id": 11, "label": "5"}]
+    assert not vertices.add_entries(entries).success
+    vertices.rollback(entries)
+    assert isinstance(vertices.values["label"], SpilledColumn)
+    assert vertices.statistics.columns["label"].rows == 10
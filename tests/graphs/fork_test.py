@@ -0,0 +1,54 @@
+from graphs.graph import *
+
+
+def test_fork_shares_until_written(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 1.0)])
+    graph.create_view("out", AggregateView.out_degree())
+    fork = graph.fork("F")
+    assert fork.vertices.values["id"] is graph.vertices.values["id"] and fork.M is graph.M
+    assert fork.insert([{"id": 4}], [{"id": 2, "from": 1, "to": 4, "weight": 2.0}]).success
+    assert fork.vertices.values["id"] is not graph.vertices.values["id"] and fork.M is not graph.M
+    assert fork.M[2] is graph.M[2] and fork.M[1] is not graph.M[1]
+    assert [edge["id"] for edge in fork.edges_from(1)["data"]] == [0, 2]
+    assert [edge["id"] for edge in graph.edges_from(1)["data"]] == [0]
+    assert fork.view("out").get(1) == 2 and graph.view("out").get(1) == 1
+    assert graph.statistics.edge_count == 2 and 4 not in graph.vertices.entries
+    assert graph.insert([{"id": 5}], [{"id": 3, "from": 2, "to": 5, "weight": 1.0}]).success
+    assert [edge["id"] for edge in fork.edges_from(2)["data"]] == [1]
+    assert not fork.has_edge(2, 5) and 5 not in fork.vertices.entries
+
+
+def test_fork_merge(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    fork = graph.fork("F")
+    assert fork.base == (2, 1) and fork.parent is graph
+    assert fork.insert([{"id": 3}], [{"id": 1, "from": 2, "to": 3, "weight": 1.0}]).success
+    assert graph.insert([{"id": 4}]).success
+    assert graph.merge(fork).success
+    assert graph.has_edge(2, 3) and set(graph.vertices.entries) == {1, 2, 3, 4}
+    conflicting = graph.fork("C")
+    assert conflicting.insert([], [{"id": 9, "from": 4, "to": 1, "weight": 1.0}]).success
+    assert graph.insert([], [{"id": 9, "from": 1, "to": 4, "weight": 1.0}]).success
+    assert not graph.merge(conflicting).success and not graph.has_edge(4, 1)
+
+
+def test_fork_release(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    fork = graph.fork("F")
+    fork.release()
+    assert all(token == [1] for token in [*graph._share.values(), *graph.vertices._share.values()])
+    values = graph.vertices.values["id"]
+    assert graph.insert([{"id": 3}]).success and graph.vertices.values["id"] is values
+
+
+def test_fork_copies_written_buffers(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 1.0)])
+    fork = graph.fork("F")
+    assert fork.update([], [{"id": 0, "weight": 5.0}]).success
+    assert fork.edges.values["weight"] is not graph.edges.values["weight"]
+    assert fork.edges.values["id"] is graph.edges.values["id"] and fork.edges.ids is graph.edges.ids
+    assert fork.statistics is graph.statistics and graph.edges.entries[0]["weight"] == 1.0
+    assert fork.delete([], [1]).success
+    assert fork.edges.values["from"] is graph.edges.values["from"] and fork.edges.deleted is not graph.edges.deleted
+    assert fork.statistics is not graph.statistics and graph.has_edge(2, 3) and not fork.has_edge(2, 3)
+    assert graph.edges.live("weight") == [1.0, 1.0] and fork.edges.live("weight") == [5.0]
@@ -0,0 +1,62 @@
+from graphs.graph import *
+
+
+def test_delete_restrict_and_cascade(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 2.0), (3, 1, 3.0), (3, 3, 4.0)])
+    graph.create_view("out", AggregateView.out_degree())
+    status = graph.delete([3])
+    assert not status.success and 3 in graph.vertices.entries and len(graph.M[3]) == 2
+    assert graph.view("out").get(3) == 2 and graph.edges.tombstones == 0
+    assert graph.delete([3], [1, 2, 3]).success
+    assert set(graph.vertices.entries) == {1, 2} and 3 not in graph.M and graph.edges.size() == 1
+    assert graph.view("out").get(3) == 0 and graph.view("out").get(2) == 0
+    assert graph.statistics.edge_count == 1 and 3 not in graph.statistics.in_degrees
+    assert graph.delete([1], cascade=True).success
+    assert graph.edges.size() == 0 and graph.M == {2: []} and graph.statistics.in_degrees == {2: 0}
+    assert [row["id"] for row in graph.vertices_cursor(["id"])["data"]] == [2]
+    assert graph.csr().num_edges() == 0 and not graph.delete([1]).success
+
+
+def test_delete_and_reinsert(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    with graph.snapshot() as snapshot:
+        assert graph.delete([], [0]).success
+        assert graph.insert([], [{"id": 0, "from": 2, "to": 1, "weight": 2.0}]).success
+        assert snapshot.edges_list() == [] and graph.has_edge(2, 1) and not graph.has_edge(1, 2)
+    assert graph.adjacency_stamps[1] == (0, []) and graph.adjacency_stamps[2] == (1, [])
+    assert graph.compact(graph.compaction()).success
+    assert graph.edges.ids == [0] and graph.csr().num_edges() == 1
+
+
+def test_update(make_graph):
+    graph = make_graph([(1, 2, 1.0), (1, 3, 2.0)])
+    graph.create_view("weight", AggregateView.out_weight("weight"))
+    assert graph.update([{"id": 2, "label": "b"}], [{"id": 1, "weight": 5.0}]).success
+    assert graph.M[1][1]["weight"] == 5.0 and graph.view("weight").get(1) == 6.0
+    assert graph.vertices.entries[2]["label"] == "b"
+    assert not graph.update([], [{"id": 1, "to": 2}]).success
+    assert not graph.update([], [{"id": 0, "weight": 3.0}, {"id": 1, "weight": "x"}]).success
+    assert graph.M[1][0]["weight"] == 1.0 and graph.view("weight").get(1) == 6.0
+    fork = graph.fork("F")
+    assert fork.update([], [{"id": 0, "weight": 0.5}]).success
+    assert graph.M[1][0]["weight"] == 1.0 and fork.M[1][0]["weight"] == 0.5
+
+
+def test_reorder(make_graph):
+    graph = make_graph([(1, 5, 1.0), (5, 2, 2.0), (2, 4, 3.0), (4, 3, 4.0), (6, 1, 5.0)])
+    assert graph.delete([6], cascade=True).success
+    before = graph.snapshot()
+    assert graph.insert([{"id": 7}], [{"id": 9, "from": 7, "to": 1, "weight": 6.0}]).success
+    assert not graph.reorder("random").success
+    status = graph.reorder("rcm")
+    assert status.success and status["Rows Reclaimed"] == 2
+    assert graph.vertices.ids[:5] in ([3, 4, 2, 5, 1], [1, 5, 2, 4, 3]) and graph.vertices.ids[5] == 7
+    assert graph.edges.ids[-1] == 9 and list(graph.M) == graph.vertices.ids
+    assert graph.vertices.get_entry(5) == {"id": 5} and graph.has_edge(5, 2) and graph.has_edge(7, 1)
+    csr = graph.csr()
+    assert [csr.ids[j] for j in csr.neighbors(csr.index[1])] == [5]
+    assert sorted(vertex["id"] for vertex in before.vertices_list()) == [1, 2, 3, 4, 5]
+    with graph.snapshot() as after:
+        assert [vertex["id"] for vertex in after.vertices_list()] == graph.vertices.ids
+    before.release()
+    assert graph.reorder("degree").success and graph.vertices.ids[0] in (1, 2, 4, 5)
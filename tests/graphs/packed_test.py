@@ -0,0 +1,71 @@
+import random
+from collections import Counter
+
+from graphs.csr import PackedArray
+from graphs.graph import *
+from graphs.packed import PackedNeighbors
+
+
+def scan(graph, start, end):
+    return any(edge["to"] == end for edge in graph.M.get(start, []))
+
+
+def test_packed_neighbors():
+    generator = random.Random(5)
+    packed = PackedNeighbors(8)
+    expected = {vid: Counter() for vid in range(4)}
+    for step in range(3000):
+        vid = generator.randrange(4)
+        present = list(expected[vid].elements())
+        if present and generator.random() < 0.4:
+            row = generator.choice(present)
+            packed.remove(vid, row)
+            expected[vid][row] -= 1
+        else:
+            row = generator.randrange(10 ** 6 if vid == 0 else 50)
+            packed.add(vid, row)
+            expected[vid][row] += 1
+        if step % 7 == 0:
+            packed.flush()
+        if step % 50 == 0:
+            for vid, rows in expected.items():
+                assert list(packed.neighbors(vid)) == sorted(rows.elements())
+                assert all(packed.contains(vid, row) == (rows[row] > 0) for row in range(50))
+    packed.add(9, 300)
+    packed.add(9, 2)
+    packed.flush()
+    assert isinstance(packed.lists[0], PackedArray) and isinstance(packed.lists[9], bytes)
+    assert list(packed.neighbors(9)) == [2, 300] and packed.contains(9, 300) and not packed.contains(9, 3)
+    copy = packed.copy()
+    copy.add(3, 7)
+    copy.flush()
+    assert copy.contains(3, 7) and packed.contains(3, 7) == (expected[3][7] > 0)
+    packed.drop(0)
+    assert list(packed.neighbors(0)) == [] and not packed.contains(0, 1)
+
+
+def test_packed_graph(make_graph):
+    generator = random.Random(3)
+    edges = [(generator.randrange(400), generator.randrange(400), 1.0) for _ in range(3000)]
+    edges += [(0, generator.randrange(400), 1.0) for _ in range(500)]
+    graph = make_graph(edges)
+    graph.pack(16)
+    usage = graph.memory()
+    assert usage["Packed"] * 2 < usage["Adjacency"]
+    pairs = [(generator.randrange(400), generator.randrange(400)) for _ in range(2000)] + [edge[:2] for edge in edges]
+    assert all(graph.has_edge(a, b) == scan(graph, a, b) for a, b in pairs) and not graph.has_edge(0, 1000)
+    assert sorted(graph.neighbors(0)) == sorted(edge["to"] for edge in graph.M[0])
+    assert graph.insert([{"id": 1000}], [{"id": 5000, "from": 0, "to": 1000, "weight": 1.0}]).success
+    assert graph.has_edge(0, 1000) and not graph.has_edge(1000, 0)
+    assert not graph.insert([], [{"id": 5001, "from": 1000, "to": 2000, "weight": 1.0}]).success
+    assert not graph.has_edge(1000, 2000)
+    assert graph.delete([], [5000], dry_run=True).success and graph.has_edge(0, 1000)
+    targets = {edge["to"] for edge in graph.M[7]}
+    assert graph.delete([7], cascade=True).success
+    assert not any(graph.has_edge(7, b) for b in targets) and not any(graph.has_edge(a, 7) for a in range(400))
+    assert graph.update([], [{"id": 5000, "weight": 2.0}]).success and graph.has_edge(0, 1000)
+    fork = graph.fork("F")
+    assert fork.delete([], [5000]).success and not fork.has_edge(0, 1000) and graph.has_edge(0, 1000)
+    assert graph.compact(graph.reordering()).success
+    assert all(graph.has_edge(a, b) == scan(graph, a, b) for a, b in pairs)
+    assert sorted(graph.neighbors(0)) == sorted(edge["to"] for edge in graph.M[0])
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+from constraints.graphwide import GraphwideConstraint
+from graphs.snapshot import *
+
+
+def test_snapshot_isolation(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    old = graph.snapshot()
+    assert graph.insert([{"id": 3}], [{"id": 1, "from": 1, "to": 3, "weight": 2.0}]).success
+    assert not graph.insert([{"id": 4}], [{"id": 2, "from": 4, "to": 9, "weight": 2.0}]).success
+    with graph.snapshot() as new:
+        assert [edge["id"] for edge in new.edges_from(1)["data"]] == [0, 1] and new.has_vertex(3)
+        assert len(new.vertices_list()) == 3 and not new.has_vertex(4)
+    assert [edge["id"] for edge in old.edges_from(1)["data"]] == [0]
+    assert not old.edges_from(3).success and len(old.edges_list()) == 1
+    assert [row["id"] for row in old.cursor(edges=True, fields=["id"])["data"]] == [0]
+    assert not old.cursor(fields=["age"]).success
+    assert graph.vertices.stamps[1] and graph.adjacency_stamps[1][1]
+    old.release()
+    assert graph.vertices.stamps == (3, []) and graph.adjacency_stamps[1] == (2, [])
+    assert graph.vertex_versions == {} and graph.snapshots.pins == {}
+
+
+def test_snapshot_during_insert(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    checking, release = threading.Event(), threading.Event()
+    integrity = graph.constraints[0]
+
+    def slow(vertices, edges):
+        checking.set()
+        release.wait(5)
+        return integrity.check(vertices, edges)
+
+    constraint = type("Slow", (), {"check": staticmethod(slow)})()
+    graph.constraints.insert(0, constraint)
+    writer = threading.Thread(target=graph.insert, args=([{"id": 3}], [{"id": 1, "from": 1, "to": 3}]))
+    writer.start()
+    checking.wait(5)
+    with graph.snapshot() as snapshot:
+        assert len(snapshot.edges_list()) == 1 and len(snapshot.edges_from(1)["data"]) == 1
+        release.set()
+        writer.join()
+        assert len(snapshot.edges_list()) == 1 and not snapshot.has_vertex(3)
+    assert len(graph.snapshot().edges_list()) == 2
+
+
+def test_snapshot_ignores_uncommitted_deletes_and_updates(make_graph):
+    graph = make_graph([(1, 2, 1.0), (2, 3, 2.0)])
+    old = graph.snapshot()
+    snapshots = []
+    graph.constraints.append(GraphwideConstraint("SNAPSHOT", lambda vertices, edges: not snapshots.append(
+        graph.snapshot())))
+    assert graph.update([], [{"id": 0, "weight": 5.0}], dry_run=True).success
+    assert graph.delete([], [1], dry_run=True).success
+    for snapshot in snapshots:
+        assert [edge["weight"] for edge in snapshot.edges_list()] == [1.0, 2.0]
+        snapshot.release()
+    assert graph.update([], [{"id": 0, "weight": 5.0}]).success and graph.delete([], [1]).success
+    assert [edge["weight"] for edge in old.edges_list()] == [5.0] and graph.edges.live("weight") == [5.0]
+    old.release()
@@ -0,0 +1,25 @@
+import pytest
+from graphs.statistics import *
+
+
+def test_hyperloglog():
+    sketch = HyperLogLog()
+    for i in range(20000):
+        sketch.add(i % 5000)
+    assert abs(sketch.estimate() - 5000) < 500
+    small = HyperLogLog()
+    for value in ["a", "b", "c", "a"]:
+        small.add(value)
+    assert round(small.estimate()) == 3
+
+
+def test_data_and_graph_statistics(make_graph):
+    graph = make_graph([(1, 2, 5.0), (1, 3, None), (2, 3, 2.0)])
+    weight = graph.edges.statistics.columns["weight"]
+    assert (weight.rows, weight.nulls, weight.minimum, weight.maximum) == (3, 1, 2.0, 5.0)
+    assert round(weight.distinct_count()) == 2
+    assert graph.statistics.out_degrees == {1: 2, 2: 1, 3: 0} and graph.statistics.in_histogram == {0: 1, 1: 1, 2: 1}
+    assert not graph.insert([], [{"id": 3, "from": 3, "to": 1, "weight": 9.0}, {"id": 0, "from": 3, "to": 1}]).success
+    assert (weight.rows, weight.maximum) == (3, 5.0) and graph.statistics.edge_count == 3
+    assert graph.insert([], [{"id": 3, "from": 3, "to": 1, "weight": 9.0}]).success
+    assert (weight.rows, weight.maximum) == (4, 9.0) and graph.statistics.in_degrees[1] == 1
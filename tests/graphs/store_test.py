@@ -0,0 +1,71 @@
+from algorithms.analytics import Analytics
+from algorithms.patterns import Pattern, PatternMatcher
+from graphs.graph import *
+from graphs.store import VertexStore
+
+
+def shared_graphs(*names):
+    bound = lambda name, fields: BoundTypewideConstraint(TYPEWIDE_CONSTRAINTS[name], fields)
+    vertextype = VertexType("V", ["id", "label"], {"id": PrimitiveTypes.INT, "label": PrimitiveTypes.STR},
+                            [bound("UNIQUE", ["id"]), bound("NOTNULL", ["id"])])
+    edgetype = EdgeType("E", ["id", "from", "to"], {name: PrimitiveTypes.INT for name in ["id", "from", "to"]},
+                        [bound("UNIQUE", ["id"]), bound("NOTNULL", ["id"]), bound("NOTNULL", ["from"]),
+                         bound("NOTNULL", ["to"])])
+    store = VertexStore(vertextype)
+    return store, [Graph(name, vertextype, edgetype, [], store) for name in names]
+
+
+def test_graphs_share_rows():
+    store, (a, b) = shared_graphs("A", "B")
+    assert a.insert([{"id": 1}, {"id": 2, "label": "x"}, {"id": 3}], [{"id": 0, "from": 1, "to": 2}]).success
+    assert b.insert([{"id": 2, "label": "x"}, {"id": 3}, {"id": 4}], [{"id": 0, "from": 4, "to": 3}]).success
+    assert store.ids == [1, 2, 3, 4] and store.counts == [1, 2, 2, 1]
+    assert a.vertices.values["id"] is b.vertices.values["id"]
+    assert list(a.vertices.entries) == [1, 2, 3] and list(b.vertices.entries) == [2, 3, 4]
+    assert a.vertices.size() == 3 and 4 not in a.vertices.entries and a.vertices.get_entry(4) is None
+    assert [vertex["id"] for vertex in a.snapshot().vertices_list()] == [1, 2, 3]
+    assert [row["id"] for row in b.vertices.cursor(["id"])["data"]] == [2, 3, 4]
+    b.vertices.create_index("label")
+    assert b.vertices.index("label").equal("x") == [1]
+    assert not a.insert([], [{"id": 1, "from": 1, "to": 4}]).success
+
+
+def test_conflicts_and_rollback():
+    store, (a, b) = shared_graphs("A", "B")
+    assert a.insert([{"id": 1, "label": "x"}]).success
+    assert not b.insert([{"id": 1, "label": "y"}]).success and not a.insert([{"id": 1, "label": "x"}]).success
+    assert not b.insert([{"id": 2}, {"id": 2}]).success
+    assert store.counts == [1, 0] and store.orphans() == 1 and list(b.vertices.entries) == []
+    assert b.insert([{"id": 2, "label": "z"}, {"id": 1, "label": "x"}]).success
+    assert store.ids == [1, 2] and store.entries[2]["label"] == "z" and store.counts == [2, 1]
+
+
+def test_delete_update_and_release():
+    store, (a, b) = shared_graphs("A", "B")
+    assert a.insert([{"id": 1}, {"id": 2}]).success and b.insert([{"id": 2}]).success
+    assert a.delete([2]).success
+    assert list(a.vertices.entries) == [1] and list(b.vertices.entries) == [2] and store.counts == [1, 1]
+    assert a.compact(a.compaction()).success and store.ids == [1, 2]
+    assert b.update([{"id": 2, "label": "y"}]).success and not a.insert([{"id": 2}]).success
+    assert a.insert([{"id": 2, "label": "y"}]).success and not a.update([{"id": 2, "label": "z"}]).success
+    assert store.entries[2]["label"] == "y" and b.vertices.get_entry(2)["label"] == "y"
+    assert a.update([{"id": 1, "label": "y"}]).success and store.entries[1]["label"] == "y"
+    fork = a.fork("F")
+    assert store.counts == [2, 3] and fork.insert([{"id": 3}]).success and 3 not in a.vertices.entries
+    fork.release()
+    b.release()
+    assert store.counts == [1, 1, 0] and store.views == [a.vertices]
+
+
+def test_algorithms_see_only_their_rows():
+    store, (a, b) = shared_graphs("A", "B")
+    assert a.insert([{"id": 1, "label": "x"}, {"id": 2, "label": "x"}], [{"id": 0, "from": 1, "to": 2}]).success
+    assert b.insert([{"id": 10, "label": "x"}, {"id": 11, "label": "y"}, {"id": 2, "label": "x"}],
+                    [{"id": 0, "from": 10, "to": 11}, {"id": 1, "from": 11, "to": 10}]).success
+    assert b.delete([2]).success
+    analytics = Analytics(b)
+    assert analytics.ids == [10, 11] and analytics.pagerank()["data"] == [0.5, 0.5]
+    matcher = PatternMatcher(b)
+    assert matcher.match(Pattern().vertex("v"))["data"] == [{"v": 10}, {"v": 11}]
+    assert matcher.match(Pattern().vertex("v", {"label": lambda label: label == "x"}))["data"] == [{"v": 10}]
+    assert Analytics(a).ids == [1, 2]
@@ -0,0 +1,31 @@
+import pytest
+from graphs.views import *
+
+ENTRIES = [{"id": 1, "label": "a"}, {"id": 2, "label": "a"}, {"id": 3, "label": "b"}]
+
+
+def test_views_follow_insertions(make_graph):
+    graph = make_graph([(1, 2, 1.5), (1, 3, 2.0), (2, 3, None)], vertices=ENTRIES)
+    assert graph.create_view("out", AggregateView.out_degree()).success
+    assert graph.create_view("in", AggregateView.in_degree()).success
+    assert graph.create_view("weight", AggregateView.out_weight("weight")).success
+    assert graph.create_view("labels", AggregateView.vertex_count("label")).success
+    assert graph.create_view("avg", AggregateView(EDGES, TO, "AVG", "weight")).success
+    assert [graph.view("out").get(vid) for vid in (1, 2, 3)] == [2, 1, 0]
+    assert graph.view("weight").get(1) == 3.5 and graph.view("weight").get(2) is NULL
+    assert graph.view("labels").items() == {"a": 2, "b": 1}
+    assert graph.insert([{"id": 4, "label": "b"}], [{"id": 3, "from": 4, "to": 3, "weight": 4.0}]).success
+    assert graph.view("in").get(3) == 3 and graph.view("avg").get(3) == 3.0 and graph.view("labels").get("b") == 2
+    assert not graph.insert([{"id": 5, "label": "c"}], [{"id": 4, "from": 5, "to": 9, "weight": 1.0}]).success
+    assert graph.view("labels").items() == {"a": 2, "b": 2} and graph.view("out").get(5) == 0
+    assert graph.view("in").get(3) == 3 and graph.view("avg").get(3) == 3.0
+
+
+def test_view_errors(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    assert graph.create_view("out", AggregateView.out_degree()).success
+    assert not graph.create_view("out", AggregateView.in_degree()).success
+    assert not graph.create_view("w", AggregateView(EDGES, FROM, "SUM", "id2")).success
+    assert not graph.create_view("l", AggregateView(VERTICES, "label", "SUM", "label")).success
+    assert not graph.create_view("m", AggregateView(EDGES, FROM, "MEDIAN", "weight")).success
+    assert graph.drop_view("out") and graph.view("out") is None and not graph.drop_view("out")
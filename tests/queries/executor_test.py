@@ -0,0 +1,52 @@
+import pytest
+from queries.executor import *
+
+EDGES = [(1, 2, 5.0), (1, 3, 1.0), (2, 3, 2.0), (3, 1, 4.0), (3, 2, None), (2, 1, 3.0)]
+
+
+def test_select_where_order_limit(make_graph):
+    graph = make_graph(EDGES)
+    status = Query(graph.edges).select("id", "weight").where("weight", ">", 1.5).order_by("weight", True) \
+        .limit(2).execute()
+    assert status.success
+    assert status["data"] == [{"id": 0, "weight": 5.0}, {"id": 3, "weight": 4.0}]
+    status = Query(graph.edges).where("from", "IN", [2, 3]).where("weight", lambda w: w < 4).execute()
+    assert [row["id"] for row in status["data"]] == [2, 5]
+    assert len(Query(graph.edges).limit(3).execute()["data"]) == 3
+    ordered = Query(graph.edges).select("id").order_by("weight").execute()["data"]
+    assert [row["id"] for row in ordered] == [1, 2, 5, 3, 0, 4]
+
+
+def test_group_by(make_graph):
+    graph = make_graph(EDGES)
+    status = Query(graph.edges).group_by("from").aggregate("COUNT").aggregate("SUM", "weight") \
+        .aggregate("AVG", "weight", "avg").aggregate("MAX", "weight").aggregate("COUNT", "weight") \
+        .order_by("SUM(weight)", True).execute()
+    assert status["data"] == [
+        {"from": 1, "COUNT(*)": 2, "SUM(weight)": 6.0, "avg": 3.0, "MAX(weight)": 5.0, "COUNT(weight)": 2},
+        {"from": 2, "COUNT(*)": 2, "SUM(weight)": 5.0, "avg": 2.5, "MAX(weight)": 3.0, "COUNT(weight)": 2},
+        {"from": 3, "COUNT(*)": 2, "SUM(weight)": 4.0, "avg": 4.0, "MAX(weight)": 4.0, "COUNT(weight)": 1},
+    ]
+    total = Query(graph.edges).where("weight", ">", 100.0).aggregate("COUNT").aggregate("MIN", "weight").execute()
+    assert total["data"] == [{"COUNT(*)": 0, "MIN(weight)": None}]
+
+
+def test_indexes(make_graph):
+    graph = make_graph(EDGES)
+    assert graph.edges.create_index("weight").success
+    assert not graph.edges.create_index("age").success
+    status = Query(graph.edges).select("id").where("weight", ">=", 2.0).where("weight", "<", 5.0).execute()
+    assert status["Indexes Used"] == ["weight", "weight"] and status["Rows Examined"] == 0
+    assert [row["id"] for row in status["data"]] == [2, 3, 5]
+    assert not graph.insert([], [{"id": 0, "from": 1, "to": 2, "weight": 2.5}]).success
+    assert graph.insert([], [{"id": 6, "from": 1, "to": 2, "weight": 2.5}]).success
+    status = Query(graph.edges).select("id").where("weight", "=", 2.5).where("to", "=", 2).execute()
+    assert status["data"] == [{"id": 6}] and status["Rows Examined"] == 1
+
+
+def test_invalid(make_graph):
+    graph = make_graph(EDGES)
+    assert not Query(graph.edges).where("age", "=", 1).execute().success
+    assert not Query(graph.edges).where("id", "~", 1).execute().success
+    assert not Query(graph.vertices).aggregate("SUM", "label").execute().success
+    assert not Query(graph.edges).group_by("from").select("to").execute().success
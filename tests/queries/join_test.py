@@ -0,0 +1,31 @@
+import pytest
+from queries.join import *
+
+VERTICES = [{"id": 1, "label": "person"}, {"id": 2, "label": "person"}, {"id": 3, "label": "city"},
+            {"id": 4, "label": "city"}]
+EDGES = [(1, 2, 1.0), (1, 3, 2.0), (2, 3, 3.0), (2, 4, 4.0), (3, 4, 5.0)]
+
+
+def test_hash_join(make_graph):
+    graph = make_graph(EDGES, vertices=VERTICES)
+    status = hash_join(graph.edges, graph.vertices, [("to", "id")], ["id"], ["label"], right_prefix="to.")
+    assert status.success and status["Build Side"] == "V"
+    assert sorted((row["id"], row["to.label"]) for row in status["data"]) == \
+           [(0, "person"), (1, "city"), (2, "city"), (3, "city"), (4, "city")]
+    few = hash_join(graph.edges, graph.vertices, [("from", "id"), ("weight", "id")], ["id"], [], left_rows=[0, 1])
+    assert few["data"] == [{"id": 0}] and few["Build Side"] == "E"
+    assert not hash_join(graph.edges, graph.vertices, [("to", "id")], ["id"], ["id"]).success
+    assert not hash_join(graph.edges, graph.vertices, [("to", "age")]).success
+
+
+def test_join_endpoints(make_graph):
+    graph = make_graph(EDGES, vertices=VERTICES)
+    status = join_endpoints(graph, ["id"], ["label"], ["id"],
+                            sources=Query(graph.vertices).where("label", "=", "person"),
+                            targets=Query(graph.vertices).where("label", "=", "city"))
+    assert status["data"] == [{"id": 1, "from.label": "person", "to.id": 3},
+                              {"id": 2, "from.label": "person", "to.id": 3},
+                              {"id": 3, "from.label": "person", "to.id": 4}]
+    heavy = join_endpoints(graph, ["id"], edges=Query(graph.edges).where("weight", ">", 3.5))
+    assert heavy["data"] == [{"id": 3}, {"id": 4}]
+    assert not join_endpoints(graph, source_fields=["age"]).success
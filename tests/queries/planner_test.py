@@ -0,0 +1,47 @@
+import pytest
+from queries.planner import *
+
+
+def chain(make_graph, n=100):
+    vertices = [{"id": i, "label": "hub" if i == 0 else "leaf"} for i in range(n)]
+    return make_graph([(i, i + 1, float(i)) for i in range(n - 1)], vertices=vertices)
+
+
+def test_index_or_scan(make_graph):
+    graph = chain(make_graph)
+    assert graph.edges.create_index("weight").success and graph.vertices.create_index("label").success
+    selective = Query(graph.edges).where("weight", "<", 5.0)
+    plan = plan_query(selective)
+    assert plan.root.operator == "Index Scan" and plan.root.estimated_rows == pytest.approx(5.05, abs=0.1)
+    assert [row["id"] for row in plan.execute()["data"]] == list(range(5)) and plan.root.actual_rows == 5
+    broad = Query(graph.vertices).where("label", "=", "leaf").where("id", ">", 89).order_by("id").limit(3)
+    plan = plan_query(broad)
+    assert broad.index_fields == [] and plan.root.operator == "Limit"
+    explained = plan.explain(analyze=True).splitlines()
+    assert explained[0].startswith("Limit") and "actual rows: 3" in explained[0]
+    assert explained[-2].strip().startswith("Filter") and "actual rows: 10" in explained[-2]
+    assert explained[-1].strip().startswith("Scan") and "actual rows: 100" in explained[-1]
+
+
+def test_join_order(make_graph):
+    graph = chain(make_graph)
+    plan = plan_endpoints(graph, ["id"], ["label"], [], sources=Query(graph.vertices).where("label", "=", "leaf"),
+                          targets=Query(graph.vertices).where("id", "<", 3))
+    assert plan.root.children[0].details["Condition"] == "to = id"
+    status = plan.execute()
+    assert status["data"] == [{"id": 1, "from.label": "leaf"}] and status["Rows After First Join"] == 2
+    assert plan.root.children[0].actual_rows == 2 and plan.root.actual_rows == 1
+    plan = plan_endpoints(graph, ["id"], sources=Query(graph.vertices).where("id", "<", 2))
+    assert plan.execute()["data"] == [{"id": 0}, {"id": 1}] and plan.root.estimated_rows == pytest.approx(2, abs=1)
+
+
+def test_reachability(make_graph):
+    graph = make_graph([(0, i, 1.0) for i in range(1, 50)] + [(i, 50, 1.0) for i in range(1, 50)] + [(50, 51, 1.0)])
+    plan = plan_reachability(graph, [0], [51])
+    assert plan.root.details["Direction"] == "Backward"
+    status = plan.execute()
+    assert status["data"] and status["Hops"] == 3 and status["Edges Expanded"] == 51
+    assert not plan_reachability(graph, [51], [0]).execute()["data"]
+    assert plan_reachability(graph, [0], [51], max_hops=2).execute()["Hops"] is None
+    assert plan_reachability(graph, [0, 51], [51]).execute()["Hops"] == 0
+    assert not plan_reachability(graph, [0], [99]).execute().success
@@ -0,0 +1,32 @@
+import pytest
+from utilities.cache import *
+
+
+def test_lru():
+    cache = ResultCache(2)
+    owner = object()
+    assert cache.get(owner, "q", (1,), 1, lambda: "a") == "a"
+    assert cache.get(owner, "q", (1,), 1, lambda: "b") == "a"
+    cache.get(owner, "q", (2,), 1, lambda: "c")
+    cache.get(owner, "q", (1,), 1, lambda: "d")
+    cache.get(owner, "q", (3,), 1, lambda: "e")
+    assert cache.get(owner, "q", (1,), 1, lambda: "f") == "a"
+    assert cache.get(owner, "q", (2,), 1, lambda: "g") == "g"
+    assert cache.get(owner, "q", ([],), 1, lambda: "h") == "h"
+    assert cache.stats() == {"size": 2, "capacity": 2, "hits": 3, "misses": 5, "evictions": 2}
+
+
+def test_versions(make_graph):
+    graph = make_graph([(1, 2, 1.0)])
+    version, vertices_version = graph.version, graph.vertices.version
+    vertices = graph.vertices_list()
+    assert graph.vertices_list() is vertices
+    assert not graph.insert([{"id": 1}], []).success
+    assert not graph.insert([{"id": 3}], [{"id": 0, "from": 1, "to": 3}]).success
+    assert graph.version == version and graph.vertices.version == vertices_version
+    assert graph.vertices_list() is vertices
+    assert graph.vertices.get_entry(1) == {"id": 1}
+    assert graph.insert([{"id": 3}], [{"id": 5, "from": 2, "to": 3, "weight": 2.0}]).success
+    assert graph.version > version and graph.vertices.version > vertices_version
+    assert len(graph.vertices_list()) == 3
+    assert [edge["id"] for edge in graph.edges_from(2)["data"]] == [5]
@@ -0,0 +1,49 @@
+import pytest
+from utilities.instrumentation import *
+
+
+@pytest.fixture
+def instrumentation():
+    INSTRUMENTATION.reset()
+    INSTRUMENTATION.enable(allocations=True)
+    yield INSTRUMENTATION
+    INSTRUMENTATION.disable()
+    INSTRUMENTATION.reset()
+
+
+def test_insert_is_instrumented(make_graph, instrumentation):
+    graph = make_graph([(1, 2, 1.0)])
+    status = graph.insert([{"id": 3}], [{"id": 1, "from": 1, "to": 3, "weight": 1.0}])
+    assert status["Instrumentation"]["Graph.adjacency_update"]["Rows Examined"] == 2
+    add_status, _, constraints_status = status.substatuses
+    assert add_status["Instrumentation"]["Data.add_entries"]["Bytes Allocated"] is not None
+    integrity = constraints_status.substatuses[-1]["Instrumentation"]["graphwide.REFERENTIAL_INTEGRITY"]
+    assert integrity["Rows Examined"] == 5 and integrity["Seconds"] >= 0
+    failed = graph.insert([{"id": 1}])
+    assert "Graph.rollback" in failed["Instrumentation"]
+    stats = instrumentation.stats()
+    assert stats["Graph.adjacency_update"]["Calls"] == 2 and stats["Graph.rollback"]["Calls"] == 1
+    assert stats["typewide.UNIQUE"]["Rows Examined"] > 0
+    exported = instrumentation.export()
+    assert 'sqlongraphs_calls_total{operation="Graph.rollback"} 1' in exported
+    assert 'sqlongraphs_seconds_bucket{operation="Graph.rollback",le="+Inf"} 1' in exported
+
+
+def test_disabled(make_graph):
+    INSTRUMENTATION.reset()
+    graph = make_graph([(1, 2, 1.0)])
+    status = graph.insert([{"id": 3}])
+    assert status.context.get("Instrumentation") is None and INSTRUMENTATION.metrics == {}
+
+
+def test_existing_tracing_is_kept():
+    tracemalloc.start()
+    try:
+        INSTRUMENTATION.enable(allocations=True)
+        INSTRUMENTATION.disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    INSTRUMENTATION.enable(allocations=True)
+    INSTRUMENTATION.disable()
+    assert not tracemalloc.is_tracing()
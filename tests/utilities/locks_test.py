@@ -0,0 +1,38 @@
+import threading
+import time
+
+import pytest
+from utilities.locks import *
+
+
+def test_readers_share_writers_exclude():
+    lock = ReadWriteLock()
+    inside, peak, order = [0], [0], []
+    counter = threading.Lock()
+
+    def reader():
+        with lock.read():
+            with counter:
+                inside[0] += 1
+                peak[0] = max(peak[0], inside[0])
+            time.sleep(0.05)
+            with counter:
+                inside[0] -= 1
+
+    def writer(tag):
+        with lock.write():
+            order.append((tag, "start"))
+            time.sleep(0.02)
+            order.append((tag, "end"))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)] + \
+              [threading.Thread(target=writer, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] >= 2
+    assert all(order[i][0] == order[i + 1][0] for i in range(0, len(order), 2))
+    stats = lock.metrics.stats()
+    assert stats[READ]["Acquisitions"] == 4 and stats[WRITE]["Acquisitions"] == 3
+    assert stats[WRITE]["Contended"] >= 1 and stats[WRITE]["Max Wait"] > 0
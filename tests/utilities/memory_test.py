@@ -0,0 +1,20 @@
+import pytest
+from utilities.memory import *
+
+
+def test_spilled_column(tmp_path):
+    columns = {"label": ["a", "b", "c"]}
+    column = SpilledColumn(columns["label"], str(tmp_path), columns, "label")
+    columns["label"] = column
+    assert list(tmp_path.iterdir()) == [] and column.spilled_size() > 0
+    column.append("d")
+    assert column[3] == "d" and column[-1] == "d" and column[3:] == ["d"] and len(column) == 4
+    assert column.pop() == "d" and column.values is None
+    assert column[1] == "b" and columns["label"] == ["a", "b", "c"] and column.spilled_size() == 0
+    column.append("e")
+    assert column == ["a", "b", "c", "e"] and column.index("e") == 3 and columns["label"][3] == "e"
+
+
+def test_sizes():
+    assert sample_size([], 0) == 0 and value_size(None) == 0
+    assert column_size(list(range(1000))) > column_size([None] * 1000)
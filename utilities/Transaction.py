@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 
 from datatypes.primitive import Primitive
 
@@ -10,6 +11,7 @@ class Transaction:
         type: the type of transaction.
         data: a list of entries involved in this transaction.
         context: a list of dictionaries representing context information associated with each entry.
+        version: the version of the mutated object before this transaction, restored if it is rolled back.
     """
 
     class TransactionType(Enum):
@@ -17,10 +19,14 @@ class Transaction:
         An Enum member showing the supported transaction types in the current build.
         """
         INSERT = "INSERT"
+        DELETE = "DELETE"
+        UPDATE = "UPDATE"
 
-    def __init__(self, type: TransactionType, data: list[dict[str, Primitive]], context: list[dict]):
+    def __init__(self, type: TransactionType, data: list[dict[str, Primitive]], context: list[dict],
+                 version: Optional[int] = None):
         self.type = type
         self.data = data
         self.context = context
+        self.version = version
 
 
@@ -0,0 +1,110 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+from typing import Any, Callable, Hashable
+
+_versions = count(1)
+
+
+def next_version() -> int:
+    """
+    Return a new version number. Version numbers are drawn from a single process-wide counter, so a number is never
+    handed out twice, even to different objects or after a rollback restores an older version.
+    """
+    return next(_versions)
+
+
+class ResultCache:
+    """
+    A bounded least-recently-used cache for the results of read queries. Results are keyed by the queried object,
+    the name of the query, its parameters and the version of the object, so a mutation that changes the version makes
+    every earlier result unreachable; the stale results are then evicted in LRU order.
+    Cached results are shared between callers and must not be modified. The cache can be used from several threads;
+    results are computed outside its lock, so two threads missing on the same key may both compute it. A forked child
+    process gets a new lock, since the lock may have been held by another thread of the parent.
+    Attributes:
+        capacity: the maximum number of results held.
+        hits: the number of lookups answered from the cache.
+        misses: the number of lookups that had to compute their result.
+        evictions: the number of results dropped to respect the capacity.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, owner: object, query: str, params: tuple, version: int, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result of 'query' with 'params' on 'owner' at 'version', calling compute() to produce and
+        store it on a miss. If a parameter is unhashable, the result is computed without being cached.
+        """
+        key = (id(owner), query, params, version)
+        with self._lock:
+            try:
+                result = self._results[key]
+            except KeyError:
+                hashable = True
+            except TypeError:
+                hashable = False
+            else:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return result
+            self.misses += 1
+        result = compute()
+        if not hashable:
+            return result
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def resize(self, capacity: int):
+        """
+        Change the capacity of the cache, evicting the least recently used results if needed.
+        """
+        with self._lock:
+            self.capacity = capacity
+            while len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drop every cached result. The counters are kept.
+        """
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return a dictionary with the size, capacity and hit, miss and eviction counters of the cache.
+        """
+        return {"size": len(self._results), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+RESULT_CACHE = ResultCache()
+os.register_at_fork(after_in_child=lambda: setattr(RESULT_CACHE, "_lock", threading.Lock()))
+
+
+def cached_query(f: Callable) -> Callable:
+    """
+    A decorator caching in RESULT_CACHE the result of a query function whose first parameter is a Graph, keyed by
+    the positional and keyword arguments and the version of the graph.
+    """
+
+    @wraps(f)
+    def cached_f(graph, *args, **kwargs):
+        params: tuple[Hashable, ...] = args + tuple(sorted(kwargs.items()))
+        return RESULT_CACHE.get(graph, f.__qualname__, params, graph.version, lambda: f(graph, *args, **kwargs))
+
+    return cached_f
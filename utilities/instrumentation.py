@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from typing import Any, Optional
+
+from statuses.status import Status
+
+BUCKETS = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0]
+
+
+class Metric:
+    """
+    The process-wide counters and latency histogram of one instrumented operation.
+    Attributes:
+        calls: the number of calls recorded.
+        seconds: the total wall time of the calls in seconds.
+        rows: the total number of rows examined by the calls.
+        allocated: the total number of bytes allocated by the calls, if allocations are traced.
+        buckets: the number of calls taking at most each of BUCKETS seconds (and, last, the others).
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.allocated = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def record(self, seconds: float, rows: int, allocated: int):
+        self.calls += 1
+        self.seconds += seconds
+        self.rows += rows
+        self.allocated += allocated
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def merge(self, other: 'Metric'):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.rows += other.rows
+        self.allocated += other.allocated
+        self.buckets = [count + other_count for count, other_count in zip(self.buckets, other.buckets)]
+
+
+class Instrumentation:
+    """
+    An opt-in recorder of the wall time, rows examined and allocations of the hot paths: constraint checks,
+    Data.add_entries(), and the adjacency update and rollback of Graph.insert(). Each instrumented call site checks
+    self.enabled before doing anything else, so the overhead is a single attribute lookup while it is disabled. When
+    enabled, the measurements of a call are attached to the context of its Status under "Instrumentation", and
+    aggregated into process-wide Metrics which can be scraped with self.export(). A forked child process starts with
+    no metrics and a new lock, since the lock may have been held by another thread of the parent; the metrics of
+    worker processes are sent back to be merged (see self.drain() and self.merge()).
+    Attributes:
+        enabled: whether calls are instrumented.
+        allocations: whether allocations are traced with tracemalloc, which slows every allocation down.
+        metrics: a dictionary mapping the name of each instrumented operation to its Metric.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.allocations = False
+        self.metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._tracing = False
+
+    def enable(self, allocations: bool = False):
+        """
+        Start instrumenting calls, tracing allocations as well if 'allocations' is True. Tracing started by someone
+        else is used as is.
+        """
+        self.allocations = allocations
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop instrumenting calls, and tracing allocations if self.enable() started it. The metrics are kept.
+        """
+        self.enabled = False
+        self.allocations = False
+        if self._tracing:
+            self._tracing = False
+            tracemalloc.stop()
+
+    def reset(self):
+        """
+        Drop every metric.
+        """
+        with self._lock:
+            self.metrics = {}
+
+    def start(self) -> tuple[float, int]:
+        """
+        Return a probe marking the start of an instrumented call, to be passed to self.stop().
+        """
+        allocated = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        return time.perf_counter(), allocated
+
+    def stop(self, name: str, probe: tuple[float, int], rows: int = 0,
+             status: Optional[Status] = None) -> dict[str, Any]:
+        """
+        Record the end of the call started by 'probe' as an operation named 'name' which examined 'rows' rows, and
+        attach the measurements to the context of 'status' if given, in a dictionary under "Instrumentation" mapping
+        the name of each operation to its measurements.
+        :return: a dictionary with the wall time in seconds, the rows examined and the bytes allocated (or None if
+            allocations aren't traced).
+        """
+        seconds = time.perf_counter() - probe[0]
+        allocated = tracemalloc.get_traced_memory()[0] - probe[1] if self.allocations else 0
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric()
+            metric.record(seconds, rows, allocated)
+        measurements = {"Seconds": seconds, "Rows Examined": rows,
+                        "Bytes Allocated": allocated if self.allocations else None}
+        if status is not None:
+            if status.context is None:
+                status.context = {}
+            status.context.setdefault("Instrumentation", {})[name] = measurements
+        return measurements
+
+    def drain(self) -> dict[str, Metric]:
+        """
+        Return the metrics and drop them, e.g. to send those recorded by a worker process to its parent.
+        """
+        with self._lock:
+            metrics, self.metrics = self.metrics, {}
+        return metrics
+
+    def merge(self, metrics: dict[str, Metric]):
+        """
+        Add 'metrics', e.g. those drained from a worker process, to the metrics.
+        """
+        with self._lock:
+            for name, metric in metrics.items():
+                self.metrics.setdefault(name, Metric()).merge(metric)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self.metrics = {}
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Return a dictionary mapping the name of each operation to its call count, total and mean seconds, rows
+        examined and bytes allocated.
+        """
+        with self._lock:
+            return {name: {"Calls": metric.calls, "Total Seconds": metric.seconds,
+                           "Mean Seconds": metric.seconds / metric.calls, "Rows Examined": metric.rows,
+                           "Bytes Allocated": metric.allocated} for name, metric in self.metrics.items()}
+
+    def export(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format: counters of calls, rows examined and bytes
+        allocated, and a cumulative latency histogram, per operation.
+        """
+        with self._lock:
+            metrics = sorted(self.metrics.items())
+            lines = []
+            for family, attribute in (("calls", "calls"), ("rows_examined", "rows"), ("bytes_allocated", "allocated")):
+                lines.append(f"# TYPE sqlongraphs_{family}_total counter")
+                lines += [f'sqlongraphs_{family}_total{{operation="{name}"}} {getattr(metric, attribute)}'
+                          for name, metric in metrics]
+            lines.append("# TYPE sqlongraphs_seconds histogram")
+            for name, metric in metrics:
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ["+Inf"], metric.buckets):
+                    cumulative += count
+                    lines.append(f'sqlongraphs_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'sqlongraphs_seconds_sum{{operation="{name}"}} {metric.seconds}')
+                lines.append(f'sqlongraphs_seconds_count{{operation="{name}"}} {metric.calls}')
+        return "\n".join(lines) + "\n"
+
+
+INSTRUMENTATION = Instrumentation()
+os.register_at_fork(after_in_child=INSTRUMENTATION._after_fork)
@@ -0,0 +1,111 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+READ = "read"
+WRITE = "write"
+
+
+class LockMetrics:
+    """
+    The time spent waiting to acquire a ReadWriteLock, per mode (READ or WRITE).
+    Attributes:
+        counts: a dictionary mapping each mode to the number of acquisitions.
+        contended: a dictionary mapping each mode to the number of acquisitions that had to wait.
+        total_wait: a dictionary mapping each mode to the total waiting time in seconds.
+        max_wait: a dictionary mapping each mode to the longest waiting time in seconds.
+    """
+
+    def __init__(self):
+        self.counts = {READ: 0, WRITE: 0}
+        self.contended = {READ: 0, WRITE: 0}
+        self.total_wait = {READ: 0.0, WRITE: 0.0}
+        self.max_wait = {READ: 0.0, WRITE: 0.0}
+
+    def record(self, mode: str, wait: float, contended: bool):
+        self.counts[mode] += 1
+        self.contended[mode] += contended
+        self.total_wait[mode] += wait
+        self.max_wait[mode] = max(self.max_wait[mode], wait)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Return a dictionary mapping each mode to its acquisition count, contended count, and total, mean and maximum
+        waiting times in seconds.
+        """
+        return {mode: {"Acquisitions": self.counts[mode], "Contended": self.contended[mode],
+                       "Total Wait": self.total_wait[mode],
+                       "Mean Wait": self.total_wait[mode] / self.counts[mode] if self.counts[mode] else 0.0,
+                       "Max Wait": self.max_wait[mode]} for mode in (READ, WRITE)}
+
+
+class ReadWriteLock:
+    """
+    A lock held either by any number of readers or by a single writer. Waiting writers take precedence over new
+    readers, so a steady stream of reads can't starve a write. The lock is not reentrant.
+    Attributes:
+        readers: the number of threads holding the lock for reading.
+        writer: whether a thread holds the lock for writing.
+        metrics: the LockMetrics of the lock.
+    """
+
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        self.metrics = LockMetrics()
+        self._waiting_writers = 0
+        self._condition = threading.Condition(threading.Lock())
+
+    def acquire_read(self):
+        start = time.perf_counter()
+        with self._condition:
+            contended = self.writer or self._waiting_writers > 0
+            while self.writer or self._waiting_writers:
+                self._condition.wait()
+            self.readers += 1
+            self.metrics.record(READ, time.perf_counter() - start, contended)
+
+    def release_read(self):
+        with self._condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        start = time.perf_counter()
+        with self._condition:
+            contended = self.writer or self.readers > 0
+            self._waiting_writers += 1
+            while self.writer or self.readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self.writer = True
+            self.metrics.record(WRITE, time.perf_counter() - start, contended)
+
+    def release_write(self):
+        with self._condition:
+            self.writer = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Hold the lock for reading for the duration of a with block.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Hold the lock for writing for the duration of a with block.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,146 @@
+import marshal
+import mmap
+import os
+import sys
+import tempfile
+import threading
+from itertools import islice
+from typing import Any, Callable, Iterable, Optional
+
+SAMPLE = 64
+
+
+def sample_size(items: Iterable, count: int, size: Callable[[Any], int] = sys.getsizeof) -> int:
+    """
+    Estimate the total size(item) of the 'count' objects of 'items' from the first SAMPLE of them, or from SAMPLE
+    evenly spaced ones if 'items' is a list.
+    """
+    if count == 0:
+        return 0
+    if isinstance(items, list):
+        step = max(1, count // SAMPLE)
+        sample = items[::step][:SAMPLE]
+    else:
+        sample = list(islice(items, SAMPLE))
+    return sum(map(size, sample)) * count // len(sample) if sample else 0
+
+
+def value_size(value: Any) -> int:
+    """
+    Return the size of a primitive value, which is 0 for the singletons None, True and False.
+    """
+    return 0 if value is None or value is True or value is False else sys.getsizeof(value)
+
+
+def column_size(column: list) -> int:
+    """
+    Estimate the number of bytes held by a column: its array of references and the values it refers to.
+    """
+    return sys.getsizeof(column) + sample_size(column, len(column), value_size)
+
+
+class SpilledColumn:
+    """
+    A column of a Data object written to a memory-mapped file by Data.spill(). The file is unlinked as soon as it is
+    mapped, so the disk space is reclaimed once the column is paged back in or discarded. Values appended after the
+    column was spilled, and reads of them, stay in memory, so insertions don't touch the file; any other access pages
+    the column in, and the list replaces this object in the dictionary of columns it was spilled from, where it is
+    found by later reads. Holders of this object, such as snapshots and cursors, keep reading through it.
+    Attributes:
+        field_name: the name of the field of the column.
+        columns: the dictionary of columns the column was spilled from.
+        size: the number of values in the file.
+        tail: the values appended since the column was spilled, or None once it is paged in.
+        values: the column once it is paged in, or None.
+    """
+
+    def __init__(self, values: list, directory: str, columns: dict[str, Any], field_name: str):
+        data = marshal.dumps(values)
+        fd, path = tempfile.mkstemp(suffix=".column", dir=directory)
+        try:
+            with os.fdopen(fd, "wb", closefd=False) as file:
+                file.write(data)
+            self.map: Optional[mmap.mmap] = mmap.mmap(fd, len(data), access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+            os.remove(path)
+        self.field_name = field_name
+        self.columns = columns
+        self.size = len(values)
+        self.tail: Optional[list] = []
+        self.values: Optional[list] = None
+        self.lock = threading.RLock()
+
+    def spilled_size(self) -> int:
+        """
+        Return the number of bytes of the file, or 0 once the column is paged in.
+        """
+        with self.lock:
+            return 0 if self.map is None else len(self.map)
+
+    def load(self) -> list:
+        """
+        Page the column in and return it.
+        """
+        with self.lock:
+            if self.values is None:
+                values = marshal.loads(self.map)
+                values.extend(self.tail)
+                self.map.close()
+                self.map, self.tail, self.values = None, None, values
+                if self.columns.get(self.field_name) is self:
+                    self.columns[self.field_name] = values
+            return self.values
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.values) if self.values is not None else self.size + len(self.tail)
+
+    def __getitem__(self, key):
+        with self.lock:
+            if self.values is None:
+                if isinstance(key, slice):
+                    start, stop, step = key.indices(self.size + len(self.tail))
+                    if step == 1 and start >= self.size:
+                        return self.tail[start - self.size:stop - self.size]
+                else:
+                    row = key + self.size + len(self.tail) if key < 0 else key
+                    if self.size <= row:
+                        return self.tail[row - self.size]
+            return self.load()[key]
+
+    def append(self, value: Any):
+        with self.lock:
+            (self.tail if self.values is None else self.values).append(value)
+
+    def pop(self, index: int = -1) -> Any:
+        with self.lock:
+            if self.values is None and index == -1 and self.tail:
+                return self.tail.pop()
+            return self.load().pop(index)
+
+    def __setitem__(self, key, value):
+        self.load()[key] = value
+
+    def __delitem__(self, key):
+        del self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self.load()
+
+    def __eq__(self, other: Any) -> bool:
+        return self.load() == (other.load() if isinstance(other, SpilledColumn) else other)
+
+    __hash__ = None
+
+    def __getattr__(self, name: str) -> Any:
+        # the other methods of list, e.g. index() and extend()
+        if name.startswith("__") or name in ("field_name", "columns", "size", "tail", "values", "map", "lock"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"SpilledColumn({self.field_name!r}, {len(self)} values)"